@@ -1,55 +1,35 @@
 import streamlit as st
-import os
-from dotenv import load_dotenv
-
-# .env 파일에서 제미나이를 연동하기 위한 코드 
-load_dotenv()
-
-# API 키 확인 - Streamlit Cloud의 경우 secrets 사용, 아닐 땐 .env 사용
-GOOGLE_API_KEY = None
-try:
-    # Streamlit Cloud에서는 secrets 사용 (그래서 .env 파일 사용 안 함)
-    if hasattr(st, 'secrets') and "GOOGLE_API_KEY" in st.secrets:
-        GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
-except:
-    pass
-
-# secrets에 없으면 .env에서 가져오기 (로컬 환경용)
-if not GOOGLE_API_KEY:
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-# 만약 키를 못 가져왔다면 에러 메시지 출력
-if not GOOGLE_API_KEY:
-    st.error("⚠️ Streamlit Secrets 또는 .env 파일에서 GOOGLE_API_KEY를 찾을 수 없습니다!")
-    st.error("로컬 실행: .env 파일을 확인하세요.")
-    st.error("Streamlit Cloud: Secrets에 GOOGLE_API_KEY를 설정하세요.")
-    st.stop()
-
-
-# 1. 한국어 조사 자동 처리 함수 (if 문을 통해 자음, 모음 판단하여 은,는,이,가 주격 조사 적용. 자연스러움 확보)
-def get_josa(word, josa_type):
-    if not word: return ""
-    last_char = word[-1]
-    if '가' <= last_char <= '힣':
-        char_code = ord(last_char) - 44032
-        has_batchim = (char_code % 28 != 0)
-        if josa_type == "이/가":
-            return f"{word}이" if has_batchim else f"{word}가"
-        elif josa_type == "을/를":
-            return f"{word}을" if has_batchim else f"{word}를"
-    return word
+from app_config import require_config
+from decision_engine import evaluate, price_scores
+from basket_optimizer import basket_lines, plan_basket
+from consumer_report import alternatives_record
+from event_log import log_event
+from metrics import METRICS, RerunTimer
+from catalog import get_catalog, item_options, prefill_price
+# 한국어 조사 자동 처리 (받침을 보고 은/는, 이/가, 을/를을 맞춰 붙임)
+from prompt_templates import get_josa
+
+# 재실행 시간 측정 (교사용 지표)
+rerun = RerunTimer("20231520_YoungRyeolLim_Rational_Consumer_AI.py")
+
+# API 키 확인 - Streamlit Cloud의 경우 secrets 사용, 로컬의 경우 .env 사용
+# 슬라이더를 움직일 때마다 .env와 secrets를 다시 읽지 않도록 서버 프로세스당 한 번만 찾고, 문제가 있으면 안내 후 멈춤
+config = require_config()
+
 
 # 2. 학생에게 보여지는 메인 화면 및 학습 목표 설정 코드
 st.title("🛒 우리 집 '합리적 소비' 매니저")
 st.subheader("합리적으로 선택해 보아요.")
 
-# 3. 리스트를 활용하여 주제별 기본 데이터 정의 (교과 내용 CK 연계) 
-THEMES = {
-    "음식": {"items": ["치킨", "피자", "햄버거", "떡볶이"], "criteria": ["맛", "양", "배달 속도"]},
-    "신발": {"items": ["운동화", "구두", "샌들", "슬리퍼"], "criteria": ["디자인", "착용감", "내구성"]},
-    "가방": {"items": ["백팩", "에코백", "크로스백", "캐리어"], "criteria": ["디자인", "수납 공간", "무게"]},
-    "학용품": {"items": ["연필", "샤프", "볼펜", "만년필"], "criteria": ["디자인", "필기감", "내구성"]}
-}
+# 3. 주제별 기본 데이터 (교과 내용 CK 연계)
+# 주제, 상품, 참고 가격, 평가 기준은 data/catalog.json에서 읽음 (파일을 고치면 다음 재실행 때 반영됨)
+catalog = get_catalog()
+THEMES = catalog.themes
+BASIC_CRITERIA = 3  # 이 앱은 기본 기준 세 가지에 학생이 정한 기준을 더함
+
+# 한 번에 비교할 수 있는 후보 수와 한 줄에 놓을 후보 수
+MAX_ALTERNATIVES = 20
+COLUMNS_PER_ROW = 3
 
 #4. 예산 및 주제 설정 (자원의 희소성 인식)
 st.divider()
@@ -64,7 +44,7 @@ with col_start2:
 st.write("### 📋 2단계: 나만의 선택 기준 만들기")
 custom_criteria = st.text_input("기본 기준 외에 추가하고 싶은 기준이 있나요? (예: 브랜드 가치, 환경 보호 등)")
 # 학생들이 토의를 통해 정한 새로운 기준을 리스트에 병합하는 코드
-final_criteria = THEMES[choice_theme]["criteria"]
+final_criteria = THEMES[choice_theme].criteria[:BASIC_CRITERIA]
 if custom_criteria:
     final_criteria = final_criteria + [custom_criteria]
 st.info(f"현재 적용된 기준: **{', '.join(final_criteria)}**")
@@ -72,49 +52,87 @@ st.info(f"현재 적용된 기준: **{', '.join(final_criteria)}**")
 # 6. 대안 입력 및 평가 (TK 구현)
 st.divider()
 st.write("### 📊 3단계: 대안 평가하기")
-col_a, col_b = st.columns(2)
-
-# 대안 A 설정
-with col_a:
-    st.markdown("#### 🅰️ 대안 A")
-    item_a_sel = st.selectbox("후보 선택", THEMES[choice_theme]["items"] + ["직접 입력"], key="item_a_sel")
-    item_a = st.text_input("상품 이름", key="item_a_custom") if item_a_sel == "직접 입력" else item_a_sel
-    price_a = st.number_input(f"{item_a} 가격 (원)", min_value=0, value=0, key="p_a")
-    
-    scores_a_val = [st.slider(f"{item_a} - {crit}", 0, 10, 5, key=f"a_{crit}") for crit in final_criteria]
-    p_score_a = (1 - (price_a / budget)) * 10 if price_a <= budget and budget > 0 else 0
-    st.caption(f"💰 경제성 점수: {p_score_a:.1f}/10점")
-    eval_a = dict(zip(final_criteria + ["경제성"], scores_a_val + [p_score_a]))
-    avg_a = sum(eval_a.values()) / len(eval_a)
-
-# 대안 B 설정
-with col_b:
-    st.markdown("#### 🅱️ 대안 B")
-    item_b_sel = st.selectbox("후보 선택", THEMES[choice_theme]["items"] + ["직접 입력"], key="item_b_sel")
-    item_b = st.text_input("상품 이름", key="item_b_custom") if item_b_sel == "직접 입력" else item_b_sel
-    price_b = st.number_input(f"{item_b} 가격 (원)", min_value=0, value=0, key="p_b")
-    
-    scores_b_val = [st.slider(f"{item_b} - {crit}", 0, 10, 5, key=f"b_{crit}") for crit in final_criteria]
-    p_score_b = (1 - (price_b / budget)) * 10 if price_b <= budget and budget > 0 else 0
-    st.caption(f"💰 경제성 점수: {p_score_b:.1f}/10점")
-    eval_b = dict(zip(final_criteria + ["경제성"], scores_b_val + [p_score_b]))
-    avg_b = sum(eval_b.values()) / len(eval_b)
+# 후보 수를 늘려 여러 대안을 한꺼번에 비교할 수 있음
+num_alts = st.number_input("🔢 비교할 후보 수", min_value=2, max_value=MAX_ALTERNATIVES, value=2, step=1)
+
+# 대안 하나의 입력 영역은 fragment로 둠: 슬라이더나 가격을 바꾸면 그 대안만 다시 그려지고
+# (경제성 점수도 그 자리에서 바뀜) 스크립트 전체는 분석 버튼을 누를 때만 다시 실행됨
+@st.fragment
+def alternative_panel(i, items, criteria, budget):
+    with METRICS.timer("streamlit_fragment_seconds", app="20231520_YoungRyeolLim_Rational_Consumer_AI.py"):
+        label = chr(ord("A") + i)
+        key = label.lower()
+        st.markdown(f"#### 🏷️ 대안 {label}")
+        # 찾는 말을 넣으면 전체 상품 목록에서 이름으로 찾아 후보 목록을 바꿈
+        query = st.text_input("🔎 상품 찾기", key=f"q_{key}", placeholder="예: 떡")
+        options = item_options(items, query)
+        item_sel = st.selectbox("후보 선택", options + ["직접 입력"], index=i % len(options) if options else 0, key=f"item_{key}_sel")
+        item = st.text_input("상품 이름", key=f"item_{key}_custom") if item_sel == "직접 입력" else item_sel
+        # 후보를 바꾸면 가격 칸을 목록의 참고 가격으로 채움 (학생이 고칠 수 있음)
+        prefill_price(f"p_{key}", item)
+        price = st.number_input(f"{item} 가격 (원)", min_value=0, key=f"p_{key}")
+        
+        item_scores = [st.slider(f"{item} - {crit}", 0, 10, 5, key=f"{key}_{crit}") for crit in criteria]
+        st.caption(f"💰 경제성 점수: {price_scores([price], budget)[0]:.1f}/10점")
+        return item, price, item_scores
+
+
+names, prices, scores = [], [], []
+for i in range(num_alts):
+    if i % COLUMNS_PER_ROW == 0:
+        cols = st.columns(min(COLUMNS_PER_ROW, num_alts - i))
+
+    # 대안 설정
+    with cols[i % COLUMNS_PER_ROW]:
+        item, price, item_scores = alternative_panel(i, THEMES[choice_theme].items, final_criteria, budget)
+
+    names.append(item)
+    prices.append(price)
+    scores.append(item_scores)
+
+# 경제성 점수를 포함한 평균, 순위, 기회비용을 행렬 연산으로 한 번에 계산
+evaluation = evaluate(names, final_criteria, scores, prices, budget, include_price_score=True)
 
 # 7. AI 분석 결과 및 기회비용 리포트
 if st.button("🤖 4단계: AI 매니저 분석 결과 보기"):
-    if price_a > budget and price_b > budget:
+    if not evaluation.affordable.any():
         st.error(f"🚨 예산 내에서 선택 가능한 상품이 없습니다.")
-    elif price_a == 0 or price_b == 0:
+    elif 0 in prices:
         st.warning("분석을 위해 가격 정보를 입력해주세요.")
     else:
         st.success("### 📊 AI 매니저의 종합 가치 분석")
-        best, other, b_eval, o_eval, b_avg, o_avg = (item_a, item_b, eval_a, eval_b, avg_a, avg_b) if avg_a > avg_b else (item_b, item_a, eval_b, eval_a, avg_b, avg_a)
-        st.write(f"✅ AI 추천: **{get_josa(best, '이/가')} {other}보다** 약 **{b_avg - o_avg:.1f}점** 더 합리적입니다.")
+        # 차선책은 추천과 같은 순위의 2등 (예산 안의 다른 상품이 없으면 비교하지 않음)
+        b, o = evaluation.best, int(evaluation.foregone[evaluation.best])
+        best, b_avg, o_avg = names[b], evaluation.averages[b], evaluation.averages[o]
+        other = names[o] if evaluation.has_foregone(b) else None
+        if other is None:
+            st.write(f"✅ AI 추천: 예산 안에서 고를 수 있는 상품은 **{get_josa(best, '이/가')}** 하나뿐입니다.")
+        else:
+            st.write(f"✅ AI 추천: **{get_josa(best, '이/가')} {other}보다** 약 **{b_avg - o_avg:.1f}점** 더 합리적입니다.")
         
-        lost_adv = [k for k, v in o_eval.items() if v > b_eval[k]]
+        lost_adv = evaluation.lost_advantages(b)
         if lost_adv:
             prefix = " 및 ".join([f"**{a}**" for a in lost_adv[:-1]])
             last_with_josa = get_josa(lost_adv[-1], "을/를")
             msg = f"{prefix} 및 **{last_with_josa}**" if prefix else f"**{last_with_josa}**"
             st.warning(f"💡 **기회비용 확인:** {get_josa(best, '을/를')} 선택하면 {get_josa(other, '이/가')} 가진 {msg} 포기하게 됩니다.")
-        st.info("⚠️ 최종 결정은 AI가 아닌 여러분의 가치관에 따라 내려야 합니다.")
\ No newline at end of file
+        
+        # 하나만 고르지 않고 예산 안에서 여러 개를 함께 산다면? (최적 조합, 차선 조합, 바꿀 때의 기회비용)
+        basket = plan_basket(evaluation, budget)
+        for line in basket_lines(basket, names, budget):
+            st.write(line)
+        
+        # 세 개 이상 비교할 때는 전체 순위도 보여 줌
+        if len(names) > 2:
+            ranking = [f"{rank + 1}위 {names[i]} ({evaluation.averages[i]:.1f}점)" for rank, i in enumerate(evaluation.ranking)]
+            st.write(f"📋 **전체 순위 ({evaluation.rank_label} 높은 순):** " + " → ".join(ranking))
+        
+        # 교사 검토용 기록
+        log_event(
+            "20231520_YoungRyeolLim_Rational_Consumer_AI.py", "report", theme=choice_theme, budget=budget,
+            alternatives=alternatives_record(evaluation), recommended=best, foregone=other, lost_advantages=lost_adv,
+            basket=[names[i] for i in basket.best.items],
+        )
+        st.info("⚠️ 최종 결정은 AI가 아닌 여러분의 가치관에 따라 내려야 합니다.")
+
+rerun.finish()
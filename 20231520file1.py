@@ -1,55 +1,34 @@
 import streamlit as st
-import requests
-import os
-from dotenv import load_dotenv
-
-# .env 파일에서 환경 변수 로드 (로컬 환경용)
-load_dotenv()
+from app_config import require_config
+from report_cache import get_report_cache
+from decision_engine import evaluate
+from basket_optimizer import basket_lines, plan_basket
+from consumer_report import ANALYSIS_INSTRUCTION, RANK_BY, alternatives_record, build_analysis_prompt, analysis_cache_key, local_recommendation
+from progressive_report import report_request, show_report
+from metrics import METRICS, RerunTimer
+from event_log import log_event_once
+from catalog import get_catalog, item_options, prefill_price
+
+# 재실행 시간 측정 (교사용 지표)
+rerun = RerunTimer("20231520file1.py")
 
 # API 키 확인 - Streamlit Cloud의 경우 secrets 사용, 로컬의 경우 .env 사용
-GOOGLE_API_KEY = None
-try:
-    # Streamlit Cloud에서는 secrets 사용
-    if hasattr(st, 'secrets') and "GOOGLE_API_KEY" in st.secrets:
-        GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
-except:
-    pass
-
-# secrets에 없으면 .env에서 가져오기 (로컬 환경용)
-if not GOOGLE_API_KEY:
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-# 만약 키를 못 가져왔다면 에러 메시지 출력
-if not GOOGLE_API_KEY:
-    st.error("⚠️ Streamlit Secrets 또는 .env 파일에서 GOOGLE_API_KEY를 찾을 수 없습니다!")
-    st.error("로컬 실행: .env 파일을 확인하세요.")
-    st.error("Streamlit Cloud: Secrets에 GOOGLE_API_KEY를 설정하세요.")
-    st.stop()
+# 슬라이더를 움직일 때마다 .env와 secrets를 다시 읽지 않도록 서버 프로세스당 한 번만 찾고, 문제가 있으면 안내 후 멈춤
+config = require_config("gemini-2.0-flash-exp")
 
 # 1. 메인 화면 설정 및 사용자 시선 집중
 st.title("🛒 우리 집 '합리적 소비' 매니저")
 st.subheader("합리적으로 선택해 보아요.") # 요구사항 1 반영
 
-# 2. 주제 및 기준 데이터 사전 정의 (내용 지식 CK와 연계)
+# 2. 주제 및 기준 데이터 (내용 지식 CK와 연계)
 # [cite_start]주제별로 하위 항목과 평가 기준을 다르게 설정하여 탐구의 깊이를 더함 [cite: 106]
-THEMES = {
-    "음식": {
-        "items": ["치킨", "피자", "햄버거", "떡볶이"],
-        "criteria": ["맛", "양(포만감)", "배달 속도", "영양 성분"]
-    },
-    "신발": {
-        "items": ["운동화", "구두", "샌들", "슬리퍼"],
-        "criteria": ["디자인", "착용감(편안함)", "내구성", "브랜드 가치"]
-    },
-    "가방": {
-        "items": ["백팩", "에코백", "크로스백", "캐리어"],
-        "criteria": ["디자인", "수납 공간", "무게", "재질"]
-    },
-    "학용품": {
-        "items": ["연필", "샤프", "볼펜", "만년필"],
-        "criteria": ["디자인", "필기감", "내구성", "가격 대비 성능"]
-    }
-}
+# 주제, 상품, 참고 가격, 평가 기준은 data/catalog.json에서 읽음 (파일을 고치면 다음 재실행 때 반영됨)
+catalog = get_catalog()
+THEMES = catalog.themes
+
+# 한 번에 비교할 수 있는 후보 수와 한 줄에 놓을 후보 수
+MAX_ALTERNATIVES = 20
+COLUMNS_PER_ROW = 3
 
 # [cite_start]3. 주목도 높은 예산 및 주제 설정 영역 (TK 기능 활용) [cite: 108, 110]
 st.divider()
@@ -68,135 +47,127 @@ with col_start2:
 # [cite_start]단순히 가격만 보는 것이 아니라 여러 가치를 비교하게 함 [cite: 111]
 st.info(f"선택한 주제: **{choice_theme}** | 목표: **{budget:,}원** 안에서 가장 가치 있는 선택을 하세요!")
 
-col_a, col_b = st.columns(2)
-items_list = THEMES[choice_theme]["items"]
-criteria_list = THEMES[choice_theme]["criteria"]
+items_list = THEMES[choice_theme].items
+criteria_list = THEMES[choice_theme].criteria
+
+# 후보는 두 개뿐 아니라 여러 개(예: 과자 20가지)를 한꺼번에 비교할 수 있음
+num_alts = st.number_input("🔢 비교할 후보는 몇 개인가요?", min_value=2, max_value=MAX_ALTERNATIVES, value=2, step=1)
+
+# 가중치와 대안 설정 영역은 fragment로 나눔: 슬라이더를 움직이면 스크립트 전체가 아니라
+# 그 영역만 다시 그려짐. 바뀐 값은 session_state에 남아 있다가 분석 버튼을 누를 때 한꺼번에 반영됨
+@st.fragment
+def weights_panel(criteria):
+    with METRICS.timer("streamlit_fragment_seconds", app="20231520file1.py", panel="weights"):
+        # 학생마다 중요하게 여기는 기준이 다를 수 있으므로 기준별 중요도(가중치)를 정할 수 있음
+        with st.expander("⚖️ 기준별 중요도 정하기 (선택)"):
+            return [st.slider(f"{crit}의 중요도", 1, 5, 1, key=f"w_{crit}") for crit in criteria]
+
+
+@st.fragment
+def alternative_panel(i, items, criteria):
+    with METRICS.timer("streamlit_fragment_seconds", app="20231520file1.py", panel="alternative"):
+        label = chr(ord("A") + i)
+        key = label.lower()
+        st.markdown(f"#### 🏷️ 대안 {label}")
+        # 찾는 말을 넣으면 전체 상품 목록에서 이름으로 찾아 후보 목록을 바꿈
+        query = st.text_input("🔎 상품 찾기", key=f"q_{key}", placeholder="예: 떡")
+        options = item_options(items, query)
+        item_sel = st.selectbox(f"{i + 1}번째 후보", options + ["직접 입력"], index=i % len(options) if options else 0, key=f"item_{key}")
+        item = (st.text_input("상품 이름", key=f"item_{key}_custom") or f"후보 {label}") if item_sel == "직접 입력" else item_sel
+        # 후보를 바꾸면 가격 칸을 목록의 참고 가격으로 채움 (학생이 고칠 수 있음)
+        prefill_price(f"p_{key}", item)
+        price = st.number_input(f"{item}의 가격 (원)", min_value=0, key=f"p_{key}")
+        
+        st.write("✨ **평가 점수 (각 10점 만점)**")
+        item_scores = []
+        for crit in criteria:
+            score = st.slider(f"{item} - {crit}", 0, 10, 5, key=f"{key}_{crit}")
+            item_scores.append(score)
+        return item, price, item_scores
 
-# 대안 A 설정 영역
-with col_a:
-    st.markdown("#### 🅰️ 대안 A")
-    item_a = st.selectbox("첫 번째 후보", items_list, key="item_a")
-    price_a = st.number_input(f"{item_a}의 가격 (원)", min_value=0, value=0, key="p_a")
-    
-    st.write("✨ **평가 점수 (각 10점 만점)**")
-    scores_a = []
-    for crit in criteria_list:
-        score = st.slider(f"{item_a} - {crit}", 0, 10, 5, key=f"a_{crit}")
-        scores_a.append(score)
-    avg_a = sum(scores_a) / len(scores_a)
-
-# 대안 B 설정 영역
-with col_b:
-    st.markdown("#### 🅱️ 대안 B")
-    item_b = st.selectbox("두 번째 후보", items_list, key="item_b")
-    price_b = st.number_input(f"{item_b}의 가격 (원)", min_value=0, value=0, key="p_b")
-    
-    st.write("✨ **평가 점수 (각 10점 만점)**")
-    scores_b = []
-    for crit in criteria_list:
-        score = st.slider(f"{item_b} - {crit}", 0, 10, 5, key=f"b_{crit}")
-        scores_b.append(score)
-    avg_b = sum(scores_b) / len(scores_b)
+
+weights = weights_panel(criteria_list)
+
+names, prices, scores = [], [], []
+for i in range(num_alts):
+    # 한 줄에 COLUMNS_PER_ROW개씩 대안 설정 영역을 배치함
+    if i % COLUMNS_PER_ROW == 0:
+        cols = st.columns(min(COLUMNS_PER_ROW, num_alts - i))
+
+    # 대안 설정 영역
+    with cols[i % COLUMNS_PER_ROW]:
+        item, price, item_scores = alternative_panel(i, items_list, criteria_list)
+
+    names.append(item)
+    prices.append(price)
+    scores.append(item_scores)
+
+# 평균 만족도, 만원당 만족도, 순위, 기회비용을 한 번에 계산
+evaluation = evaluate(names, criteria_list, scores, prices, budget, weights=weights, rank_by=RANK_BY)
+
+# 세션 사이에서 공유되는 AI 리포트 캐시
+report_cache = get_report_cache()
 
 # [cite_start]5. AI 매니저의 복합적 분석 및 피드백 (AI-TPACK의 핵심: TPK) [cite: 117, 121]
-if st.button("🤖 AI 매니저에게 합리성 분석 요청하기"):
+quick_first = st.toggle("⚡ 기본 분석 먼저 보기", value=True, help="AI 리포트를 기다리는 동안 바로 계산되는 기본 분석을 먼저 보여 줍니다.")
+# 같은 입력으로 이미 받은 리포트가 있으면 API를 다시 부르지 않음 (세션 간 공유)
+cache_key = analysis_cache_key(choice_theme, budget, evaluation, weights)
+# 누른 뒤에는 입력이 그대로인 동안 재실행해도 결과가 남아 있음 (AI 리포트는 뒤에서 받아 오는 대로 나타남)
+requested = st.button("🤖 AI 매니저에게 합리성 분석 요청하기")
+request = report_request(cache_key, requested)
+if request:
     st.divider()
     
     # 예산 초과 여부 먼저 확인
-    if price_a > budget and price_b > budget:
-        st.error(f"🚨 경고: 두 상품 모두 예산({budget:,}원)을 초과합니다. 다른 상품을 찾아보세요!")
-    elif price_a == 0 or price_b == 0:
+    if not evaluation.affordable.any():
+        st.error(f"🚨 경고: 모든 상품이 예산({budget:,}원)을 초과합니다. 다른 상품을 찾아보세요!")
+    elif 0 in prices:
         st.warning("분석을 위해 상품의 가격을 입력해주세요.")
     else:
         st.success("### 📊 AI 매니저의 가치 분석 리포트")
         
-        # AI 분석 중 표시
-        with st.spinner("AI가 분석 중입니다..."):
-            try:
-                # Gemini API에 전달할 프롬프트 작성
-                prompt = f"""초등학교 6학년 학생을 위한 합리적 소비 학습 활동입니다.
-
-상황 정보:
-- 주제: {choice_theme}
-- 목표 예산: {budget:,}원
-
-대안 A: {item_a}
-- 가격: {price_a:,}원
-- 평가 점수:
-"""
-                for i, crit in enumerate(criteria_list):
-                    prompt += f"  - {crit}: {scores_a[i]}/10점\n"
-                prompt += f"- 평균 만족도: {avg_a:.1f}/10점\n\n"
-
-                prompt += f"""대안 B: {item_b}
-- 가격: {price_b:,}원
-- 평가 점수:
-"""
-                for i, crit in enumerate(criteria_list):
-                    prompt += f"  - {crit}: {scores_b[i]}/10점\n"
-                prompt += f"- 평균 만족도: {avg_b:.1f}/10점\n\n"
-
-                prompt += """다음 내용을 초등학교 6학년 학생이 이해하기 쉽게 분석해주세요:
-1. 예산 범위 내에서 어떤 대안이 합리적인지
-2. 각 평가 기준(맛, 디자인 등)을 고려한 종합적 분석
-3. 기회비용 개념을 설명
-4. 가격 대비 만족도를 고려한 추천
-5. 최종 선택에 대한 조언
-
-친근하고 격려하는 톤으로 작성해주세요."""
-
-                # Gemini API 요청
-                api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={GOOGLE_API_KEY}"
-                
-                payload = {
-                    "contents": [{
-                        "parts": [{"text": prompt}]
-                    }]
-                }
-                
-                headers = {
-                    "Content-Type": "application/json"
+        # 후보별 비교표 (추천 순서: 순위 1등이 기본 분석과 기록의 추천과 같음)
+        st.dataframe(
+            [
+                {
+                    f"순위 ({evaluation.rank_label} 높은 순)": rank + 1,
+                    "후보": names[i],
+                    "가격(원)": f"{prices[i]:,}",
+                    "평균 만족도": round(float(evaluation.averages[i]), 1),
+                    "만원당 만족도": round(float(evaluation.value_per_won[i]), 2) if evaluation.affordable[i] else None,
+                    "비고": "예산 초과" if not evaluation.affordable[i] else ("더 싸고 좋은 후보가 있음" if evaluation.dominated[i] else ""),
                 }
-                
-                response = requests.post(api_url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                # 응답 파싱
-                result = response.json()
-                
-                if "candidates" in result and len(result["candidates"]) > 0:
-                    ai_response = result["candidates"][0]["content"]["parts"][0]["text"]
-                    st.markdown(ai_response)
-                else:
-                    # API 응답이 없을 경우 기본 분석 제공
-                    value_a = avg_a / price_a * 10000 if price_a <= budget else -1
-                    value_b = avg_b / price_b * 10000 if price_b <= budget else -1
-                    
-                    if value_a > value_b:
-                        best_item, best_avg, opp_item = item_a, avg_a, item_b
-                    else:
-                        best_item, best_avg, opp_item = item_b, avg_b, item_a
-                    
-                    st.write(f"✅ 추천: **{best_item}**을(를) 선택하는 것이 더 합리적입니다.")
-                    st.write(f"- 선택한 상품의 평균 만족도: **{best_avg:.1f}점**")
-                    st.write(f"- 💡 **기회비용 확인:** {best_item}을 선택함으로써 포기하게 되는 {opp_item}의 가치도 고려했나요?")
-                    
-            except requests.exceptions.RequestException as e:
-                st.error(f"❌ API 요청 중 오류가 발생했습니다: {str(e)}")
-                # 오류 발생 시 기본 분석 제공
-                value_a = avg_a / price_a * 10000 if price_a <= budget else -1
-                value_b = avg_b / price_b * 10000 if price_b <= budget else -1
-                
-                if value_a > value_b:
-                    best_item, best_avg, opp_item = item_a, avg_a, item_b
-                else:
-                    best_item, best_avg, opp_item = item_b, avg_b, item_a
-                
-                st.write(f"✅ 추천: **{best_item}**을(를) 선택하는 것이 더 합리적입니다.")
-                st.write(f"- 선택한 상품의 평균 만족도: **{best_avg:.1f}점**")
-                st.write(f"- 💡 **기회비용 확인:** {best_item}을 선택함으로써 포기하게 되는 {opp_item}의 가치도 고려했나요?")
-            except Exception as e:
-                st.error(f"❌ 오류가 발생했습니다: {str(e)}")
+                for rank, i in enumerate(evaluation.ranking)
+            ],
+            hide_index=True,
+        )
+        
+        # Gemini API에 전달할 프롬프트 작성
+        prompt = build_analysis_prompt(choice_theme, budget, evaluation, weights)
+        client = config.client()
+
+        def fetch_ai(job):
+            # Gemini API 요청 (공용 클라이언트: 연결 재사용 + timeout 적용)
+            # 요청이 몰리면 실패 대신 대기 순서를 보여 주고 차례가 오면 보냄 (새 요청이 들어오면 취소됨)
+            ai_response = client.generate_text(prompt, on_wait=job.on_wait, system=ANALYSIS_INSTRUCTION, cancel=job.cancel_event)
+            if ai_response:
+                report_cache.put(cache_key, ai_response)
+            return ai_response
+
+        # 기본 분석(만원당 만족도)을 먼저 보여 주고 AI 리포트는 도착하면 덧붙임
+        # 기회비용 문장 바로 아래에 예산 안에서 여러 개를 함께 살 때의 최적 조합도 보여 줌
+        basket = plan_basket(evaluation, budget)
+        local_lines = local_recommendation(evaluation) + basket_lines(basket, names, budget)
+        view = show_report(local_lines, fetch_ai, cache_key, cache=report_cache, progressive=quick_first, retry=requested)
+        
+        # 교사 검토용 기록 (batch_grade.py 입력과 같은 형식이라 다시 채점할 수도 있음, AI 리포트가 도착한 뒤 요청마다 한 번)
+        if view.done:
+            log_event_once(
+                "20231520file1.py", "report", request, theme=choice_theme, budget=budget, alternatives=alternatives_record(evaluation),
+                weights=weights, recommended=names[evaluation.best],
+                basket=[names[i] for i in basket.best.items],
+                source="ai" if view.ai_report else "local", report=view.ai_report or "\n".join(local_lines),
+            )
         
         # [cite_start]비판적 사고 유도 [cite: 87, 88]
         st.info("⚠️ AI는 수치로만 계산합니다. 여러분의 특별한 취향이나 상황에 따라 결과는 달라질 수 있습니다.")
@@ -204,3 +175,11 @@ if st.button("🤖 AI 매니저에게 합리성 분석 요청하기"):
 # [cite_start]6. 윤리적 고려 및 성찰 (AI 리터러시 목표 연계) [cite: 147, 148]
 st.divider()
 st.caption("※ 주의: AI의 추천은 참고 자료일 뿐입니다. 최종 결정은 여러분의 가치관에 따라 직접 내리세요.")
+
+# 리포트 캐시 현황 (같은 입력으로 API 호출을 아낀 횟수)
+cache_stats = report_cache.stats()
+st.caption(f"📦 리포트 캐시: 재사용 {cache_stats['hits']}회 / 새로 요청 {cache_stats['misses']}회 / 저장된 리포트 {cache_stats['size']}개")
+flight_stats = config.client().flight.stats()
+st.caption(f"🔗 동시 요청 합치기: 실제 호출 {flight_stats['leaders']}회 / 합쳐진 요청 {flight_stats['coalesced']}회 / 실패 {flight_stats['failures']}회")
+
+rerun.finish()
@@ -1,11 +1,20 @@
 import streamlit as st
 import random
 import time
+from typewriter import type_out
+from image_assets import get_image_cache
+from message_store import MessageStore, show_earlier_button
+from event_log import log_event
+from answer_matcher import AnswerIndex
+from metrics import RerunTimer
 
 # [기능/의도 설명형 주석]
 # 학생들의 흥미 유발을 위해 앱 상단에 귀여운 동물 아이콘과 제목을 설정함
 st.set_page_config(page_title="나는 누구일까요?", page_icon="🐾")
 
+# 재실행 시간 측정 (교사용 지표)
+rerun = RerunTimer("FinalTest.py")
+
 # 퀴즈 데이터: 3학년 과학 교과서에 나오는 동물들의 특징 (CK)
 quiz_data = {
     "개구리": ["나는 물에서도 살고 땅에서도 살아요.", "나는 뒷다리가 튼튼해서 점프를 잘해요.", "어릴 때는 올챙이라고 불려요."],
@@ -14,6 +23,23 @@ quiz_data = {
     "토끼": ["귀가 아주 길어요.", "깡충깡충 잘 뛰어요.", "당근을 좋아해요."]
 }
 
+# 정답으로 함께 인정할 다른 이름 (오타, 띄어쓰기, "호랑이야" 같은 말끝은 따로 적지 않아도 인정됨)
+answer_synonyms = {
+    "개구리": ["frog"],
+    "호랑이": ["범", "tiger"],
+    "펭귄": ["penguin"],
+    "토끼": ["산토끼", "집토끼", "rabbit"],
+}
+
+
+@st.cache_resource
+def get_answer_index(entries):
+    # 정답 색인은 서버 프로세스당 한 번만 만듦
+    return AnswerIndex(entries)
+
+
+answer_index = get_answer_index(tuple((animal, tuple(answer_synonyms.get(animal, ()))) for animal in quiz_data))
+
 # [기능 추가] 정답 시 보여줄 동물 이미지 URL 사전
 # 정답을 맞혔을 때 시각적 보상을 제공하여 학습 효과를 높임 (TK)
 image_data = {
@@ -23,6 +49,10 @@ image_data = {
     "토끼": "https://upload.wikimedia.org/wikipedia/commons/thumb/1/1f/Oryctolagus_cuniculus_Rcdo.jpg/440px-Oryctolagus_cuniculus_Rcdo.jpg"
 }
 
+# 이미지는 서버 시작 시 뒤에서 한 번만 받아 300px 썸네일로 캐시해 두고 메모리에서 바로 보여 줌
+# (아직 준비되지 않았거나 받지 못한 이미지는 원래 URL로 보여 주고, 받지 못한 것은 나중에 다시 시도함)
+animal_images = get_image_cache(tuple(image_data.items()))
+
 # 사이드바: 게임 규칙 설명 및 리셋 기능
 with st.sidebar:
     st.header("🔍 탐구 규칙")
@@ -30,10 +60,13 @@ with st.sidebar:
     st.write("2. 설명을 잘 읽고 어떤 동물인지 맞춰보세요.")
     st.write("3. '힌트 줘'라고 입력하면 다음 특징을 알려줍니다.")
     
+    # 타자 효과를 끄면 답변이 바로 나타남
+    typing_effect = st.toggle("타자 효과", value=True)
+    
     # [버그 수정]
     # 버튼 클릭 시 대화 기록을 빈 리스트가 아닌 '초기 인사말'이 담긴 리스트로 초기화함
     if st.button("새로운 문제 시작하기"):
-        st.session_state.messages = [{'role': 'assistant', 'content': '안녕! 나는 동물 박사야. 지금부터 내가 설명하는 동물이 무엇인지 맞춰봐! (시작하려면 "시작"이라고 말해줘)'}]
+        st.session_state.messages = MessageStore([{'role': 'assistant', 'content': '안녕! 나는 동물 박사야. 지금부터 내가 설명하는 동물이 무엇인지 맞춰봐! (시작하려면 "시작"이라고 말해줘)'}])
         st.session_state.current_animal = None
         st.session_state.hint_step = 0
         st.rerun()
@@ -43,21 +76,25 @@ st.title("🐾 나는 누구일까요?\n(동물 박사 퀴즈)")
 st.caption("AI 챗봇이 설명하는 동물의 특징을 듣고 정답을 맞춰보세요!")
 
 # 세션 상태 초기화: 앱이 처음 실행될 때 기본 변수들을 설정함
+# 대화 기록은 최근 메시지만 메모리에 두고 오래된 메시지는 파일로 내리는 저장소에 둠
 if "messages" not in st.session_state:
-    st.session_state.messages = [{'role': 'assistant', 'content': '안녕! 나는 동물 박사야. 지금부터 내가 설명하는 동물이 무엇인지 맞춰봐! (시작하려면 "시작"이라고 말해줘)'}]
+    st.session_state.messages = MessageStore([{'role': 'assistant', 'content': '안녕! 나는 동물 박사야. 지금부터 내가 설명하는 동물이 무엇인지 맞춰봐! (시작하려면 "시작"이라고 말해줘)'}])
 
 # 현재 문제가 없다면 새로운 문제를 랜덤으로 출제함
 if "current_animal" not in st.session_state or st.session_state.current_animal is None:
     st.session_state.current_animal = random.choice(list(quiz_data.keys()))
     st.session_state.hint_step = 0 
+    st.session_state.question_started = time.time()
 
 # 화면에 기존 대화 내용을 출력 (UI 유지)
-for message in st.session_state.messages:
+# 최근 메시지만 그리고, 더 오래된 것은 "이전 대화 더 보기"로 불러옴
+shown = show_earlier_button(st.session_state.messages)
+for message in st.session_state.messages.latest(shown):
     with st.chat_message(message['role']):
         st.markdown(message['content'])
         # [기능 추가] 만약 메시지에 이미지가 포함되어 있다면(image_url 키가 있다면) 이미지 출력
         if 'image_url' in message:
-             st.image(message['image_url'], width=300)
+             st.image(animal_images.source(message['image_url']), width=300)
 
 # 사용자 입력 처리
 if prompt := st.chat_input("정답을 입력하거나 '힌트'라고 말해보세요."):
@@ -67,17 +104,19 @@ if prompt := st.chat_input("정답을 입력하거나 '힌트'라고 말해보
 
     with st.chat_message('assistant'):
         message_placeholder = st.empty()
-        full_response = ""
         
         target_animal = st.session_state.current_animal
         show_image = False # 이미지를 보여줄지 여부 결정 변수
         
         # 1. 시작 명령어 처리
         if prompt == "시작":
+             result = "start"
+             st.session_state.question_started = time.time() # 맞히기까지 걸린 시간은 "시작"부터 잼
              assistant_response = f"좋아! 첫 번째 힌트야. \n\n💡 {quiz_data[target_animal][0]}"
         
-        # 2. 정답 처리
-        elif target_animal in prompt:
+        # 2. 정답 처리 (오타나 자모 실수가 조금 있어도 가장 가까운 정답이 문제의 동물이면 인정)
+        elif target_animal in prompt or getattr(answer_index.match(prompt), "answer", None) == target_animal:
+            result = "correct"
             assistant_response = f"정답이야! 👏 나는 '{target_animal}'(이)야. 참 잘했어! \n\n(아래 사진을 봐! 정말 귀엽지?)"
             st.balloons() 
             show_image = True # 정답이므로 이미지를 보여주도록 설정
@@ -86,27 +125,35 @@ if prompt := st.chat_input("정답을 입력하거나 '힌트'라고 말해보
         elif "힌트" in prompt or "모르겠어" in prompt:
             st.session_state.hint_step += 1
             if st.session_state.hint_step < len(quiz_data[target_animal]):
+                result = "hint"
                 assistant_response = f"그럴 수 있어. 더 자세한 힌트를 줄게! \n\n💡 {quiz_data[target_animal][st.session_state.hint_step]}"
             else:
+                result = "revealed"
                 assistant_response = f"모든 힌트를 다 줬어! 정답은 바로... '{target_animal}'였단다! 다시 도전해볼래?"
                 show_image = True # 못 맞췄더라도 정답 공개 시 이미지 보여줌
         
         # 4. 오답 처리
         else:
+            result = "wrong"
             assistant_response = "음, 아쉽게도 정답이 아니야. 다시 한번 생각해보거나 '힌트'라고 말해봐!"
 
-        # 타자 효과 출력
-        for chunk in assistant_response:
-            full_response += chunk
-            time.sleep(0.05)
-            message_placeholder.markdown(full_response + "▌")
-        
-        message_placeholder.markdown(full_response)
-        
-        # [기능 추가] 정답을 맞히거나 힌트가 끝났을 때 이미지 출력
+        # 교사 검토용 기록: 어떤 동물 문제에서 몇 번째 힌트까지 보고 무엇을 답했는지, 문제를 받고 얼마나 지났는지
+        seconds = round(time.time() - st.session_state.question_started, 1)
+        log_event("FinalTest.py", "quiz", animal=target_animal, answer=prompt, result=result, hint_step=st.session_state.hint_step, seconds=seconds)
+
+        # 대화 기록에 먼저 저장함: 타자 효과 도중 학생이 다음 메시지를 보내 스크립트가 멈춰도
+        # 답변이 사라지지 않고, 다음 화면에서는 효과 없이 바로 보임
         if show_image:
-            st.image(image_data[target_animal], width=300)
             # 대화 기록에 저장할 때 이미지 정보도 같이 저장 (나중에 다시 볼 때도 나오게 함)
-            st.session_state.messages.append({'role': 'assistant', 'content': full_response, 'image_url': image_data[target_animal]})
+            st.session_state.messages.append({'role': 'assistant', 'content': assistant_response, 'image_url': image_data[target_animal]})
         else:
-            st.session_state.messages.append({'role': 'assistant', 'content': full_response})
\ No newline at end of file
+            st.session_state.messages.append({'role': 'assistant', 'content': assistant_response})
+
+        # 타자 효과 출력 (길이와 상관없이 짧은 시간 안에 끝남)
+        type_out(message_placeholder, assistant_response, animate=typing_effect)
+        
+        # [기능 추가] 정답을 맞히거나 힌트가 끝났을 때 이미지 출력
+        if show_image:
+            st.image(animal_images.source(image_data[target_animal]), width=300)
+
+rerun.finish()
\ No newline at end of file
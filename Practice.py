@@ -1,86 +1,146 @@
 import streamlit as st
-import requests
-import os
-from dotenv import load_dotenv
-
-# .env 파일에서 환경 변수 로드
-load_dotenv()
+from app_config import require_config
+from gemini_client import extract_text
+from chat_context import ChatContext
+from message_store import MessageStore, show_earlier_button
+from event_log import log_event
+from ai_jobs import cancel_current, clear, current_job, submit, wait_for
+from semantic_cache import get_semantic_cache
+from metrics import METRICS, RerunTimer
 
 # 페이지 설정
 st.set_page_config(page_title="Gemini 챗봇", page_icon="🤖")
 
-# API 키 확인
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+# 재실행 시간 측정 (교사용 지표)
+rerun = RerunTimer("Practice.py")
 
-if not GOOGLE_API_KEY or GOOGLE_API_KEY == "your_api_key_here":
-    st.error("⚠️ .env 파일에 GOOGLE_API_KEY를 설정해주세요!")
-    st.stop()
+# API 키와 모델 이름 확인 (서버 프로세스당 한 번만 읽고, 문제가 있으면 안내 후 멈춤)
+config = require_config("gemini-2.5-flash")
 
 # 제목
 st.title("🤖 Gemini 챗봇")
 st.caption("Google Gemini API를 사용하는 챗봇입니다")
 
-# 대화 기록 초기화
+# 스트리밍 모드: 답변이 만들어지는 대로 글자를 먼저 보여 주어 첫 글자까지의 대기 시간을 줄임
+with st.sidebar:
+    streaming = st.toggle("답변을 실시간으로 보기", value=True)
+    # 끄면 비슷한 질문이 있어도 항상 Gemini에게 새로 물어봄
+    reuse_answers = st.toggle("비슷한 질문은 저장된 답 보기", value=True)
+
+# 반 전체가 함께 쓰는 비슷한 질문 답변 저장소 (서버 프로세스당 하나)
+semantic_cache = get_semantic_cache()
+
+# 대화 기록 초기화 (최근 메시지만 메모리에 두고 오래된 메시지는 파일로 내리는 저장소)
 if "messages" not in st.session_state:
-    st.session_state.messages = [{"role": "assistant", "content": "안녕하세요! 무엇을 도와드릴까요?"}]
+    # 인사말은 화면에만 보여 주고 모델에는 보내지 않음 (ui_only)
+    st.session_state.messages = MessageStore([{"role": "assistant", "content": "안녕하세요! 무엇을 도와드릴까요?", "ui_only": True}])
 
-# 대화 기록 표시
-for message in st.session_state.messages:
+# 대화 맥락 관리: 최근 턴만 그대로 보내고 오래된 턴은 요약으로 접어서 요청 크기를 일정하게 유지
+if "chat_context" not in st.session_state:
+    st.session_state.chat_context = ChatContext()
+
+# 대화 기록 표시 (최근 메시지만 그리고, 더 오래된 것은 "이전 대화 더 보기"로 불러옴)
+shown = show_earlier_button(st.session_state.messages)
+for message in st.session_state.messages.latest(shown):
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
 
+# 답변은 뒤에서 받아 옴 (ai_jobs): 기다리는 동안 사이드바를 만지거나 새 질문을 보내도 답변이 사라지지 않고,
+# 새 질문을 보내면 아직 받는 중인 앞 질문의 답변은 멈춤 (세션마다 요청은 하나만)
+def finish_answer(job):
+    # 끝난 답변을 대화 기록에 옮기고 화면에 그림
+    # 요청 오류를 구분하려고 씀 (API를 부를 때만 불러와 첫 화면을 빨리 띄움)
+    import requests
+    
+    clear(job)
+    question = job.meta["question"]
+    try:
+        assistant_response = job.result()
+    except requests.exceptions.RequestException as e:
+        METRICS.inc("app_errors_total", app="Practice.py", type=type(e).__name__)
+        log_event("Practice.py", "chat", question=question, error=str(e))
+        message = {"role": "assistant", "content": f"❌ API 요청 중 오류가 발생했습니다: {str(e)}", "ui_only": True}
+    except Exception as e:
+        METRICS.inc("app_errors_total", app="Practice.py", type=type(e).__name__)
+        log_event("Practice.py", "chat", question=question, error=str(e))
+        message = {"role": "assistant", "content": f"❌ 오류가 발생했습니다: {str(e)}", "ui_only": True}
+    else:
+        if not assistant_response:
+            assistant_response = "죄송합니다. 응답을 생성할 수 없습니다."
+        elif job.meta["context_free"]:
+            semantic_cache.put(question, assistant_response)
+        message = {"role": "assistant", "content": assistant_response}
+        # 교사 검토용 기록 (디스크 쓰기는 뒤쪽 스레드가 함)
+        log_event("Practice.py", "chat", question=question, answer=assistant_response, streaming=job.meta["streaming"], cached_from=None)
+    st.session_state.messages.append(message)
+    with st.chat_message("assistant"):
+        st.markdown(message["content"])
+
+
+def show_pending(job):
+    # 받은 만큼 바로바로 보여 주고, 요청이 몰리면 오류 대신 대기 순서를 보여 줌
+    if job.partial:
+        st.markdown(job.partial + "▌")
+    else:
+        st.markdown(job.notice or "생성 중...")
+
+
+# 지난 재실행 사이에 답변이 끝났으면 대화 기록에 옮김
+job = current_job()
+if job is not None and job.done():
+    finish_answer(job)
+
 # 사용자 입력 처리
 if prompt := st.chat_input("메시지를 입력하세요..."):
+    # 아직 받는 중인 앞 질문의 답변은 멈추고, 받은 데까지는 화면에 남겨 둠 (모델에는 보내지 않음)
+    stopped = cancel_current()
+    if stopped is not None:
+        stopped_message = (stopped.partial + "\n\n" if stopped.partial else "") + "⏹️ 새 질문이 들어와 앞 질문의 답변은 멈췄어요."
+        st.session_state.messages.append({"role": "assistant", "content": stopped_message, "ui_only": True})
+        with st.chat_message("assistant"):
+            st.markdown(stopped_message)
+    
     # 사용자 메시지 추가 및 표시
     st.session_state.messages.append({"role": "user", "content": prompt})
     
     with st.chat_message("user"):
         st.markdown(prompt)
     
-    # Gemini API 호출
-    with st.chat_message("assistant"):
-        message_placeholder = st.empty()
-        message_placeholder.markdown("생성 중...")
-        
-        try:
-            # Gemini API 요청
-            api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini2.5-flash:generateContent?key={GOOGLE_API_KEY}"
-            
-            # 대화 기록을 Gemini API 형식으로 변환
-            contents = []
-            for msg in st.session_state.messages:
-                if msg["role"] == "user":
-                    contents.append({"role": "user", "parts": [{"text": msg["content"]}]})
-                elif msg["role"] == "assistant":
-                    contents.append({"role": "model", "parts": [{"text": msg["content"]}]})
-            
-            payload = {
-                "contents": contents
-            }
-            
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(api_url, json=payload, headers=headers)
-            response.raise_for_status()
-            
+    # Gemini API 요청 (공용 클라이언트: 연결 재사용 + timeout 적용)
+    client = config.client()
+    
+    # 대화 기록을 Gemini API 형식으로 변환 (최근 턴 + 이전 대화 요약, 오류/인사말 제외)
+    contents = st.session_state.chat_context.build(st.session_state.messages)
+    
+    # 앞선 대화 없이 묻는 첫 질문은 다른 학생이 비슷하게 물었던 답이 있으면 API를 부르지 않고 보여 줌
+    # (앞 대화에 기대는 질문은 같은 말이라도 답이 다르므로 찾지도 저장하지도 않음)
+    context_free = len(contents) == 1
+    hit = semantic_cache.lookup(prompt, bypass=not reuse_answers) if context_free else None
+    
+    if hit is not None:
+        with st.chat_message("assistant"):
+            st.markdown(hit.answer)
+            st.caption(f"💾 비슷한 질문(\"{hit.question}\")에 했던 답을 다시 보여 드려요.")
+        st.session_state.messages.append({"role": "assistant", "content": hit.answer})
+        log_event("Practice.py", "chat", question=prompt, answer=hit.answer, streaming=streaming, cached_from=hit.question)
+    else:
+        def answer(job):
+            # 뒤쪽 스레드에서 실행됨 (화면에 쓰지 않고 job에만 남김, 멈추면 그 자리에서 그만 받음)
+            if streaming:
+                # 도착한 조각을 이어 붙여 두면 화면이 받은 만큼 보여 줌
+                for chunk in client.stream_text(contents, on_wait=job.on_wait, cancel=job.cancel_event):
+                    job.partial += chunk
+                return job.partial
             # 응답 파싱
-            result = response.json()
-            
-            if "candidates" in result and len(result["candidates"]) > 0:
-                assistant_response = result["candidates"][0]["content"]["parts"][0]["text"]
-            else:
-                assistant_response = "죄송합니다. 응답을 생성할 수 없습니다."
-            
-            message_placeholder.markdown(assistant_response)
-            st.session_state.messages.append({"role": "assistant", "content": assistant_response})
-            
-        except requests.exceptions.RequestException as e:
-            error_message = f"❌ API 요청 중 오류가 발생했습니다: {str(e)}"
-            message_placeholder.markdown(error_message)
-            st.session_state.messages.append({"role": "assistant", "content": error_message})
-        except Exception as e:
-            error_message = f"❌ 오류가 발생했습니다: {str(e)}"
-            message_placeholder.markdown(error_message)
-            st.session_state.messages.append({"role": "assistant", "content": error_message})
\ No newline at end of file
+            return extract_text(client.generate(contents, on_wait=job.on_wait, cancel=job.cancel_event))
+        
+        submit(("chat", len(st.session_state.messages)), answer, question=prompt, streaming=streaming, context_free=context_free)
+
+# 받는 중인 답변은 그 부분만 다시 그리다가, 다 받으면 앱을 다시 실행해 대화 기록에 옮김
+job = current_job()
+if job is not None:
+    with st.chat_message("assistant"):
+        if not wait_for(job, show_pending):
+            st.rerun()  # 그사이 끝났으면 바로 옮김
+
+rerun.finish()
\ No newline at end of file
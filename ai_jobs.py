@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from metrics import METRICS
+from single_flight import Cancelled
+
+# AI 요청을 뒤에서 보내기 (세션마다 하나씩)
+# 스크립트 안에서 requests.post를 기다리면 학생이 슬라이더를 움직이거나 새 메시지를 보낼 때 Streamlit이
+# 스크립트를 멈추는데, HTTP 호출은 끝까지 가서 한도만 쓰고 결과는 버려짐. 버튼 안에서만 그린 리포트는
+# 다음 재실행 때 사라져 학생이 다시 누르게 됨.
+#
+# 그래서 AI 호출은 서버 프로세스가 함께 쓰는 스레드 풀(WORKERS개)에서 실행하고, 진행 중인 요청(AIJob)은
+# 세션 상태에 둠. 스크립트는 기다리지 않고 끝나며, 재실행해도 같은 요청을 다시 보내지 않고 결과가 오면
+# 보여 줌. 세션마다 요청은 하나만: 새 요청을 보내면 앞의 요청은 취소함. 취소된 요청은 보내기 전이면
+# 아예 보내지 않고, 재시도 대기나 스트리밍 중이면 그 자리에서 멈춤 (gemini_client의 cancel).
+# 세션마다 하나씩이므로 풀에 쌓이는 요청도 세션 수를 넘지 않음.
+
+WORKERS = int(os.getenv("AI_WORKERS", 8))
+POLL_SECONDS = 0.5  # 기다리는 동안 안내 부분만 다시 그리는 간격
+
+
+class AIJob:
+    """세션의 AI 요청 하나. fn(job)은 뒤쪽 스레드에서 실행되며 job.on_wait, job.cancel_event, job.partial을 씀."""
+
+    def __init__(self, key, meta):
+        self.key = key  # 요청 내용을 나타내는 키 (입력이 같으면 같은 키)
+        self.meta = meta  # 앱이 끝난 뒤 처리에 쓸 값 (질문 등)
+        self.cancel_event = threading.Event()
+        self.notice = None  # 차례/재시도를 기다릴 때의 안내 문구
+        self.partial = ""  # 스트리밍으로 지금까지 받은 답변
+        self.submitted = time.monotonic()
+        self.future = None
+
+    def on_wait(self, text):
+        self.notice = text
+
+    def elapsed(self):
+        return time.monotonic() - self.submitted
+
+    def done(self):
+        return self.future.done()
+
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def failed(self):
+        return self.done() and (self.future.cancelled() or self.future.exception() is not None)
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.future.cancel()  # 아직 풀에서 차례를 기다리는 중이면 바로 빠짐
+
+    def result(self):
+        """끝난 요청의 결과. 실패했으면 그 예외를 올림."""
+        return self.future.result()
+
+
+class JobPool:
+    """서버 프로세스 전체가 함께 쓰는 AI 요청용 스레드 풀.
+
+    일할 스레드가 모두 바쁘면 요청은 풀 안에서 차례를 기다리는데, 그동안은 요청 한도(RateLimiter)의 줄에도
+    서지 않아 학생에게 차례가 보이지 않음. 그래서 스레드를 기다리는 요청에도 "앞에 N명"(실행 중인 요청 +
+    먼저 온 대기 요청)을 job.on_wait로 알려 줌.
+    """
+
+    def __init__(self, workers=WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-job")
+        self._lock = threading.Lock()
+        self._waiting = deque()  # 스레드를 기다리는 요청 (먼저 온 순)
+        self.running = 0
+
+    def submit(self, job, fn):
+        with self._lock:
+            self._waiting.append(job)
+        job.future = self._executor.submit(self._run, job, fn)
+        # 스레드를 받기 전에 취소되면 풀이 _run을 부르지 않으므로 여기서 줄에서 뺌
+        job.future.add_done_callback(lambda future: self._leave(job))
+        self._notify()
+
+    def _leave(self, job):
+        with self._lock:
+            if job not in self._waiting:
+                return
+            self._waiting.remove(job)
+        self._notify()
+
+    def _notify(self):
+        with self._lock:
+            waiting, running = list(self._waiting), self.running
+        for position, job in enumerate(waiting):
+            job.on_wait(f"⏳ 요청이 많아 차례를 기다리고 있어요. (앞에 {running + position}명)")
+
+    def _run(self, job, fn):
+        with self._lock:
+            if job in self._waiting:
+                self._waiting.remove(job)
+            self.running += 1
+        job.notice = None  # 이제부터 차례 안내는 요청 한도의 줄(gemini_client)이 함
+        self._notify()
+        try:
+            if job.cancelled():
+                raise Cancelled()
+            return fn(job)
+        finally:
+            with self._lock:
+                self.running -= 1
+            METRICS.observe("ai_job_seconds", job.elapsed())
+
+
+@st.cache_resource
+def get_pool():
+    return JobPool()
+
+
+def current_job(key=None):
+    """이 세션의 AI 요청. key를 주면 그 요청일 때만 돌려줌."""
+    job = st.session_state.get("ai_job")
+    if job is None or (key is not None and job.key != key):
+        return None
+    return job
+
+
+def submit(key, fn, retry=False, **meta):
+    """이 세션의 AI 요청을 뒤에서 보내고 AIJob을 돌려줌.
+
+    같은 key의 요청이 이미 있으면 새로 보내지 않고 그것을 돌려줌 (retry=True면 실패한 요청은 다시 보냄).
+    다른 요청이 진행 중이면 취소함.
+    """
+    job = st.session_state.get("ai_job")
+    if job is not None and job.key == key and not job.cancelled() and not (retry and job.failed()):
+        return job
+    if job is not None and not job.done():
+        job.cancel()
+        METRICS.inc("ai_jobs_cancelled_total")
+    job = AIJob(key, meta)
+    get_pool().submit(job, fn)
+    METRICS.inc("ai_jobs_submitted_total")
+    st.session_state.ai_job = job
+    return job
+
+
+def cancel_current():
+    """진행 중인 요청을 취소하고 세션에서 치움 (새 질문을 보내기 전 등). 취소한 요청을 돌려줌 (없으면 None)."""
+    job = st.session_state.get("ai_job")
+    if job is None or job.done():
+        return None
+    job.cancel()
+    METRICS.inc("ai_jobs_cancelled_total")
+    clear(job)
+    return job
+
+
+def clear(job):
+    """끝난 요청을 다 처리했으면 세션에서 치움."""
+    if st.session_state.get("ai_job") is job:
+        del st.session_state.ai_job
+
+
+def wait_for(job, render):
+    """요청이 끝날 때까지 POLL_SECONDS마다 render(job)이 그린 부분만 다시 그림. 끝나면 앱을 한 번 다시 실행해
+    결과를 제자리에 그리게 함. 이미 끝났으면 아무것도 그리지 않고 False."""
+    if job.done():
+        return False
+
+    @st.fragment(run_every=POLL_SECONDS)
+    def pending():
+        if job.done():
+            st.rerun()
+        render(job)
+
+    pending()
+    return True
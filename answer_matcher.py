@@ -0,0 +1,193 @@
+import re
+from collections import defaultdict
+from typing import NamedTuple
+
+# 퀴즈 정답 판정 (오타/띄어쓰기/자모 실수 허용)
+# "target in prompt"는 "호랭이", "펭 귄", "코기리"처럼 조금만 틀려도 오답 처리함.
+# 정답과 동의어를 한 번만 색인해 두고, 학생 입력을 자모(ㅎㅗㄹㅏㅇㅇㅣ) 단위로 풀어 편집 거리로 비교함.
+#
+# 색인: (자모 3-gram, 자모 길이) -> 그 조각을 가진 그 길이의 표기 목록
+# 찾기: 허용 거리가 k이면 길이가 k 이내로 다른 표기만 보면 되므로 길이마다 따로 찾음. 그 길이의 목록에서
+#       입력의 3-gram 가운데 가장 드문 것 (k*3+1)개만 보고 후보를 모음. 편집 하나는 조각을 많아야 3개
+#       망가뜨리므로 거리가 k 이하인 표기는 이 중 적어도 하나를 공유함(q-gram 접두 필터). 후보가 빠지지
+#       않으면서 드문 조각만 보므로 정답 수가 수천~수만 개로 늘어도 찾는 시간이 거의 그대로임.
+#       후보는 공유 조각 수로 한 번 더 거른 뒤 k를 넘으면 바로 멈추는 편집 거리로 확인함.
+
+CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+NGRAM = 3
+# 답 뒤에 붙는 말 ("호랑이야", "펭귄입니다"). 떼어 본 것과 떼지 않은 것을 모두 비교함
+ENDINGS = ("입니다", "이에요", "예요", "이야", "이다", "야", "요", "다", "은", "는", "이", "가", "을", "를")
+_NON_WORD = re.compile(r"[^0-9a-z가-힣ㄱ-ㅣ\s]")
+
+
+def normalize(text):
+    """소문자로 바꾸고 문장 부호를 뺌 (띄어쓰기는 남김)."""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def jamo(text):
+    """한글 음절을 초성/중성/종성 자모로 풀어 씀. 띄어쓰기는 뺌. "호랑이" -> "ㅎㅗㄹㅏㅇㅇㅣ"."""
+    out = []
+    for char in text:
+        if '가' <= char <= '힣':
+            code = ord(char) - 0xAC00
+            out.append(CHO[code // 588])
+            out.append(JUNG[code // 28 % 21])
+            if code % 28:
+                out.append(JONG[code % 28])
+        elif not char.isspace():
+            out.append(char)
+    return "".join(out)
+
+
+def ngrams(text, n=NGRAM):
+    # 앞뒤 경계 표시를 붙여 짧은 말도 조각이 생기게 함
+    padded = f"^{text}$"
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def max_distance(length):
+    """자모 길이에 따라 허용할 편집 거리. 대략 자모 여섯 개에 하나까지만 틀려도 됨.
+
+    두 글자 낱말(자모 5개 이하)은 자모 하나만 바뀌어도 다른 낱말이 되기 쉬우므로
+    ("토끼"/"도끼", "사슴"/"사슬") 똑같이 써야 맞음.
+    """
+    if length <= 5:
+        return 0
+    if length < 12:
+        return 1
+    return 2
+
+
+def bounded_levenshtein(a, b, k):
+    """a, b의 편집 거리. k를 넘으면 계산을 멈추고 k + 1을 돌려줌."""
+    if abs(len(a) - len(b)) > k:
+        return k + 1
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        # 대각선에서 k칸 밖은 어차피 k를 넘으므로 계산하지 않음
+        lo, hi = max(1, i - k), min(len(b), i + k)
+        if lo > 1:
+            current[lo - 1] = k + 1
+        row_min = current[0] if lo == 1 else k + 1
+        for j in range(lo, hi + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if hi < len(b):
+            current[hi + 1:] = [k + 1] * (len(b) - hi)
+        if row_min > k:
+            return k + 1
+        previous = current
+    return min(previous[-1], k + 1)
+
+
+class Match(NamedTuple):
+    answer: str  # 대표 정답
+    form: str  # 실제로 맞은 표기 (정답 또는 동의어)
+    distance: int  # 자모 편집 거리
+
+
+class AnswerIndex:
+    """정답과 동의어 목록을 한 번 색인해 두고 학생 입력과 맞춰 봄.
+
+    entries: {정답: [동의어, ...]} 또는 (정답, [동의어, ...]) 목록
+    """
+
+    def __init__(self, entries):
+        if isinstance(entries, dict):
+            entries = entries.items()
+        self.answers = []  # 표기 번호 -> 대표 정답
+        self.forms = []  # 표기 번호 -> 원래 표기
+        self.keys = []  # 표기 번호 -> 자모 문자열
+        self.grams = []  # 표기 번호 -> 자모 3-gram 집합
+        self.exact = {}  # 자모 문자열 -> 표기 번호
+        postings = defaultdict(list)
+        for answer, synonyms in entries:
+            for form in (answer, *synonyms):
+                key = jamo(normalize(form))
+                if not key or key in self.exact:
+                    continue
+                form_id = len(self.forms)
+                self.answers.append(answer)
+                self.forms.append(form)
+                self.keys.append(key)
+                self.grams.append(frozenset(ngrams(key)))
+                self.exact[key] = form_id
+                for gram in self.grams[form_id]:
+                    postings[gram, len(key)].append(form_id)
+        self.postings = {gram: tuple(ids) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.forms)
+
+    def _lookup(self, key):
+        # 한 낱말(자모 문자열)에 가장 가까운 표기 (form_id, 거리). 없으면 None
+        form_id = self.exact.get(key)
+        if form_id is not None:
+            return form_id, 0
+        k = max_distance(len(key))
+        if k == 0:
+            return None
+        grams = ngrams(key)
+        best = None
+        # 길이가 같은 것부터 봄 (모음 하나 틀린 오타가 가장 흔함)
+        for length in sorted(range(len(key) - k, len(key) + k + 1), key=lambda n: abs(n - len(key))):
+            limit = min(k, max_distance(length))
+            if best is not None:
+                limit = min(limit, best[1] - 1)
+            if abs(length - len(key)) > limit:
+                continue
+            # 이 길이에서 가장 드문 조각 limit*NGRAM+1개 (색인에 없는 조각은 후보가 0개라 가장 앞에 옴)
+            lists = sorted((self.postings.get((g, length), ()) for g in grams), key=len)[:limit * NGRAM + 1]
+            seen = set()
+            for ids in lists:
+                for form_id in ids:
+                    if form_id in seen:
+                        continue
+                    seen.add(form_id)
+                    # 편집 거리를 계산하기 전에 공유 조각 수로 먼저 거름: 거리가 limit 이하이면
+                    # 입력 조각 가운데 망가지는 것은 많아야 limit*NGRAM개
+                    if len(grams & self.grams[form_id]) < len(grams) - limit * NGRAM:
+                        continue
+                    distance = bounded_levenshtein(key, self.keys[form_id], limit)
+                    if distance <= limit:
+                        if distance == 1:
+                            return form_id, 1  # 정확히 같은 표기는 위에서 이미 확인했으므로 이보다 가까운 것은 없음
+                        best, limit = (form_id, distance), distance - 1
+        return best
+
+    def _candidates(self, text):
+        # 입력 전체(띄어쓰기 무시)와 낱말마다, 끝에 붙은 말을 두 겹까지 뗀 것("펭귄이요" -> "펭귄")도 비교 대상으로 씀
+        words = normalize(text).split()
+        seen = set()
+        for word in ["".join(words)] + words:
+            forms = [word]
+            for _ in range(2):
+                forms += [f[:-len(e)] for f in forms for e in ENDINGS if f.endswith(e) and len(f) > len(e)]
+            for candidate in forms:
+                if candidate not in seen:
+                    seen.add(candidate)
+                    yield candidate
+
+    def match(self, text):
+        """입력과 가장 가까운 정답 Match. 허용 거리 안에 아무것도 없으면 None."""
+        best = None
+        for candidate in self._candidates(text):
+            found = self._lookup(jamo(candidate))
+            if found and (best is None or found[1] < best[1]):
+                best = found
+                if found[1] == 0:
+                    break
+        if best is None:
+            return None
+        form_id, distance = best
+        return Match(self.answers[form_id], self.forms[form_id], distance)
@@ -0,0 +1,106 @@
+import logging
+import os
+import re
+from typing import NamedTuple
+
+import streamlit as st
+
+from gemini_client import API_BASE, get_client
+
+# 앱 설정 (API 키, 모델 이름, API 주소)
+# 앱마다 재실행할 때마다 되풀이하던 load_dotenv(), st.secrets 확인, os.getenv를 서버 프로세스당 한 번만 함.
+# 찾는 순서: Streamlit secrets -> 환경 변수(.env 포함). 모델 이름은 GEMINI_MODEL로 바꿀 수 있음.
+# 모델 이름이 형식에 어긋나면("gemini2.5-flash") 고칠 수 있는 것은 고쳐 쓰고 서버 로그에 알림.
+#
+# 이 모듈과 gemini_client는 requests를 불러오지 않음. requests는 API를 처음 부를 때 불러오므로
+# API를 부르지 않는 첫 화면은 그만큼 빨리 뜸.
+
+DEFAULT_MODEL = "gemini-2.0-flash-exp"
+PLACEHOLDER_KEYS = {"your_api_key_here"}
+# gemini-<버전>-<이름>[-<이름>...] (예: gemini-2.5-flash, gemini-2.0-flash-exp, gemini-1.5-pro-002)
+MODEL_NAME = re.compile(r"gemini-\d+(\.\d+)?(-[0-9a-z]+)+")
+MISSING_KEY = (
+    "⚠️ Streamlit Secrets 또는 .env 파일에서 GOOGLE_API_KEY를 찾을 수 없습니다!",
+    "로컬 실행: .env 파일을 확인하세요.",
+    "Streamlit Cloud: Secrets에 GOOGLE_API_KEY를 설정하세요.",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Config(NamedTuple):
+    api_key: str  # 없으면 None
+    model: str
+    api_base: str
+    key_source: str  # "secrets", "env" (찾지 못했으면 "")
+    problems: tuple  # 화면에 보여 줄 설정 오류 (없으면 빈 튜플)
+
+    def client(self):
+        """이 설정으로 만든 공용 Gemini 클라이언트."""
+        return get_client(self.api_key, self.model, self.api_base)
+
+
+def check_model(name):
+    """모델 이름을 확인해 돌려줌. 흔한 실수(하이픈 빠짐, 대문자, 밑줄, 띄어쓰기)는 고쳐서 돌려주고,
+    고칠 수 없으면 ValueError.
+    """
+    name = name.strip()
+    if MODEL_NAME.fullmatch(name):
+        return name
+    fixed = re.sub(r"[\s_]+", "-", name.lower())
+    fixed = re.sub(r"^gemini-?(?=\d)", "gemini-", fixed)
+    fixed = re.sub(r"(?<=\d)(?=[a-z])", "-", fixed)  # "gemini-2.5flash" -> "gemini-2.5-flash"
+    if MODEL_NAME.fullmatch(fixed):
+        return fixed
+    raise ValueError(f"⚠️ 모델 이름 '{name}'이(가) 올바르지 않습니다. (예: gemini-2.5-flash)")
+
+
+def _secret(name):
+    try:
+        return st.secrets[name] if name in st.secrets else None
+    except FileNotFoundError:
+        # secrets.toml이 없음 (로컬 실행)
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def load_config(default_model=DEFAULT_MODEL):
+    """API 키, 모델 이름, API 주소를 찾아 확인함. 서버 프로세스당 (기본 모델마다) 한 번만 실행됨."""
+    # .env 파일에서 환경 변수 로드 (로컬 환경용)
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    problems = []
+
+    # Streamlit Cloud에서는 secrets, 로컬에서는 .env/환경 변수
+    api_key, key_source = _secret("GOOGLE_API_KEY"), "secrets"
+    if not api_key:
+        api_key, key_source = os.getenv("GOOGLE_API_KEY"), "env"
+    if not api_key or api_key.strip() in PLACEHOLDER_KEYS:
+        api_key, key_source = None, ""
+        problems.extend(MISSING_KEY)
+
+    requested = _secret("GEMINI_MODEL") or os.getenv("GEMINI_MODEL") or default_model
+    try:
+        model = check_model(requested)
+        if model != requested:
+            logger.warning("모델 이름 '%s'을(를) '%s'(으)로 고쳐 씁니다.", requested, model)
+    except ValueError as e:
+        model = requested
+        problems.append(str(e))
+
+    api_base = API_BASE.rstrip("/")
+    if not api_base.startswith(("http://", "https://")):
+        problems.append(f"⚠️ GEMINI_API_BASE '{api_base}'은(는) http:// 또는 https://로 시작해야 합니다.")
+
+    return Config(api_key, model, api_base, key_source, tuple(problems))
+
+
+def require_config(default_model=DEFAULT_MODEL):
+    """설정을 읽고, 문제가 있으면 안내를 보여 준 뒤 스크립트를 멈춤."""
+    config = load_config(default_model)
+    if config.problems:
+        for line in config.problems:
+            st.error(line)
+        st.stop()
+    return config
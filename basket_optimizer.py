@@ -0,0 +1,161 @@
+from math import gcd
+from typing import NamedTuple
+
+import numpy as np
+
+# 장바구니 최적화 ("30000원으로 무엇을 조합해서 살까?")
+# 대안 하나를 고르는 대신 예산 안에서 여러 상품을 함께 살 때, 평균 만족도의 합이 가장 큰 조합을 찾음.
+# 상품마다 한 번씩만 살 수 있는 0/1 배낭 문제를 동적 계획법으로 풂 (원 단위 정확).
+#
+# 표: 앞에서부터 k개 상품만 쓸 때, 가격 합이 c 이하인 조합의 최대 만족도 (k행 c열). 상품 하나를 더할 때마다
+#     행 하나를 numpy 연산 한 번으로 채움. 모든 가격의 최대공약수(보통 100원, 1000원)로 나눠 열 수를 줄이므로
+#     상품 수십 개, 예산 10만 원이어도 몇 ms면 끝나 재실행마다 계산해도 됨.
+# 차선 조합: 앞쪽 표와 뒤쪽 표를 함께 만들어 두면 "상품 i를 빼면 / 꼭 넣으면 가장 좋은 조합"을 상품마다
+#     표 두 행을 더해 한 번에 구할 수 있음. 두 번째로 좋은 조합은 반드시 이 가운데 하나임.
+
+RUNNER_UPS = 3  # 보여 줄 차선 조합 수
+
+
+class Basket(NamedTuple):
+    items: tuple  # 대안 번호 (작은 순)
+    price: int  # 가격 합 (원)
+    satisfaction: float  # 평균 만족도의 합
+
+
+class Swap(NamedTuple):
+    basket: Basket  # 바꾼 뒤의 조합
+    removed: tuple  # 최적 조합에서 빠지는 대안 번호
+    added: tuple  # 새로 들어오는 대안 번호
+    cost: float  # 포기하는 만족도 (기회비용) = 최적 조합 만족도 - 바꾼 조합 만족도
+
+
+class BasketPlan(NamedTuple):
+    best: Basket
+    runner_ups: list  # 차선 조합으로 바꾸는 Swap (조합이 겹치지 않게, 기회비용 적은 순)
+    swaps: list  # 최적 조합의 상품 하나를 빼거나 다른 상품을 꼭 넣을 때의 Swap 전체 (기회비용 적은 순)
+
+
+def _table(values, prices, capacity):
+    # table[k, c]: values[:k] 가운데 가격 합이 c 이하인 조합의 최대 만족도
+    table = np.zeros((len(values) + 1, capacity + 1), dtype=np.float32)
+    for k, (value, price) in enumerate(zip(values, prices)):
+        table[k + 1] = table[k]
+        if price <= capacity:
+            np.maximum(table[k, price:], table[k, :capacity + 1 - price] + value, out=table[k + 1, price:])
+    return table
+
+
+class BasketOptimizer:
+    """대안들의 (평균 만족도, 가격)으로 예산 안의 최적 조합과 차선 조합을 구함."""
+
+    def __init__(self, satisfaction, prices, budget):
+        satisfaction = np.asarray(satisfaction, dtype=np.float32)
+        prices = np.asarray(prices).astype(np.int64)
+        # 가격이 없거나(0원) 예산을 넘거나 만족도가 0 이하인 대안은 조합에 넣어 봐야 소용없으므로 뺌
+        self.candidates = [i for i in range(len(prices)) if 0 < prices[i] <= budget and satisfaction[i] > 0]
+        self.satisfaction = satisfaction
+        self.prices = prices
+        self.budget = int(budget)
+
+        unit = 0
+        for i in self.candidates:
+            unit = gcd(unit, int(prices[i]))
+        self.unit = unit or 1
+        self.capacity = max(0, self.budget // self.unit)
+        self._values = satisfaction[self.candidates]
+        self._weights = [int(prices[i]) // self.unit for i in self.candidates]
+        # 앞쪽 표(상품 0..k-1)와 뒤쪽 표(상품 k..n-1). 뒤쪽 표는 순서를 뒤집어 만든 뒤 행을 뒤집음
+        self._prefix = _table(self._values, self._weights, self.capacity)
+        self._suffix = _table(self._values[::-1], self._weights[::-1], self.capacity)[::-1]
+
+    def _take_prefix(self, end, c):
+        # 앞쪽 표에서 상품 0..end-1, 용량 c인 최적 조합을 거꾸로 따라가며 찾음
+        taken = []
+        for k in range(end, 0, -1):
+            if self._prefix[k, c] != self._prefix[k - 1, c]:
+                taken.append(k - 1)
+                c -= self._weights[k - 1]
+        return taken
+
+    def _take_suffix(self, start, c):
+        taken = []
+        for k in range(start, len(self._weights)):
+            if self._suffix[k, c] != self._suffix[k + 1, c]:
+                taken.append(k)
+                c -= self._weights[k]
+        return taken
+
+    def _basket(self, positions):
+        items = tuple(sorted(self.candidates[p] for p in positions))
+        index = list(items)
+        return Basket(items, int(self.prices[index].sum()), float(self.satisfaction[index].sum()))
+
+    def _best_around(self, k, capacity):
+        # 상품 k를 뺀 나머지로 용량 capacity 안의 최적 조합 (앞쪽 0..k-1 + 뒤쪽 k+1..)
+        combined = self._prefix[k, :capacity + 1] + self._suffix[k + 1, capacity::-1]
+        c = int(combined.argmax())
+        return self._take_prefix(k, c) + self._take_suffix(k + 1, capacity - c)
+
+    def best(self):
+        return self._basket(self._take_prefix(len(self._weights), self.capacity))
+
+    def without(self, k):
+        """k번째 후보(candidates 안의 위치)를 빼고 만든 최적 조합."""
+        return self._basket(self._best_around(k, self.capacity))
+
+    def including(self, k):
+        """k번째 후보를 꼭 넣고 만든 최적 조합. 그 후보 하나로 예산을 넘으면 None."""
+        capacity = self.capacity - self._weights[k]
+        if capacity < 0:
+            return None
+        return self._basket(self._best_around(k, capacity) + [k])
+
+    def plan(self, runner_ups=RUNNER_UPS):
+        best = self.best()
+        chosen = set(best.items)
+        swaps, seen = [], {best.items}
+        for k, i in enumerate(self.candidates):
+            basket = self.without(k) if i in chosen else self.including(k)
+            if basket is None:
+                continue
+            swap = Swap(
+                basket,
+                removed=tuple(sorted(chosen - set(basket.items))),
+                added=tuple(sorted(set(basket.items) - chosen)),
+                cost=best.satisfaction - basket.satisfaction,
+            )
+            swaps.append(swap)
+        swaps.sort(key=lambda s: (s.cost, s.basket.price))
+        runners = []
+        for swap in swaps:
+            if swap.basket.items not in seen:
+                seen.add(swap.basket.items)
+                runners.append(swap)
+        return BasketPlan(best, runners[:runner_ups], swaps)
+
+
+def plan_basket(evaluation, budget, runner_ups=RUNNER_UPS):
+    """평가 결과(decision_engine.Evaluation)로 예산 안의 장바구니 계획을 세움."""
+    return BasketOptimizer(evaluation.averages, evaluation.prices, budget).plan(runner_ups)
+
+
+def basket_lines(plan, names, budget):
+    """화면에 보여 줄 장바구니 설명 문장 목록 (st.write로 한 줄씩)."""
+    best = plan.best
+    if not best.items:
+        return ["🧺 예산 안에서 함께 살 수 있는 조합이 없어요."]
+    label = lambda basket: " + ".join(names[i] for i in basket.items)
+    lines = [
+        f"🧺 **{budget:,}원으로 함께 사기:** {label(best)} "
+        f"(합계 {best.price:,}원, 남는 돈 {budget - best.price:,}원, 만족도 합 {best.satisfaction:.1f}점)"
+    ]
+    for rank, swap in enumerate(plan.runner_ups, start=2):
+        change = [f"{', '.join(names[i] for i in swap.removed)} 빼기"] if swap.removed else []
+        if swap.added:
+            change.append(f"{', '.join(names[i] for i in swap.added)} 넣기")
+        basket = swap.basket
+        lines.append(
+            f"- {rank}번째 조합: {label(basket) or '아무것도 사지 않기'} ({basket.price:,}원) — "
+            f"{' / '.join(change)}: 기회비용 만족도 {swap.cost:.1f}점"
+        )
+    return lines
@@ -0,0 +1,192 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dotenv import load_dotenv
+
+from app_config import DEFAULT_MODEL, check_model
+from consumer_report import ANALYSIS_INSTRUCTION, RANK_BY, build_analysis_prompt, local_recommendation
+from decision_engine import evaluate
+from gemini_client import GeminiClient
+
+# 수업 후 학생 선택 결과 일괄 채점
+# 학생들이 앱에 입력한 주제/예산/가격/점수를 CSV나 JSONL로 모아 두면, 앱과 같은 점수 계산과
+# 같은 프롬프트로 학생별 리포트를 만들어 줌. 입력은 한 줄씩 읽어 가며 정해진 수의 스레드로
+# Gemini를 호출하고, 결과는 끝나는 대로 한 줄씩 저장해서 중간에 멈춰도 이어서 할 수 있음.
+#
+# 입력 형식 (앱의 입력 항목 이름과 같음):
+#   CSV:   student,theme,budget,item_a,price_a,a_맛,a_양(포만감),...,item_b,price_b,b_맛,...
+#   JSONL: {"student": "3번", "theme": "음식", "budget": 30000, "item_a": "치킨", "price_a": 18000, "a_맛": 9, ...}
+#          또는 {"student": ..., "theme": ..., "budget": ..., "alternatives": [{"item": ..., "price": ..., "scores": {"맛": 9, ...}}, ...]}
+#
+# 실행 예:
+#   python batch_grade.py submissions.csv reports.jsonl --workers 16
+#   python batch_grade.py submissions.csv reports.jsonl --report-dir reports/   # 학생별 .md 파일도 저장
+
+DEFAULT_WORKERS = 8
+
+
+def read_submissions(path):
+    """CSV/JSONL 파일에서 제출물을 한 줄씩 읽어 dict로 내보냄 (파일 전체를 메모리에 올리지 않음)."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.endswith(".jsonl"):
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    # 깨진 줄 하나 때문에 나머지 학생을 멈추지 않고 입력 오류로 기록함
+                    yield {"student": f"({number}번째 줄)", "invalid": f"JSON 오류: {e}"}
+        else:
+            yield from csv.DictReader(f)
+
+
+def parse_submission(row):
+    """입력 한 줄을 (학생, 주제, 예산, 평가 결과)로 바꿈."""
+    budget = int(float(row["budget"]))
+    if "alternatives" in row:
+        alternatives = row["alternatives"]
+        criteria = list(alternatives[0]["scores"])
+        names = [alt["item"] for alt in alternatives]
+        prices = [float(alt["price"]) for alt in alternatives]
+        scores = [[float(alt["scores"][c]) for c in criteria] for alt in alternatives]
+    else:
+        # 앱 입력 이름 그대로: item_a, price_a, a_<기준> ... item_b, price_b, b_<기준> ...
+        labels = sorted(k[len("item_"):] for k in row if k.startswith("item_") and row[k])
+        criteria = [k[2:] for k in row if k.startswith(f"{labels[0]}_")]
+        names = [row[f"item_{l}"] for l in labels]
+        prices = [float(row[f"price_{l}"]) for l in labels]
+        scores = [[float(row[f"{l}_{c}"]) for c in criteria] for l in labels]
+    evaluation = evaluate(names, criteria, scores, prices, budget, rank_by=RANK_BY)
+    return str(row["student"]), row.get("theme", ""), budget, evaluation
+
+
+def _student(row):
+    return str(row.get("student", "")) if isinstance(row, dict) else ""
+
+
+def grade(client, row):
+    if isinstance(row, dict) and "invalid" in row:
+        return {"student": _student(row), "source": "invalid", "error": row["invalid"]}
+    try:
+        student, theme, budget, evaluation = parse_submission(row)
+    except Exception as e:
+        # 빈칸이나 잘못된 값, 후보마다 기준 수가 다른 줄 등은 건너뛰지 않고 기록만 남김
+        return {"student": _student(row), "source": "invalid", "error": f"입력 오류: {e!r}"}
+    result = {"student": student, "theme": theme, "budget": budget}
+    try:
+        report = client.generate_text(build_analysis_prompt(theme, budget, evaluation), system=ANALYSIS_INSTRUCTION)
+        if report:
+            result.update(source="ai", report=report)
+            return result
+        result["error"] = "빈 응답"
+    except Exception as e:
+        # 요청 오류뿐 아니라 응답 모양이 예상과 다른 경우도 이 학생만 기본 분석으로 대신함
+        result["error"] = str(e) or type(e).__name__
+    # AI를 쓸 수 없으면 앱과 같은 기본 분석으로 대신함
+    result.update(source="local", report="\n".join(local_recommendation(evaluation)))
+    return result
+
+
+def grade_safely(client, row):
+    """grade가 예상하지 못한 오류를 내도 그 학생만 오류로 기록하고 나머지는 계속 채점함."""
+    try:
+        return grade(client, row)
+    except Exception as e:
+        return {"student": _student(row), "source": "error", "error": f"채점 오류: {e!r}"}
+
+
+def load_done(path):
+    # 이미 저장된 학생은 건너뛰어서 중단된 작업을 이어서 할 수 있게 함
+    done = set()
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["student"])
+                except (ValueError, KeyError):
+                    pass  # 중단 때문에 잘린 마지막 줄
+    return done
+
+
+def run(input_path, output_path, client, workers=DEFAULT_WORKERS, report_dir=None, log=print):
+    done = load_done(output_path)
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+
+    counts = {"ai": 0, "local": 0, "invalid": 0, "error": 0, "skipped": 0}
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        def save(result):
+            with lock:
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                counts[result["source"]] += 1
+            if report_dir and "report" in result:
+                filename = result["student"].replace(os.sep, "_") + ".md"
+                with open(os.path.join(report_dir, filename), "w", encoding="utf-8") as f:
+                    f.write(result["report"] + "\n")
+
+        # 입력을 미리 다 제출하지 않고, 진행 중인 작업이 workers의 두 배를 넘지 않게 조금씩 넣음
+        pending = set()
+        for row in read_submissions(input_path):
+            if _student(row) in done:
+                counts["skipped"] += 1
+                continue
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    save(future.result())
+            pending.add(pool.submit(grade_safely, client, row))
+        for future in wait(pending).done:
+            save(future.result())
+
+    elapsed = time.perf_counter() - start
+    graded = counts["ai"] + counts["local"]
+    log(
+        f"완료: {graded}명 (AI {counts['ai']}, 기본 분석 {counts['local']}, 입력 오류 {counts['invalid']}, 채점 오류 {counts['error']}, "
+        f"이미 처리 {counts['skipped']}) "
+        f"/ {elapsed:.1f}초 / 분당 {graded / elapsed * 60 if elapsed else 0:.0f}명"
+    )
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="학생 합리적 소비 선택 결과 일괄 채점")
+    parser.add_argument("input", help="제출물 CSV 또는 JSONL")
+    parser.add_argument("output", help="결과 JSONL (이미 있으면 이어서 씀)")
+    parser.add_argument("--report-dir", help="학생별 Markdown 리포트를 저장할 폴더")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시에 보낼 요청 수")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--rpm", type=int, help="분당 요청 수 한도 (기본: GEMINI_RPM)")
+    parser.add_argument("--tpm", type=int, help="분당 토큰 수 한도 (기본: GEMINI_TPM)")
+    args = parser.parse_args(argv)
+
+    try:
+        model = check_model(args.model)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    load_dotenv()
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        print("⚠️ .env 파일이나 환경 변수에 GOOGLE_API_KEY를 설정해주세요!", file=sys.stderr)
+        return 1
+
+    limits = {k: v for k, v in (("rpm", args.rpm), ("tpm", args.tpm)) if v}
+    client = GeminiClient(api_key, model, pool_size=max(args.workers, 1), **limits)
+    run(args.input, args.output, client, workers=args.workers, report_dir=args.report_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
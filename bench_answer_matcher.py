@@ -0,0 +1,107 @@
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from answer_matcher import AnswerIndex
+
+# 퀴즈 정답 판정 속도 측정
+# 정답 수를 100개에서 10만 개까지 늘려 가며 색인을 만들고, 한 글자(자모 하나)를 틀리게 바꾼 입력과
+# 색인에 없는 입력으로 찾는 시간을 잼. 정답 수가 늘어도 찾는 시간이 거의 그대로인지 확인하는 용도.
+#
+# 실행 예:
+#   python bench_answer_matcher.py
+#   python bench_answer_matcher.py --sizes 1000 10000 100000 --queries 5000 --json matcher.json
+
+SIZES = [100, 1_000, 10_000, 100_000]
+# 낱말에 자주 쓰이는 받침(없음, ㄱ, ㄴ, ㄹ, ㅁ, ㅂ, ㅇ)만 붙인 음절로 낱말을 만듦
+COMMON_JONG = (0, 1, 4, 8, 16, 17, 21)
+SYLLABLES = [chr(0xAC00 + cho * 588 + jung * 28 + jong) for cho in range(19) for jung in range(21) for jong in COMMON_JONG]
+
+
+def make_entries(count, rng):
+    entries, seen = [], set()
+    while len(entries) < count:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            entries.append((word, ()))
+    return entries
+
+
+def typo(word, rng):
+    # 음절 하나의 모음을 바꿔 자모 하나가 틀린 입력을 만듦 ("호랑이" -> "호랭이")
+    i = rng.randrange(len(word))
+    code = ord(word[i]) - 0xAC00
+    vowel = (code // 28 % 21 + rng.randint(1, 20)) % 21
+    changed = chr(0xAC00 + code // 588 * 588 + vowel * 28 + code % 28)
+    return word[:i] + changed + word[i + 1:]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def bench(size, queries, seed):
+    rng = random.Random(seed)
+    entries = make_entries(size, rng)
+
+    start = time.perf_counter()
+    index = AnswerIndex(entries)
+    build = time.perf_counter() - start
+
+    targets = [rng.choice(entries)[0] for _ in range(queries)]
+    inputs = [typo(word, rng) + "요" if i % 2 else typo(word, rng) for i, word in enumerate(targets)]
+    misses = [w for w, _ in make_entries(queries, random.Random(seed + 1))]
+
+    timings, found = [], 0
+    for target, text in zip(targets, inputs):
+        start = time.perf_counter()
+        match = index.match(text)
+        timings.append(time.perf_counter() - start)
+        # 오타 입력이 원래 낱말이 아닌 다른 등록 낱말과 같아지는 경우도 있으므로 "무언가 찾았는지"만 셈
+        found += match is not None
+    miss_timings = []
+    for text in misses:
+        start = time.perf_counter()
+        index.match(text)
+        miss_timings.append(time.perf_counter() - start)
+
+    return {
+        "entries": size,
+        "build_ms": round(build * 1000, 1),
+        "typo_p50_us": round(percentile(timings, 50) * 1e6, 1),
+        "typo_p99_us": round(percentile(timings, 99) * 1e6, 1),
+        "miss_p50_us": round(percentile(miss_timings, 50) * 1e6, 1),
+        "miss_p99_us": round(percentile(miss_timings, 99) * 1e6, 1),
+        "typo_found": round(found / queries, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="퀴즈 정답 판정 속도 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="정답 수")
+    parser.add_argument("--queries", type=int, default=2000, help="크기마다 찾아볼 입력 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        result = bench(size, args.queries, args.seed)
+        results.append(result)
+        print(
+            f"정답 {size:>7,}개 | 색인 {result['build_ms']:>8}ms | "
+            f"오타 입력 p50 {result['typo_p50_us']}us p99 {result['typo_p99_us']}us (찾음 {result['typo_found']:.0%}) | "
+            f"없는 입력 p50 {result['miss_p50_us']}us p99 {result['miss_p99_us']}us"
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps({"results": results}, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+
+from mock_gemini_server import PROFILES, start_server
+
+# 가상 교실 부하 측정
+# 학생 30~100명이 동시에 앱을 쓰는 상황을 streamlit.testing.v1.AppTest로 흉내 냄.
+# 앱은 로컬 대역 서버(mock_gemini_server.py)를 보게 하고, 다음을 잽니다.
+#   - 스크립트 재실행 시간 (API를 부르지 않는 조작: 첫 화면, 슬라이더 등)
+#   - 응답 지연 p50/p95/p99 (질문 전송, 분석 버튼 등 API를 부르는 조작을 한 뒤 답이 화면에 나타날 때까지)
+#   - 조작 한 번당 API 호출 수
+#   - 세션당 메모리 (RSS 증가량 / 학생 수)
+# 결과를 JSON으로 저장하고 다음에 --baseline으로 비교하면 커밋 사이의 성능 저하를 잡을 수 있음.
+#
+# 실행 예:
+#   python bench_classroom.py --users 30 --profile classroom
+#   python bench_classroom.py --users 30 --json bench.json
+#   python bench_classroom.py --users 30 --baseline bench.json   # 20% 넘게 느려지면 종료 코드 1
+
+BASE_DIR = Path(__file__).resolve().parent
+APPS = ["Practice.py", "20231520file1.py", "streamlit_app.py", "FinalTest.py"]
+QUESTIONS = ["기회비용이 뭐야?", "합리적 선택은 어떻게 해?", "예산이 뭐야?"]
+REGRESSION_THRESHOLD = 0.2
+
+
+def practice_actions(at, rng):
+    # (조작 이름, API 호출 여부, 조작 함수)
+    for question in QUESTIONS:
+        yield "질문 전송", True, lambda q=question: at.chat_input[0].set_value(q)
+
+
+def consumer_actions(at, rng):
+    def set_prices():
+        for ni in at.number_input:
+            if "가격" in ni.label:
+                ni.set_value(rng.choice([8000, 12000, 15000, 18000]))
+
+    yield "가격 입력", False, set_prices
+    yield "슬라이더 조정", False, lambda: at.slider[-1].set_value(rng.randint(0, 10))
+    yield "분석 요청", True, lambda: at.button[0].click()
+
+
+def quiz_actions(at, rng):
+    yield "시작", False, lambda: at.chat_input[0].set_value("시작")
+    yield "힌트", False, lambda: at.chat_input[0].set_value("힌트")
+    yield "정답 입력", False, lambda: at.chat_input[0].set_value(at.session_state.current_animal)
+
+
+SCENARIOS = {
+    "Practice.py": practice_actions,
+    "20231520file1.py": consumer_actions,
+    "streamlit_app.py": consumer_actions,
+    "FinalTest.py": quiz_actions,
+}
+
+
+def rss_bytes():
+    # 현재 RSS (리눅스는 /proc, 그 밖에는 최대 RSS로 대신함)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def make_apptest_concurrent():
+    """AppTest 여러 개를 스레드에서 동시에 돌릴 수 있게 함 (측정 도구 전용).
+
+    AppTest는 한 번에 하나만 돈다고 가정하고 실행이 끝날 때마다 전역 Runtime._instance를
+    None으로 돌려놓음. 동시에 도는 다른 학생의 스크립트가 그 사이 Runtime을 찾으면 실패하므로,
+    비어 있을 때는 마지막으로 설정된 Runtime을 돌려주게 함. 또 Python 3.11의 ast.parse는
+    여러 스레드에서 동시에 부르면 깨질 수 있어 스크립트 컴파일만 한 줄로 세움.
+    """
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner import magic, script_cache
+
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+        runtime = cls._instance or last.get("runtime")
+        if runtime is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return runtime
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or "runtime" in last)
+
+    compile_lock = threading.Lock()
+    add_magic = magic.add_magic
+
+    def locked_add_magic(code, script_path):
+        with compile_lock:
+            return add_magic(code, script_path)
+
+    script_cache.magic.add_magic = locked_add_magic
+    # 뒤쪽 스레드(AI 요청 풀)에서 나오는 "missing ScriptRunContext" 경고가 결과를 덮지 않게 함
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+
+def current_job(at):
+    return at.session_state["ai_job"] if "ai_job" in at.session_state else None
+
+
+def run_until_answered(at, timeout):
+    """조작 한 번을 실행하고, 그 조작이 보낸 AI 요청(ai_jobs)이 끝나 답이 화면에 그려질 때까지 기다림.
+
+    앱 스크립트는 AI를 기다리지 않고 끝나므로 at.run() 한 번으로는 재실행 시간만 잼. 브라우저의
+    기다리는 부분(run_every)처럼 POLL_SECONDS마다 다시 실행하되, 요청이 끝나면 바로 한 번 더 실행해 답을 그림.
+    """
+    from ai_jobs import POLL_SECONDS
+
+    before = current_job(at)
+    at.run()
+    job = current_job(at)
+    if job is None or job is before:
+        return  # 캐시 적중 등으로 새 요청을 보내지 않음
+    deadline = time.monotonic() + timeout
+    while not job.done() and time.monotonic() < deadline:
+        concurrent.futures.wait([job.future], timeout=POLL_SECONDS)
+        if not job.done():
+            at.run()  # 기다리는 동안의 안내 갱신
+    at.run()
+
+
+def run_user(app, seed, barrier, timeout, record, sessions):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(str(BASE_DIR / app), default_timeout=timeout)
+    barrier.wait()  # 모든 학생이 동시에 시작 (수업 시작 순간의 몰림)
+
+    start = time.perf_counter()
+    at.run()
+    record("첫 화면", False, time.perf_counter() - start, at)
+    for name, calls_api, action in SCENARIOS[app](at, rng):
+        action()
+        start = time.perf_counter()
+        if calls_api:
+            # 응답 지연은 답이 화면에 나타날 때까지 (다음 조작은 그 뒤에 함)
+            run_until_answered(at, timeout)
+        else:
+            at.run()
+        record(name, calls_api, time.perf_counter() - start, at)
+    sessions.append(at)  # 메모리를 잴 때까지 세션을 살려 둠
+
+
+def bench_app(app, users, server, seed, timeout):
+    samples = []
+    errors = []
+    sessions = []
+    lock = threading.Lock()
+
+    def record(name, calls_api, seconds, at):
+        with lock:
+            samples.append((name, calls_api, seconds))
+            if at.exception:
+                errors.append(f"{name}: {at.exception[0].message}")
+
+    calls_before = sum(v for k, v in server.stats().items() if k.endswith("Content"))
+    rss_before = rss_bytes()
+    barrier = threading.Barrier(users)
+    threads = [
+        threading.Thread(target=run_user, args=(app, seed + i, barrier, timeout, record, sessions))
+        for i in range(users)
+    ]
+    wall = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall
+    rss_after = rss_bytes()
+    api_calls = sum(v for k, v in server.stats().items() if k.endswith("Content")) - calls_before
+
+    reruns = [s for _, calls_api, s in samples if not calls_api]
+    responses = [s for _, calls_api, s in samples if calls_api]
+    result = {
+        "app": app,
+        "users": users,
+        "actions": len(samples),
+        "wall_s": round(wall, 3),
+        "rerun_p50_ms": _ms(percentile(reruns, 50)),
+        "rerun_p95_ms": _ms(percentile(reruns, 95)),
+        "response_p50_ms": _ms(percentile(responses, 50)),
+        "response_p95_ms": _ms(percentile(responses, 95)),
+        "response_p99_ms": _ms(percentile(responses, 99)),
+        "api_calls": api_calls,
+        "api_calls_per_action": round(api_calls / len(samples), 3) if samples else 0,
+        "mem_per_session_kb": round(max(0, rss_after - rss_before) / users / 1024, 1),
+        "errors": len(errors),
+    }
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def compare(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """기준 결과보다 threshold 넘게 나빠진 항목 목록."""
+    baseline = {r["app"]: r for r in json.loads(Path(baseline_path).read_text(encoding="utf-8"))["results"]}
+    regressions = []
+    for r in results:
+        base = baseline.get(r["app"])
+        if not base:
+            continue
+        for key in ("rerun_p95_ms", "response_p95_ms", "api_calls_per_action", "mem_per_session_kb"):
+            if base.get(key) and r.get(key) is not None and r[key] > base[key] * (1 + threshold):
+                regressions.append(f"{r['app']} {key}: {base[key]} -> {r[key]}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가상 교실 부하 측정")
+    parser.add_argument("--users", type=int, default=30, help="동시에 접속하는 학생 수")
+    parser.add_argument("--apps", nargs="+", default=APPS, choices=APPS)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="classroom", help="대역 서버 지연/오류 프로필")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120, help="조작 한 번의 최대 시간(초)")
+    parser.add_argument("--rpm", type=int, default=100000, help="클라이언트 요청 한도 (실제 한도를 흉내 내려면 낮춤)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    server, base = start_server(seed=args.seed, **PROFILES[args.profile])
+    # 앱이 gemini_client를 처음 불러오기 전에 대역 서버와 한도를 정해 둠
+    os.environ["GEMINI_API_BASE"] = base
+    os.environ["GEMINI_RPM"] = str(args.rpm)
+    os.environ.setdefault("GOOGLE_API_KEY", "bench")
+    sys.path.insert(0, str(BASE_DIR))
+    make_apptest_concurrent()
+
+    results = []
+    for app in args.apps:
+        result = bench_app(app, args.users, server, args.seed, args.timeout)
+        results.append(result)
+        print(
+            f"{app:<20} 재실행 p50 {result['rerun_p50_ms']}ms p95 {result['rerun_p95_ms']}ms | "
+            f"응답 p50 {result['response_p50_ms']}ms p95 {result['response_p95_ms']}ms p99 {result['response_p99_ms']}ms | "
+            f"API {result['api_calls']}회 (조작당 {result['api_calls_per_action']}) | "
+            f"세션당 {result['mem_per_session_kb']}KB | 오류 {result['errors']}"
+        )
+
+    report = {"users": args.users, "profile": args.profile, "seed": args.seed, "results": results}
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.baseline:
+        regressions = compare(results, args.baseline)
+        for line in regressions:
+            print(f"⚠️ 성능 저하: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from course_index import CourseIndex, update_index
+
+# 수업 자료 찾기 속도 측정
+# 문단 수를 1천 개에서 10만 개까지 늘려 가며 가짜 수업 자료로 색인을 만들고, 색인을 여는 시간,
+# 질문 하나를 찾는 시간(p50/p99), 자료 파일 하나를 더했을 때 다시 색인하는 시간을 잼.
+# 낱말은 자주 쓰는 것과 드문 것이 섞이도록 지프 분포로 뽑음.
+#
+# 실행 예:
+#   python bench_course_index.py
+#   python bench_course_index.py --sizes 10000 100000 --queries 1000 --json course.json
+
+SIZES = [1_000, 10_000, 100_000]
+PASSAGES_PER_FILE = 50
+VOCABULARY = 20_000
+COMMON_JONG = (0, 4, 8, 16, 21)
+SYLLABLES = [chr(0xAC00 + cho * 588 + jung * 28 + jong) for cho in range(19) for jung in range(21) for jong in COMMON_JONG]
+
+
+def make_vocabulary(rng):
+    words, seen = [], set()
+    while len(words) < VOCABULARY:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+    return words, weights
+
+
+def passage(words, weights, rng):
+    return " ".join(rng.choices(words, weights, k=rng.randint(30, 70))) + "."
+
+
+def write_lessons(lessons_dir, size, words, weights, rng, start=0):
+    paragraphs = []
+    for i in range(size):
+        paragraphs.append(passage(words, weights, rng))
+        if len(paragraphs) == PASSAGES_PER_FILE or i == size - 1:
+            number = start + i // PASSAGES_PER_FILE
+            Path(lessons_dir, f"lesson{number:05d}.md").write_text(f"# 자료 {number}\n\n" + "\n\n".join(paragraphs), encoding="utf-8")
+            paragraphs = []
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def bench(size, queries, seed):
+    rng = random.Random(seed)
+    words, weights = make_vocabulary(rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        lessons_dir, index_dir = os.path.join(tmp, "lessons"), os.path.join(tmp, "index")
+        os.makedirs(lessons_dir)
+        write_lessons(lessons_dir, size, words, weights, rng)
+
+        start = time.perf_counter()
+        update_index(lessons_dir, index_dir)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = CourseIndex(index_dir)
+        opened = time.perf_counter() - start
+
+        # 질문: 지프 분포 낱말 2~4개 (흔한 낱말이 자주 섞임)
+        timings, found = [], 0
+        for _ in range(queries):
+            query = " ".join(rng.choices(words, weights, k=rng.randint(2, 4)))
+            start = time.perf_counter()
+            found += bool(index.search(query))
+            timings.append(time.perf_counter() - start)
+
+        # 자료 파일 하나(PASSAGES_PER_FILE문단) 더하기
+        write_lessons(lessons_dir, PASSAGES_PER_FILE, words, weights, rng, start=size // PASSAGES_PER_FILE + 1)
+        start = time.perf_counter()
+        update_index(lessons_dir, index_dir)
+        CourseIndex(index_dir)
+        added = time.perf_counter() - start
+
+    return {
+        "passages": size,
+        "build_s": round(build, 2),
+        "open_ms": round(opened * 1000, 1),
+        "query_p50_ms": round(percentile(timings, 50) * 1000, 2),
+        "query_p99_ms": round(percentile(timings, 99) * 1000, 2),
+        "found": round(found / queries, 3),
+        "add_file_ms": round(added * 1000, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="수업 자료 찾기 속도 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="문단 수")
+    parser.add_argument("--queries", type=int, default=500, help="크기마다 찾아볼 질문 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        result = bench(size, args.queries, args.seed)
+        results.append(result)
+        print(
+            f"문단 {size:>7,}개 | 색인 {result['build_s']:>6}s | 열기 {result['open_ms']:>7}ms | "
+            f"질문 p50 {result['query_p50_ms']}ms p99 {result['query_p99_ms']}ms | 파일 하나 더하기 {result['add_file_ms']}ms"
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps({"results": results}, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from semantic_cache import SemanticCache
+
+# 비슷한 질문 답변 재사용 속도 측정
+# 저장된 질문 수를 1천 개에서 5만 개까지 늘려 가며, 저장된 질문을 말끝만 바꿔 물은 입력(적중해야 함)과
+# 처음 보는 입력(적중하면 안 됨)으로 찾는 시간과 적중률을 잼.
+#
+# 실행 예:
+#   python bench_semantic_cache.py
+#   python bench_semantic_cache.py --sizes 10000 50000 --queries 5000 --json semantic.json
+
+SIZES = [1_000, 10_000, 50_000]
+# 같은 물음을 여러 말투로 ({w}에 주제 낱말, {i}/{n}에 받침에 맞는 조사 이/가, 은/는)
+TEMPLATES = [
+    ["{w}{i} 뭐야?", "{w}{n} 뭐예요?", "{w} 뭔가요", "{w}{n} 무엇인가요?"],
+    ["{w}{n} 왜 생겨요?", "{w}{n} 왜 생겨", "{w}{i} 왜 생겨요?"],
+    ["{w}에 대해 알려줘", "{w}에 대해 알려 줘요", "{w}에 대해서 알려줘!"],
+    ["{w}의 특징은 뭐야", "{w}의 특징이 뭐예요?", "{w} 특징 뭐니"],
+]
+COMMON_JONG = (0, 4, 8, 16, 21)
+SYLLABLES = [chr(0xAC00 + cho * 588 + jung * 28 + jong) for cho in range(19) for jung in range(21) for jong in COMMON_JONG]
+
+
+def topics(count, rng):
+    words, seen = [], set()
+    while len(words) < count:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def ask(form, word):
+    final = (ord(word[-1]) - 0xAC00) % 28 != 0
+    return form.format(w=word, i="이" if final else "가", n="은" if final else "는")
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def bench(size, queries, seed):
+    rng = random.Random(seed)
+    words = topics(size + queries, rng)
+    stored, unseen = words[:size], words[size:]
+    cache = SemanticCache(max_entries=size)
+    asked = []
+    start = time.perf_counter()
+    for word in stored:
+        forms = rng.choice(TEMPLATES)
+        cache.put(ask(forms[0], word), f"{word} 설명")
+        asked.append((word, forms))
+    build = time.perf_counter() - start
+
+    timings, hits, wrong = [], 0, 0
+    for word, forms in rng.sample(asked, min(queries, len(asked))):
+        start = time.perf_counter()
+        hit = cache.lookup(ask(rng.choice(forms[1:]), word))
+        timings.append(time.perf_counter() - start)
+        hits += hit is not None
+        wrong += hit is not None and hit.answer != f"{word} 설명"
+    miss_timings, false_hits = [], 0
+    for word in unseen:
+        start = time.perf_counter()
+        hit = cache.lookup(ask(rng.choice(rng.choice(TEMPLATES)), word))
+        miss_timings.append(time.perf_counter() - start)
+        false_hits += hit is not None
+
+    return {
+        "entries": size,
+        "build_ms": round(build * 1000, 1),
+        "paraphrase_p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "paraphrase_p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "unseen_p50_ms": round(percentile(miss_timings, 50) * 1000, 3),
+        "unseen_p99_ms": round(percentile(miss_timings, 99) * 1000, 3),
+        "paraphrase_hit_rate": round(hits / len(timings), 3),
+        "wrong_answers": wrong,
+        "unseen_false_hits": false_hits,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="비슷한 질문 답변 재사용 속도 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="저장된 질문 수")
+    parser.add_argument("--queries", type=int, default=2000, help="크기마다 찾아볼 입력 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        result = bench(size, args.queries, args.seed)
+        results.append(result)
+        print(
+            f"질문 {size:>7,}개 | 저장 {result['build_ms']:>8}ms | "
+            f"바꿔 물은 입력 p50 {result['paraphrase_p50_ms']}ms p99 {result['paraphrase_p99_ms']}ms "
+            f"(적중 {result['paraphrase_hit_rate']:.0%}, 엉뚱한 답 {result['wrong_answers']}) | "
+            f"처음 보는 입력 p50 {result['unseen_p50_ms']}ms p99 {result['unseen_p99_ms']}ms (잘못 적중 {result['unseen_false_hits']})"
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps({"results": results}, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
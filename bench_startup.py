@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# 서버 첫 실행(콜드 스타트)과 재실행 부담 측정
+# 앱마다 새 파이썬 프로세스를 띄워 다음을 잽니다.
+#   - streamlit 불러오기 시간 (앱과 상관없는 바닥값)
+#   - 첫 실행 시간: 서버가 뜬 뒤 첫 학생이 접속했을 때 스크립트 한 번 (앱이 쓰는 모듈을 처음 불러오는 시간 포함)
+#   - 재실행 시간: 같은 세션에서 아무 조작 없이 다시 실행 (설정 읽기 등 매번 되풀이되는 부담)
+#   - 첫 실행 뒤 불러와져 있는 무거운 모듈 (API를 부르지 않았는데 requests가 있으면 지연 불러오기가 깨진 것)
+# 다른 작업의 영향을 덜 받도록 프로세스를 여러 번 띄워 가장 빠른 값을 씀 (재실행은 프로세스마다 중앙값).
+# 결과를 JSON으로 저장하고 다음에 --baseline으로 비교하면 커밋 사이의 성능 저하를 잡을 수 있음.
+#
+# 실행 예:
+#   python bench_startup.py
+#   python bench_startup.py --repeat 5 --json startup.json
+#   python bench_startup.py --baseline startup.json   # 20% 넘게 느려지면 종료 코드 1
+
+BASE_DIR = Path(__file__).resolve().parent
+APPS = [
+    "Practice.py",
+    "practice_app.py",
+    "FinalTest.py",
+    "streamlit_app.py",
+    "20231520file1.py",
+    "20231520_YoungRyeolLim_Rational_Consumer_AI.py",
+]
+HEAVY_MODULES = ["requests", "numpy", "PIL.Image", "dotenv", "http.server"]
+RERUNS = 10
+REGRESSION_THRESHOLD = 0.2
+
+# 새 프로세스 안에서 실행하는 측정 코드 (결과는 마지막 줄에 JSON으로 출력)
+CHILD = """
+import json, logging, statistics, sys, time
+start = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+first_start = time.perf_counter()
+at.run()
+first = time.perf_counter() - first_start
+loaded = [name for name in sys.argv[3:] if name in sys.modules]
+reruns = []
+for _ in range(int(sys.argv[2])):
+    t = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - t)
+print(json.dumps({
+    "streamlit_import": imported - start,
+    "first_run": first,
+    "rerun": statistics.median(reruns),
+    "loaded": loaded,
+    "errors": [str(e.value)[:200] for e in at.exception],
+}))
+"""
+
+
+def measure(app, reruns, env):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, str(BASE_DIR / app), str(reruns), *HEAVY_MODULES],
+        capture_output=True, text=True, env=env, cwd=BASE_DIR, timeout=600,
+    )
+    lines = out.stdout.strip().splitlines()
+    if out.returncode or not lines:
+        raise RuntimeError(f"{app} 측정 실패:\n{out.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def bench_app(app, repeat, reruns, env):
+    runs = [measure(app, reruns, env) for _ in range(repeat)]
+    best = lambda key: round(min(r[key] for r in runs) * 1000, 1)
+    return {
+        "app": app,
+        "streamlit_import_ms": best("streamlit_import"),
+        "first_run_ms": best("first_run"),
+        "rerun_ms": best("rerun"),
+        "loaded": runs[-1]["loaded"],
+        "errors": runs[-1]["errors"],
+    }
+
+
+def compare(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """기준 결과보다 threshold 넘게 나빠진 항목 목록."""
+    baseline = {r["app"]: r for r in json.loads(Path(baseline_path).read_text(encoding="utf-8"))["results"]}
+    regressions = []
+    for r in results:
+        base = baseline.get(r["app"])
+        if not base:
+            continue
+        for key in ("first_run_ms", "rerun_ms"):
+            if base.get(key) and r[key] > base[key] * (1 + threshold):
+                regressions.append(f"{r['app']} {key}: {base[key]} -> {r[key]}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="서버 첫 실행과 재실행 부담 측정")
+    parser.add_argument("--apps", nargs="+", default=APPS, choices=APPS)
+    parser.add_argument("--repeat", type=int, default=5, help="앱마다 새 프로세스를 띄울 횟수")
+    parser.add_argument("--reruns", type=int, default=RERUNS, help="프로세스마다 재실행 횟수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    # 기록 파일과 캐시는 임시 폴더에 쓰고, API 키는 가짜 값을 씀 (첫 화면에서는 API를 부르지 않음)
+    work = tempfile.mkdtemp(prefix="bench_startup_")
+    env = {
+        **os.environ,
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "bench"),
+        "EVENT_LOG_DIR": os.path.join(work, "logs"),
+        "MESSAGE_STORE_PATH": os.path.join(work, "messages.sqlite3"),
+    }
+    env.pop("METRICS_PORT", None)
+
+    results = []
+    for app in args.apps:
+        result = bench_app(app, args.repeat, args.reruns, env)
+        results.append(result)
+        print(
+            f"{app:<48} streamlit {result['streamlit_import_ms']:>6}ms | 첫 실행 {result['first_run_ms']:>7}ms | "
+            f"재실행 {result['rerun_ms']:>6}ms | 불러온 모듈 {', '.join(result['loaded']) or '-'}"
+            + (f" | 오류 {result['errors']}" if result["errors"] else "")
+        )
+
+    report = {"repeat": args.repeat, "reruns": args.reruns, "results": results}
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.baseline:
+        regressions = compare(results, args.baseline)
+        for line in regressions:
+            print(f"⚠️ 성능 저하: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
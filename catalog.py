@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import NamedTuple
+
+import streamlit as st
+
+from metrics import METRICS
+
+# 상품 목록 (합리적 소비 앱의 주제, 상품, 참고 가격, 기본 평가 기준)
+# 코드에 적어 두던 THEMES를 data/catalog.json으로 옮겨 선생님이 파일만 고쳐 상품과 가격을 바꿀 수 있게 함.
+# 파일은 서버 프로세스당 한 번만 읽고, 고쳐 저장하면(수정 시각이 바뀌면) 다음 재실행 때 다시 읽음.
+# 고친 파일에 오류가 있으면 이전 목록을 그대로 쓰고 지표에만 남김.
+#
+# 상품 찾기: 이름 앞부분(PREFIX_LEN글자까지)은 바로 찾는 표로, 중간 글자는 글자 조각(1~2글자) 색인으로 찾아
+# 상품이 수천 개여도 글자를 칠 때마다 전체를 훑지 않음.
+#
+# 파일 형식:
+#   {"themes": {"음식": {"criteria": ["맛", ...], "items": [{"name": "치킨", "price": 20000}, ...]}, ...}}
+
+CATALOG_PATH = os.getenv("CATALOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalog.json"))
+PREFIX_LEN = 3  # 앞부분 표에 넣을 최대 글자 수
+SEARCH_LIMIT = 30  # 찾기 결과 최대 개수
+
+
+class Product(NamedTuple):
+    name: str
+    theme: str
+    price: int  # 참고 가격 (원)
+
+
+class Theme(NamedTuple):
+    name: str
+    criteria: list
+    items: list  # 파일에 적힌 순서의 상품 이름
+
+
+def _key(text):
+    # 찾기용 이름: 소문자, 띄어쓰기 없음 ("도시락 가방" -> "도시락가방")
+    return "".join(text.lower().split())
+
+
+def _grams(key):
+    # 한 글자와 두 글자 조각
+    return set(key) | {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+class Catalog:
+    """파일에서 읽은 주제와 상품 목록, 그리고 상품 이름 찾기 색인."""
+
+    def __init__(self, data):
+        themes = data.get("themes") if isinstance(data, dict) else None
+        if not themes:
+            raise ValueError('상품 목록에 "themes"가 없습니다.')
+        self.themes = {}
+        self.products = {}  # 이름 -> Product (같은 이름이 여러 주제에 있으면 처음 것)
+        for theme_name, theme in themes.items():
+            names = []
+            for item in theme.get("items", []):
+                name, price = str(item["name"]).strip(), int(item.get("price", 0))
+                if not name or price < 0:
+                    raise ValueError(f"{theme_name}: 상품 이름이 비었거나 가격이 음수입니다 ({item}).")
+                names.append(name)
+                self.products.setdefault(name, Product(name, theme_name, price))
+            if not names:
+                raise ValueError(f"{theme_name}: 상품이 없습니다.")
+            self.themes[theme_name] = Theme(theme_name, list(theme.get("criteria", [])), names)
+
+        # 색인: 이름순으로 번호를 매겨 찾기 결과도 이름순으로 나오게 함
+        self._names = sorted(self.products)
+        self._keys = [_key(name) for name in self._names]
+        prefixes, grams = defaultdict(list), defaultdict(list)
+        for i, key in enumerate(self._keys):
+            for n in range(1, min(PREFIX_LEN, len(key)) + 1):
+                prefixes[key[:n]].append(i)
+            for gram in _grams(key):
+                grams[gram].append(i)
+        self._prefixes = {k: tuple(v) for k, v in prefixes.items()}
+        self._grams = {k: tuple(v) for k, v in grams.items()}
+
+    def __len__(self):
+        return len(self.products)
+
+    def price(self, name):
+        """상품의 참고 가격. 목록에 없는 상품이면 None."""
+        product = self.products.get(name)
+        return product.price if product else None
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """이름이 query로 시작하는 상품을 먼저, 그다음 query가 이름 중간에 있는 상품을 이름순으로 돌려줌."""
+        q = _key(query)
+        if not q:
+            return []
+        head = self._prefixes.get(q[:PREFIX_LEN], ())
+        if len(q) > PREFIX_LEN:
+            head = [i for i in head if self._keys[i].startswith(q)]
+        found = list(head[:limit])
+        if len(found) < limit:
+            # q의 조각 가운데 가장 드문 것의 목록만 훑어 q가 들어 있는지 확인함
+            rarest = min((self._grams.get(g, ()) for g in _grams(q)), key=len)
+            starts = set(head)
+            for i in rarest:
+                if i not in starts and q in self._keys[i]:
+                    found.append(i)
+                    if len(found) >= limit:
+                        break
+        return [self.products[self._names[i]] for i in found]
+
+
+def load_catalog(path=CATALOG_PATH):
+    with open(path, encoding="utf-8") as f:
+        return Catalog(json.load(f))
+
+
+class CatalogFile:
+    """파일이 바뀌었을 때만 다시 읽는 상품 목록. 서버 프로세스의 모든 세션이 함께 씀."""
+
+    def __init__(self, path=CATALOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.mtime = os.stat(path).st_mtime_ns
+        self.catalog = load_catalog(path)  # 처음 읽을 때 오류는 그대로 알림
+        self.error = None
+
+    def current(self):
+        """최신 상품 목록. 수정 시각만 확인하므로 재실행마다 불러도 됨."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            self.error = e
+            return self.catalog
+        if mtime != self.mtime:
+            with self._lock:
+                if mtime != self.mtime:
+                    try:
+                        self.catalog = load_catalog(self.path)
+                        self.error = None
+                        METRICS.inc("catalog_reloads_total")
+                    except (OSError, ValueError, KeyError, TypeError) as e:
+                        # 저장 중이거나 잘못 고친 파일: 이전 목록을 그대로 씀
+                        self.error = e
+                        METRICS.inc("catalog_reload_errors_total", type=type(e).__name__)
+                    self.mtime = mtime
+        return self.catalog
+
+
+@st.cache_resource
+def get_catalog_file():
+    # 서버 프로세스당 한 번만 읽음
+    return CatalogFile()
+
+
+def get_catalog():
+    return get_catalog_file().current()
+
+
+def item_options(items, query, catalog=None):
+    """선택 상자에 넣을 상품 이름. 찾는 말이 있으면 찾기 결과를, 없으면 주제의 상품 목록을 돌려줌."""
+    if not query:
+        return list(items)
+    catalog = catalog if catalog is not None else get_catalog()
+    return [product.name for product in catalog.search(query)]
+
+
+def prefill_price(price_key, item, catalog=None):
+    """고른 상품이 바뀌었으면 가격 입력칸을 그 상품의 참고 가격으로 채움 (가격 입력칸을 만들기 전에 부름).
+
+    같은 상품을 고른 채로 학생이 고친 가격은 그대로 둠.
+    """
+    marker = f"{price_key}_item"
+    if st.session_state.get(marker) != item:
+        st.session_state[marker] = item
+        catalog = catalog if catalog is not None else get_catalog()
+        st.session_state[price_key] = catalog.price(item) or 0
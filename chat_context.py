@@ -0,0 +1,89 @@
+# 대화 맥락 관리
+# 매 턴마다 대화 기록 전체를 contents로 다시 보내면 요청 크기와 지연이 턴마다 늘어남.
+# 최근 몇 턴만 그대로 보내고, 그보다 오래된 턴은 짧은 요약으로 접어서 함께 보냄.
+# 요약은 창(window)이 넘칠 때만, 새로 밀려난 턴만큼씩 이어 붙여 계산함.
+# 이미 요약한 메시지는 다시 읽지 않으므로, 오래된 메시지를 파일로 내리는 MessageStore를 그대로 넘겨도
+# 메모리에 남은 최근 메시지만 읽음.
+
+DEFAULT_MAX_CHARS = 6000  # contents 전체 글자 수 상한 (한국어 기준 대략 토큰 수의 1.5~2배)
+DEFAULT_WINDOW = 12  # 그대로 보낼 최근 메시지 수
+DEFAULT_SUMMARY_CHARS = 1500  # 요약 글자 수 상한 (넘치면 가장 오래된 줄부터 버림)
+LINE_CHARS = 80  # 요약 한 줄에 남길 글자 수
+
+ROLE_LABELS = {"user": "학생", "assistant": "챗봇"}
+
+
+def is_context_message(message):
+    # 인사말, 오류 안내처럼 화면에만 보여 주는 메시지는 모델에 보내지 않음
+    return message["role"] in ROLE_LABELS and not message.get("ui_only")
+
+
+def _since(messages, start):
+    # MessageStore면 필요한 뒷부분만 꺼내고, 목록이면 잘라서 씀
+    if hasattr(messages, "since"):
+        return messages.since(start)
+    return messages[start:]
+
+
+def _summary_line(message):
+    text = " ".join(message["content"].split())
+    if len(text) > LINE_CHARS:
+        text = text[:LINE_CHARS] + "…"
+    return f"- {ROLE_LABELS[message['role']]}: {text}"
+
+
+class ChatContext:
+    """세션마다 하나씩 두고, 매 턴 build()로 보낼 contents를 만듦."""
+
+    def __init__(self, max_chars=DEFAULT_MAX_CHARS, window=DEFAULT_WINDOW, summary_chars=DEFAULT_SUMMARY_CHARS):
+        self.max_chars = max_chars
+        self.window = window
+        self.summary_chars = summary_chars
+        self.reset()
+
+    def reset(self):
+        self.summary_lines = []
+        self.summary_len = 0
+        self.position = 0  # 이 위치(전체 메시지 기준) 앞의 메시지는 이미 요약에 접혔음
+
+    def _compact(self, history):
+        position, message = history.pop(0)
+        line = _summary_line(message)
+        self.summary_lines.append(line)
+        self.summary_len += len(line) + 1
+        # 요약이 전체 예산의 절반을 넘지 않도록 해서 최근 대화 자리를 남겨 둠
+        limit = min(self.summary_chars, self.max_chars // 2)
+        while self.summary_len > limit and len(self.summary_lines) > 1:
+            self.summary_len -= len(self.summary_lines.pop(0)) + 1
+        self.position = position + 1
+
+    def build(self, messages):
+        if len(messages) < self.position:
+            # 대화가 초기화된 경우
+            self.reset()
+        # 아직 요약하지 않은 메시지만 (전체 위치, 메시지)로 꺼냄
+        history = [(i, m) for i, m in enumerate(_since(messages, self.position), self.position) if is_context_message(m)]
+
+        # 1. 창 밖으로 밀려난 메시지만 요약에 이어 붙임 (이미 요약한 것은 다시 보지 않음)
+        while len(history) > self.window:
+            self._compact(history)
+
+        # 2. 글자 수 예산을 넘으면 가장 오래된 메시지부터 요약으로 접음 (마지막 질문은 항상 남김)
+        recent_len = sum(len(m["content"]) for _, m in history)
+        while self.summary_len + recent_len > self.max_chars and len(history) > 1:
+            recent_len -= len(history[0][1]["content"])
+            self._compact(history)
+
+        # Gemini는 대화가 user 차례로 시작해야 하므로 앞쪽의 assistant 메시지도 요약으로 넘김
+        while len(history) > 1 and history[0][1]["role"] != "user":
+            self._compact(history)
+
+        contents = []
+        if self.summary_lines:
+            summary = "지금까지 나눈 대화 요약:\n" + "\n".join(self.summary_lines)
+            contents.append({"role": "user", "parts": [{"text": summary}]})
+            contents.append({"role": "model", "parts": [{"text": "네, 앞의 대화 내용을 기억하고 이어서 답할게요."}]})
+        for _, m in history:
+            role = "user" if m["role"] == "user" else "model"
+            contents.append({"role": role, "parts": [{"text": m["content"]}]})
+        return contents
@@ -0,0 +1,90 @@
+import pandas as pd
+import streamlit as st
+
+from class_stats import get_class_stats
+
+# 우리 반 현황 화면 (교사용)
+# ?teacher=<키>로 연 앱 아래쪽에 그림. REFRESH_SECONDS마다 이 부분만 다시 그리므로(fragment) 학생 화면이나
+# 앱 전체를 다시 실행하지 않음. 그릴 때마다 집계의 요약만 받아 오고, 집계가 그대로면 요약도 그대로 씀.
+
+REFRESH_SECONDS = 3
+TOP_ITEMS = 15  # 표에 보여 줄 상품 수 (비교 횟수 많은 순)
+
+
+def _bucket_labels(histogram, unit, scale=1):
+    # 구간표를 "~10초", "10~20초", ..., "600초~" 막대로
+    bounds = [f"{b // scale:,}" for b in histogram.buckets]
+    labels = [f"~{bounds[0]}{unit}"]
+    labels += [f"{lo}~{hi}{unit}" for lo, hi in zip(bounds, bounds[1:])]
+    labels.append(f"{bounds[-1]}{unit}~")
+    return pd.Series(histogram.counts, index=labels)
+
+
+def _report_section(snapshot):
+    st.markdown(f"**🛒 합리적 소비 리포트 {snapshot.reports}개**")
+    left, right = st.columns(2)
+    with left:
+        st.caption("주제별 리포트 수")
+        st.bar_chart(pd.Series(snapshot.themes))
+    with right:
+        budgets = snapshot.budgets
+        st.caption(f"예산 분포 (평균 {budgets.sum / budgets.count:,.0f}원)" if budgets.count else "예산 분포")
+        st.bar_chart(_bucket_labels(budgets, "만원", scale=10_000))
+    if snapshot.items:
+        st.caption("많이 비교한 상품")
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    (s.theme, s.item, s.compared, round(s.average_score, 1), round(s.average_price), s.recommended, s.in_basket)
+                    for s in snapshot.items[:TOP_ITEMS]
+                ],
+                columns=["주제", "상품", "비교", "평균 점수", "평균 가격(원)", "추천", "장바구니"],
+            ),
+            hide_index=True,
+        )
+
+
+def _quiz_section(snapshot):
+    correct = sum(a.correct for a in snapshot.animals)
+    st.markdown(f"**🐾 동물 퀴즈 정답 {correct}번**")
+    st.dataframe(
+        pd.DataFrame(
+            [
+                (a.animal, a.attempts, a.correct, a.revealed, f"{a.correct / a.attempts:.0%}" if a.attempts else "-")
+                for a in snapshot.animals
+            ],
+            columns=["동물", "답한 횟수", "정답", "정답 공개", "정답률"],
+        ),
+        hide_index=True,
+    )
+    left, middle, right = st.columns(3)
+    with left:
+        st.caption("맞힐 때 더 본 힌트 수")
+        st.bar_chart(pd.Series({f"{n}개": count for n, count in snapshot.hints.items()}, dtype="int64"))
+    with middle:
+        seconds = snapshot.answer_seconds
+        p50 = seconds.quantile(0.5)
+        st.caption("맞히기까지 걸린 시간" + (f" (절반이 {p50:,}초 안)" if p50 is not None and p50 != float("inf") else ""))
+        st.bar_chart(_bucket_labels(seconds, "초"))
+    with right:
+        st.caption("학생(세션)별 맞힌 문제 수")
+        st.bar_chart(pd.Series({f"{n}문제": count for n, count in snapshot.solved.items()}, dtype="int64"))
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def class_dashboard():
+    snapshot = get_class_stats().snapshot()
+    st.subheader("📋 우리 반 현황 (교사용)")
+    cols = st.columns(4)
+    cols[0].metric("참여한 학생(세션)", snapshot.sessions)
+    cols[1].metric("지금 참여 중", snapshot.active)
+    cols[2].metric("리포트", snapshot.reports)
+    cols[3].metric("채팅 질문", snapshot.questions)
+    if not snapshot.sessions:
+        st.caption("아직 학생 기록이 없습니다.")
+    if snapshot.reports:
+        _report_section(snapshot)
+    if snapshot.animals:
+        _quiz_section(snapshot)
+    if snapshot.chat_errors:
+        st.caption(f"채팅 오류 {snapshot.chat_errors}번")
@@ -0,0 +1,212 @@
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import NamedTuple
+
+import streamlit as st
+
+from metrics import Histogram
+
+# 우리 반 현황 (교사용 실시간 집계)
+# 학생 세션이 남기는 기록(event_log.log_event)에서 짧은 값(고른 상품, 점수, 예산, 쓴 힌트 수, 맞히기까지
+# 걸린 시간)만 뽑아 서버 프로세스 전체의 집계에 바로 더함. 집계는 개수, 합, 구간표로만 들고 있으므로
+# 대시보드를 새로 그릴 때 세션이나 기록을 다시 훑지 않음 (크기는 학생 수가 아니라 상품/동물 수에 비례).
+#
+# 더하기는 자물쇠 하나 안에서 사전 몇 칸을 고치는 것이 전부라 100명 넘게 동시에 제출해도 학생 화면을
+# 붙잡지 않음. 집계가 바뀔 때마다 version이 올라가고, 요약(snapshot)은 version이 같으면 지난 것을 그대로 씀.
+
+BUDGET_BUCKETS = (10_000, 20_000, 30_000, 50_000, 100_000)  # 예산 구간(원)
+ANSWER_SECONDS = (10, 20, 30, 60, 120, 300, 600)  # 맞히기까지 걸린 시간 구간(초)
+ACTIVE_SECONDS = 300  # 이만큼 안에 기록을 남긴 세션을 "지금 참여 중"으로 셈
+# 세션별 진행 상황은 이만큼 기록이 없거나 세션이 이보다 많으면 오래된 것부터 잊음 (서버를 며칠 켜 둬도 늘지 않게).
+# 잊은 세션도 세션 수와 맞힌 문제 수 분포에는 그대로 남고, 그 뒤에 다시 기록하면 새 세션으로 셈
+SESSION_SECONDS = 6 * 60 * 60
+MAX_SESSIONS = 5_000
+
+
+class ItemStats(NamedTuple):
+    theme: str
+    item: str
+    compared: int  # 대안으로 넣은 횟수
+    average_score: float  # 기준 점수 평균의 평균
+    average_price: float
+    recommended: int  # 추천(가장 좋은 선택)으로 나온 횟수
+    in_basket: int  # 최적 장바구니에 들어간 횟수
+
+
+class AnimalStats(NamedTuple):
+    animal: str
+    attempts: int  # 답을 낸 횟수 (시작, 힌트 요청 제외)
+    correct: int
+    revealed: int  # 힌트를 다 보고 정답을 본 횟수
+
+
+class ClassSnapshot(NamedTuple):
+    version: int
+    sessions: int  # 기록을 남긴 세션 수
+    active: int  # ACTIVE_SECONDS 안에 기록을 남긴 세션 수
+    reports: int
+    themes: dict  # 주제 -> 리포트 수
+    items: list  # ItemStats (비교 횟수 많은 순)
+    budgets: Histogram  # 리포트 예산 구간표 (sum/count로 평균)
+    animals: list  # AnimalStats (동물 이름순)
+    hints: dict  # 정답을 맞힐 때까지 더 본 힌트 수 -> 횟수
+    answer_seconds: Histogram  # 문제를 받고 맞히기까지 걸린 시간
+    solved: dict  # 세션이 맞힌 문제 수 -> 세션 수 (퀴즈를 푼 세션만)
+    questions: int  # 채팅 질문 수
+    chat_errors: int
+
+
+def _copy(histogram):
+    copy = Histogram(histogram.buckets)
+    copy.counts, copy.sum, copy.count = list(histogram.counts), histogram.sum, histogram.count
+    return copy
+
+
+def _average_score(scores):
+    values = [float(v) for v in (scores or {}).values()]
+    return sum(values) / len(values) if values else 0.0
+
+
+class ClassStats:
+    """학생 세션이 보내는 기록을 그때그때 더해 두는 서버 프로세스 전체의 집계."""
+
+    def __init__(self, active_seconds=ACTIVE_SECONDS, session_seconds=SESSION_SECONDS, max_sessions=MAX_SESSIONS):
+        self.active_seconds = active_seconds
+        self.session_seconds = session_seconds
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self.version = 0
+        self._snapshot = None
+        # 세션 id -> [마지막 기록 시각, 맞힌 문제 수(퀴즈를 풀지 않았으면 None)].
+        # 마지막 기록 순으로 둬서 참여 중인 세션만 뒤에서부터 셈
+        self._sessions = OrderedDict()
+        self._forgotten = 0  # 오래되어 잊은 세션 수
+        self._solved = Counter()  # 맞힌 문제 수 -> 퀴즈를 푼 세션 수
+        # 합리적 소비 리포트
+        self._reports = 0
+        self._themes = Counter()
+        self._items = defaultdict(lambda: [0, 0.0, 0.0, 0, 0])  # (주제, 상품) -> [비교, 점수 합, 가격 합, 추천, 장바구니]
+        self._budgets = Histogram(BUDGET_BUCKETS)
+        # 동물 퀴즈
+        self._animals = defaultdict(Counter)  # 동물 -> 결과(correct, wrong, hint, revealed, start) -> 횟수
+        self._hints = Counter()
+        self._answer_seconds = Histogram(ANSWER_SECONDS)
+        # 채팅
+        self._questions = 0
+        self._chat_errors = 0
+
+    def publish(self, app, session, kind, data, ts=None):
+        """기록 하나를 집계에 더함. data는 log_event에 넘긴 값 그대로 (필요한 것만 씀)."""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            progress = self._sessions.get(session)
+            if progress is None:
+                progress = self._sessions[session] = [ts, None]
+            else:
+                progress[0] = ts
+                self._sessions.move_to_end(session)
+            self._forget(ts)
+
+            if kind == "report":
+                self._add_report(data)
+            elif kind == "quiz":
+                self._add_quiz(progress, data)
+            elif kind == "chat":
+                if data.get("error"):
+                    self._chat_errors += 1
+                else:
+                    self._questions += 1
+            self.version += 1
+
+    def _add_report(self, data):
+        self._reports += 1
+        theme = data.get("theme") or data.get("goal") or "기타"
+        self._themes[theme] += 1
+        budget = data.get("budget")
+        if budget is not None:
+            self._budgets.observe(float(budget))
+        for alternative in data.get("alternatives") or ():
+            stats = self._items[theme, alternative["item"]]
+            stats[0] += 1
+            stats[1] += _average_score(alternative.get("scores"))
+            stats[2] += float(alternative.get("price") or 0)
+        recommended = data.get("recommended")
+        if recommended:
+            self._items[theme, recommended][3] += 1
+        for item in data.get("basket") or ():
+            self._items[theme, item][4] += 1
+
+    def _add_quiz(self, progress, data):
+        result = data.get("result")
+        if progress[1] is None:
+            progress[1] = 0
+            self._solved[0] += 1
+        self._animals[data.get("animal")][result] += 1
+        if result == "correct":
+            self._hints[int(data.get("hint_step") or 0)] += 1
+            if data.get("seconds") is not None:
+                self._answer_seconds.observe(float(data["seconds"]))
+            # 맞힌 문제 수 분포도 옮겨 적기만 함 (n개 -> n+1개)
+            self._solved[progress[1]] -= 1
+            progress[1] += 1
+            self._solved[progress[1]] += 1
+
+    def _forget(self, now):
+        # 마지막 기록 순이므로 앞에서부터 오래된 세션만 봄 (기록 한 번에 드는 비용은 일정함)
+        cutoff = now - self.session_seconds
+        while self._sessions and (len(self._sessions) > self.max_sessions or next(iter(self._sessions.values()))[0] < cutoff):
+            self._sessions.popitem(last=False)
+            self._forgotten += 1
+
+    def _active(self, now):
+        # 마지막 기록 순이므로 뒤에서부터 오래된 세션이 나올 때까지만 셈
+        cutoff, active = now - self.active_seconds, 0
+        for progress in reversed(self._sessions.values()):
+            if progress[0] < cutoff:
+                break
+            active += 1
+        return active
+
+    def snapshot(self, now=None):
+        """대시보드에 그릴 요약. 집계가 그대로면 지난 요약을 다시 씀 (참여 중 세션 수만 새로 셈)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            active = self._active(now)
+            if self._snapshot is None or self._snapshot.version != self.version:
+                self._snapshot = self._build()
+        return self._snapshot._replace(active=active)
+
+    def _build(self):
+        items = [
+            ItemStats(theme, item, compared, score / compared if compared else 0.0,
+                      price / compared if compared else 0.0, recommended, in_basket)
+            for (theme, item), (compared, score, price, recommended, in_basket) in self._items.items()
+        ]
+        items.sort(key=lambda s: (-s.compared, -s.recommended, s.theme, s.item))
+        answered = ("correct", "wrong", "revealed")
+        animals = [
+            AnimalStats(animal, sum(results[r] for r in answered), results["correct"], results["revealed"])
+            for animal, results in sorted(self._animals.items(), key=lambda kv: str(kv[0]))
+        ]
+        return ClassSnapshot(
+            version=self.version,
+            sessions=len(self._sessions) + self._forgotten,
+            active=0,
+            reports=self._reports,
+            themes=dict(self._themes.most_common()),
+            items=items,
+            budgets=_copy(self._budgets),
+            animals=animals,
+            hints=dict(sorted(self._hints.items())),
+            answer_seconds=_copy(self._answer_seconds),
+            solved={n: count for n, count in sorted(self._solved.items()) if count},
+            questions=self._questions,
+            chat_errors=self._chat_errors,
+        )
+
+
+@st.cache_resource
+def get_class_stats():
+    # 서버 프로세스당 하나: 모든 학생 세션이 같은 집계에 더함
+    return ClassStats()
@@ -0,0 +1,66 @@
+from prompt_templates import (
+    ALTERNATIVE_HEADER, ANALYSIS_HEADER, ANALYSIS_INSTRUCTION, AVERAGE_LINE, LOCAL_AVERAGE, LOCAL_ONLY_CHOICE,
+    LOCAL_OPPORTUNITY, LOCAL_RECOMMENDATION, SCORE_LINE, SIMPLE_ALTERNATIVE, SIMPLE_HEADER, WEIGHTS_LINE,
+)
+from report_cache import make_key
+
+# 합리적 소비 리포트 공용 로직
+# 20231520file1.py 앱과 batch_grade.py(수업 후 일괄 채점)가 같은 프롬프트, 같은 캐시 키,
+# 같은 기본 분석을 쓰도록 한곳에 모아 둠. 기본 분석과 순위 기준은 streamlit_app.py도 함께 씀.
+
+# 합리적 소비 앱의 순위 기준 (decision_engine.evaluate의 rank_by). 가격 대비 만족도로 추천함
+RANK_BY = "value"
+
+
+def alternative_label(i):
+    return chr(ord("A") + i)
+
+
+def build_analysis_prompt(theme, budget, evaluation, weights=None):
+    """평가 결과(decision_engine.Evaluation)로 Gemini에 보낼 분석 프롬프트 본문을 만듦.
+
+    분석 지시문은 본문에 넣지 않음. 요청할 때 system=ANALYSIS_INSTRUCTION으로 따로 보냄.
+    """
+    out = ANALYSIS_HEADER.extend([], theme=theme, budget=budget)
+    for i, name in enumerate(evaluation.names):
+        ALTERNATIVE_HEADER.extend(out, label=alternative_label(i), name=name, price=int(evaluation.prices[i]))
+        for j, crit in enumerate(evaluation.criteria):
+            SCORE_LINE.extend(out, criterion=crit, score=evaluation.scores[i][j])
+        AVERAGE_LINE.extend(out, average=evaluation.averages[i])
+    if weights is not None and len(set(weights)) > 1:
+        WEIGHTS_LINE.extend(out, weights=", ".join(f"{c} {w}" for c, w in zip(evaluation.criteria, weights)))
+    return "".join(out).rstrip("\n")
+
+
+def build_simple_prompt(goal, budget, prices, satisfactions):
+    """가격과 만족도만 입력하는 streamlit_app.py의 프롬프트 본문 (지시문은 system=SIMPLE_INSTRUCTION)."""
+    out = SIMPLE_HEADER.extend([], goal=goal, budget=budget)
+    for i, (price, satisfaction) in enumerate(zip(prices, satisfactions)):
+        SIMPLE_ALTERNATIVE.extend(out, label=alternative_label(i), price=price, satisfaction=satisfaction)
+    return "".join(out).rstrip("\n")
+
+
+def alternatives_record(evaluation):
+    # batch_grade.py JSONL 입력과 같은 모양: [{"item": ..., "price": ..., "scores": {"맛": 9, ...}}, ...]
+    return [
+        {"item": name, "price": float(evaluation.prices[i]), "scores": dict(zip(evaluation.criteria, evaluation.scores[i].tolist()))}
+        for i, name in enumerate(evaluation.names)
+    ]
+
+
+def analysis_cache_key(theme, budget, evaluation, weights=None):
+    # 프롬프트를 결정하는 입력만으로 키를 만들어 같은 입력이면 세션/학생이 달라도 리포트를 공유함
+    return make_key("20231520file1", theme=theme, budget=budget, alternatives=alternatives_record(evaluation), weights=weights)
+
+
+def local_recommendation(evaluation):
+    """API를 쓸 수 없을 때 보여 줄 기본 분석 문장들. 추천은 순위 1등(evaluation.best)이라 순위표와 같음."""
+    best = evaluation.best
+    best_item, best_avg = evaluation.names[best], evaluation.averages[best]
+    lines = [LOCAL_RECOMMENDATION.render(item=best_item), LOCAL_AVERAGE.render(average=best_avg)]
+    # 차선책은 순위 2등 (예산 안의 다른 대안이 없으면 포기하는 것도 없음)
+    if evaluation.has_foregone(best):
+        lines.append(LOCAL_OPPORTUNITY.render(item=best_item, foregone=evaluation.names[evaluation.foregone[best]]))
+    else:
+        lines.append(LOCAL_ONLY_CHOICE.render(item=best_item))
+    return lines
@@ -0,0 +1,403 @@
+import argparse
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import sys
+import threading
+from collections import Counter, defaultdict
+from typing import NamedTuple
+
+import numpy as np
+import streamlit as st
+
+from answer_matcher import normalize
+from semantic_cache import word_key
+
+# 수업 자료 찾기 (practice_app.py "수업에서 배운 내용만 답변 가능")
+# data/lessons/의 수업 자료(Markdown, PDF에서 뽑은 텍스트)를 문단(passage)으로 나눠 디스크에 역색인을 만들고,
+# 질문과 가장 잘 맞는 문단을 BM25 점수로 찾음.
+#
+# 낱말 나누기: 말끝("은/는", "인가요")을 뗀 낱말을 두 글자 조각으로 나눔 ("기회비용" -> 기회, 회비, 비용).
+#   한국어는 띄어쓰기와 조사가 제각각이라 낱말 통째보다 두 글자 조각이 "기회비용이란"과 "기회비용"을 함께 찾음.
+# 색인 파일: 한 번 만들 때마다 조각(segment) 하나. 조각마다 낱말 -> (위치, 개수) 사전(json)과
+#   문단 번호/낱말 수 배열(.npy), 문단 본문(jsonl)을 둠. 배열과 본문은 메모리 매핑으로 열어 서버가 뜰 때
+#   전체를 읽지 않고, 찾을 때 필요한 부분만 디스크에서 가져옴.
+# 더하기: 자료 파일이 새로 생기거나 바뀌면 그 파일만 읽어 새 조각을 만들고, 바뀌거나 지운 파일의 옛 문단은
+#   지운 표시만 함. 조각이 MAX_SEGMENTS개를 넘거나 지운 문단이 절반을 넘으면 한 조각으로 새로 만듦.
+#
+# 만들기/찾기 예:
+#   python course_index.py build
+#   python course_index.py search "기회비용이 뭐야?"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LESSONS_DIR = os.getenv("LESSONS_DIR", os.path.join(BASE_DIR, "data", "lessons"))
+INDEX_DIR = os.getenv("COURSE_INDEX_DIR", os.path.join(BASE_DIR, ".cache", "course_index"))
+LESSON_EXTENSIONS = (".md", ".txt")
+PASSAGE_CHARS = 400  # 문단 하나의 최대 글자 수 (짧은 문단은 이만큼까지 이어 붙임)
+MAX_SEGMENTS = 8
+TOP_K = 3
+ANSWER_COVERAGE = 0.5  # 질문 낱말의 이만큼이 들어 있는 문단이면 "찾은 내용"으로, 모자라면 "관련 있는 내용"으로 답함
+K1, B = 1.2, 0.75  # BM25
+# 자료에서 찾을 말이 아닌 물음말 (말끝을 뗀 뒤)
+STOPWORDS = {"뭐", "왜", "어떻게", "어떤", "무슨", "알려줘", "알려", "줘", "설명해줘", "설명해", "해줘", "있어", "뜻"}
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_SENTENCE = re.compile(r"(?<=[.!?。])\s+")
+
+
+class Passage(NamedTuple):
+    source: str  # 자료 파일 이름
+    title: str  # 문단이 속한 제목 (없으면 파일 이름)
+    text: str
+    score: float  # BM25 점수
+    coverage: float  # 질문 낱말 조각(IDF 가중) 가운데 이 문단에 있는 비율 (0~1)
+
+
+def tokens(text):
+    """BM25용 낱말 조각. 한 글자 낱말은 그대로, 두 글자 이상은 두 글자 조각으로."""
+    out = []
+    for word in normalize(text).split():
+        word = word_key(word)
+        if word in STOPWORDS:
+            continue
+        if len(word) == 1 or word.isascii():
+            out.append(word)
+        else:
+            out.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return out
+
+
+def _split_long(text):
+    # 문단이 너무 길면 문장 경계에서 자름
+    if len(text) <= PASSAGE_CHARS:
+        return [text]
+    pieces, current = [], ""
+    for sentence in _SENTENCE.split(text):
+        if current and len(current) + len(sentence) + 1 > PASSAGE_CHARS:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_passages(text, default_title):
+    """자료 본문을 (제목, 문단) 목록으로 나눔. 빈 줄이 문단 경계, Markdown 제목(#)이 나오면 제목이 바뀜."""
+    passages, title, paragraph, current = [], default_title, [], ""
+
+    def flush_paragraph():
+        nonlocal current
+        text = " ".join(paragraph).strip()
+        paragraph.clear()
+        if not text:
+            return
+        for piece in _split_long(text):
+            if current and len(current) + len(piece) + 1 > PASSAGE_CHARS:
+                passages.append((title, current))
+                current = ""
+            current = f"{current}\n{piece}".strip()
+
+    for line in text.splitlines():
+        heading = _HEADING.match(line.strip())
+        if heading:
+            flush_paragraph()
+            if current:
+                passages.append((title, current))
+                current = ""
+            title = heading.group(2).strip() or default_title
+        elif line.strip():
+            paragraph.append(line.strip())
+        else:
+            flush_paragraph()
+    flush_paragraph()
+    if current:
+        passages.append((title, current))
+    return passages
+
+
+def lesson_files(lessons_dir=LESSONS_DIR):
+    """자료 폴더의 파일 이름 -> (수정 시각, 크기)."""
+    files = {}
+    try:
+        entries = list(os.scandir(lessons_dir))
+    except FileNotFoundError:
+        return files
+    for entry in entries:
+        if entry.is_file() and entry.name.lower().endswith(LESSON_EXTENSIONS):
+            stat = entry.stat()
+            files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def read_lesson(path):
+    name = os.path.basename(path)
+    with open(path, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    docs = []
+    for title, passage in split_passages(text, os.path.splitext(name)[0]):
+        counts = Counter(tokens(f"{title} {passage}"))
+        if counts:
+            docs.append(({"source": name, "title": title, "text": passage}, counts))
+    return docs
+
+
+def _segment_base(index_dir, name):
+    return os.path.join(index_dir, name)
+
+
+def write_segment(index_dir, name, docs):
+    """문단 목록 [(본문 정보 dict, 낱말 조각 Counter)]으로 조각 파일을 씀."""
+    base = _segment_base(index_dir, name)
+    postings = defaultdict(list)
+    lengths = np.empty(len(docs), dtype=np.int32)
+    offsets = np.empty(len(docs) + 1, dtype=np.int64)
+    offsets[0] = 0
+    with open(base + ".docs.jsonl", "wb") as f:
+        for doc_id, (doc, counts) in enumerate(docs):
+            lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                postings[term].append((doc_id, tf))
+            line = (json.dumps(doc, ensure_ascii=False) + "\n").encode("utf-8")
+            f.write(line)
+            offsets[doc_id + 1] = offsets[doc_id] + len(line)
+    terms, ids, tfs = {}, [], []
+    for term, entries in postings.items():
+        terms[term] = (len(ids), len(entries))
+        ids.extend(doc_id for doc_id, _ in entries)
+        tfs.extend(min(tf, 65535) for _, tf in entries)
+    np.save(base + ".ids.npy", np.array(ids, dtype=np.int32))
+    np.save(base + ".tfs.npy", np.array(tfs, dtype=np.uint16))
+    np.save(base + ".lengths.npy", lengths)
+    np.save(base + ".offsets.npy", offsets)
+    with open(base + ".terms.json", "w", encoding="utf-8") as f:
+        json.dump(terms, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def _remove_segment(index_dir, name):
+    for suffix in (".docs.jsonl", ".ids.npy", ".tfs.npy", ".lengths.npy", ".offsets.npy", ".terms.json"):
+        try:
+            os.remove(_segment_base(index_dir, name) + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def load_manifest(index_dir):
+    try:
+        with open(os.path.join(index_dir, "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"next": 0, "segments": {}, "files": {}}
+
+
+def _save_manifest(index_dir, manifest):
+    # 조각 파일을 다 쓴 뒤에 목록을 바꿔치기하므로 중간에 멈춰도 이전 색인은 그대로 열림
+    path = os.path.join(index_dir, "manifest.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def update_index(lessons_dir=LESSONS_DIR, index_dir=INDEX_DIR):
+    """자료 폴더에서 새로 생기거나 바뀐 파일만 색인에 더함. (더한 파일 수, 뺀 파일 수)를 돌려줌."""
+    os.makedirs(index_dir, exist_ok=True)
+    manifest = load_manifest(index_dir)
+    segments, files = manifest["segments"], manifest["files"]
+    current = lesson_files(lessons_dir)
+    changed = sorted(name for name, stat in current.items() if files.get(name, {}).get("stat") != list(stat))
+    removed = sorted(name for name in files if name not in current)
+    if not changed and not removed:
+        return 0, 0
+
+    # 바뀌거나 지운 파일의 옛 문단은 지운 표시만 함
+    for name in changed + removed:
+        old = files.pop(name, None)
+        if old:
+            segment = segments[old["segment"]]
+            segment["deleted"] = sorted(set(segment["deleted"]) | set(range(old["first"], old["first"] + old["count"])))
+
+    docs_total = sum(s["docs"] for s in segments.values())
+    deleted_total = sum(len(s["deleted"]) for s in segments.values())
+    rebuild = len(segments) + 1 > MAX_SEGMENTS or deleted_total * 2 > docs_total
+    to_read = sorted(current) if rebuild else changed
+    if rebuild:
+        old_segments, segments, files = list(segments), {}, {}
+    docs = []
+    for name in to_read:
+        first = len(docs)
+        docs.extend(read_lesson(os.path.join(lessons_dir, name)))
+        files[name] = {"stat": list(current[name]), "first": first, "count": len(docs) - first}
+    if docs:
+        segment_name = f"seg-{manifest['next']}"
+        manifest["next"] += 1
+        write_segment(index_dir, segment_name, docs)
+        segments[segment_name] = {"docs": len(docs), "deleted": []}
+        for name in to_read:
+            files[name]["segment"] = segment_name
+    else:
+        for name in to_read:
+            files.pop(name)  # 문단이 하나도 없는 파일 (다음에 바뀌면 다시 봄)
+
+    # 문단이 모두 지워진 조각은 파일째 없앰
+    gone = old_segments if rebuild else [n for n, s in segments.items() if len(s["deleted"]) >= s["docs"]]
+    for name in gone:
+        segments.pop(name, None)
+    manifest["segments"], manifest["files"] = segments, files
+    _save_manifest(index_dir, manifest)
+    for name in gone:
+        _remove_segment(index_dir, name)
+    return len(changed), len(removed)
+
+
+class Segment:
+    """메모리 매핑으로 연 색인 조각 하나."""
+
+    def __init__(self, index_dir, name, info):
+        base = _segment_base(index_dir, name)
+        self.name = name
+        self.ids = np.load(base + ".ids.npy", mmap_mode="r")
+        self.tfs = np.load(base + ".tfs.npy", mmap_mode="r")
+        self.lengths = np.load(base + ".lengths.npy", mmap_mode="r")
+        self.offsets = np.load(base + ".offsets.npy", mmap_mode="r")
+        with open(base + ".terms.json", encoding="utf-8") as f:
+            self.terms = json.load(f)
+        with open(base + ".docs.jsonl", "rb") as f:
+            self._docs = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.live = np.ones(info["docs"], dtype=bool)
+        self.live[info["deleted"]] = False
+        self.size = int(self.live.sum())
+        self.total_length = int(self.lengths[self.live].sum())
+        self.norm = None  # 전체 평균 길이를 알면 CourseIndex가 채움
+
+    def df(self, term):
+        span = self.terms.get(term)
+        return span[1] if span else 0
+
+    def doc(self, doc_id):
+        start, end = int(self.offsets[doc_id]), int(self.offsets[doc_id + 1])
+        return json.loads(self._docs[start:end])
+
+
+class CourseIndex:
+    """디스크의 수업 자료 색인. 열 때 배열을 읽지 않고 메모리 매핑만 함."""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        manifest = load_manifest(index_dir)
+        self.segments = [Segment(index_dir, name, info) for name, info in manifest["segments"].items()]
+        self.sources = sorted(manifest["files"])
+        self.size = sum(s.size for s in self.segments)
+        average = sum(s.total_length for s in self.segments) / self.size if self.size else 1.0
+        for segment in self.segments:
+            # BM25 분모의 문단 길이 부분은 질문과 상관없으므로 미리 계산해 둠
+            segment.norm = (K1 * (1 - B + B * np.asarray(segment.lengths, dtype=np.float32) / average)).astype(np.float32)
+
+    def __len__(self):
+        return self.size
+
+    def idf(self, term):
+        df = sum(s.df(term) for s in self.segments)
+        return math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+
+    def search(self, query, k=TOP_K):
+        """질문과 가장 잘 맞는 문단 k개 (점수 높은 순). 맞는 낱말이 하나도 없으면 빈 목록."""
+        counts = Counter(tokens(query))
+        if not counts or not self.size:
+            return []
+        weights = {term: self.idf(term) * qtf for term, qtf in counts.items()}
+        total = sum(weights.values())
+        found = []
+        for segment in self.segments:
+            scores = np.zeros(len(segment.live), dtype=np.float32)
+            covered = np.zeros(len(segment.live), dtype=np.float32)
+            for term, weight in weights.items():
+                span = segment.terms.get(term)
+                if not span:
+                    continue
+                start, count = span
+                ids = segment.ids[start:start + count]
+                tf = segment.tfs[start:start + count].astype(np.float32)
+                scores[ids] += weight * tf * (K1 + 1) / (tf + segment.norm[ids])
+                covered[ids] += weight
+            scores[~segment.live] = 0
+            top = np.flatnonzero(scores)
+            if len(top) > k:
+                top = top[np.argpartition(scores[top], -k)[-k:]]
+            found.extend((float(scores[i]), float(covered[i]), segment, int(i)) for i in top)
+        found.sort(key=lambda f: -f[0])
+        passages = []
+        for score, covered, segment, doc_id in found[:k]:
+            doc = segment.doc(doc_id)
+            passages.append(Passage(doc["source"], doc["title"], doc["text"], score, covered / total if total else 0.0))
+        return passages
+
+
+class CourseLibrary:
+    """자료 폴더와 색인을 함께 관리함. 폴더에 파일이 생기거나 지워지면 그 파일만 색인하고 다시 엶."""
+
+    def __init__(self, lessons_dir=LESSONS_DIR, index_dir=INDEX_DIR):
+        self.lessons_dir = lessons_dir
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        self.mtime = None
+        self.index = None
+        self.current()
+
+    def current(self):
+        """최신 색인. 폴더의 수정 시각만 확인하므로 질문마다 불러도 됨."""
+        try:
+            mtime = os.stat(self.lessons_dir).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self.mtime or self.index is None:
+            with self._lock:
+                if mtime != self.mtime or self.index is None:
+                    update_index(self.lessons_dir, self.index_dir)
+                    self.index = CourseIndex(self.index_dir)
+                    self.mtime = mtime
+        return self.index
+
+
+def course_answer(passages):
+    """찾은 문단으로 만든 챗봇 답변 (Markdown). 수업 자료에 없는 내용은 지어내지 않음."""
+    if not passages:
+        return "수업에서 배운 내용에서는 찾지 못했어요. 다른 말로 물어보거나 선생님께 여쭤보세요."
+    best = passages[0]
+    intro = "수업 자료에서 찾은 내용이에요." if best.coverage >= ANSWER_COVERAGE else "질문과 꼭 맞는 내용은 없지만, 관련 있는 수업 내용이에요."
+    lines = [intro, "", best.text, "", f"📚 {best.source} · {best.title}"]
+    related = [p.title for p in passages[1:] if p.title != best.title]
+    if related:
+        lines.append(f"함께 보면 좋은 내용: {', '.join(dict.fromkeys(related))}")
+    return "\n".join(lines)
+
+
+@st.cache_resource(show_spinner=False)
+def get_course_library():
+    # 서버 프로세스당 한 번: 바뀐 자료만 색인하고 메모리 매핑으로 엶
+    return CourseLibrary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="수업 자료 색인 만들기/찾기")
+    parser.add_argument("command", choices=["build", "rebuild", "search"])
+    parser.add_argument("query", nargs="?", default="")
+    parser.add_argument("--lessons", default=LESSONS_DIR)
+    parser.add_argument("--index", default=INDEX_DIR)
+    parser.add_argument("-k", type=int, default=TOP_K)
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        shutil.rmtree(args.index, ignore_errors=True)
+    if args.command in ("build", "rebuild"):
+        added, removed = update_index(args.lessons, args.index)
+        index = CourseIndex(args.index)
+        print(f"자료 {len(index.sources)}개, 문단 {len(index):,}개, 조각 {len(index.segments)}개 (새로 색인 {added}개, 뺌 {removed}개)")
+        return 0
+    for passage in CourseIndex(args.index).search(args.query, args.k):
+        print(f"[{passage.score:.2f} / {passage.coverage:.0%}] {passage.source} - {passage.title}\n{passage.text}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
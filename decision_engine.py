@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# 합리적 선택 점수 계산 엔진
+# 대안 N개 × 기준 M개 점수를 행렬 하나로 받아 가중 평균, 경제성 점수, 만원당 만족도,
+# 순위, 파레토 우위(더 나은 대안이 있는지), 대안별 기회비용(포기하는 장점)을 한 번에 계산함.
+# 대안이 20개로 늘어도 반복문 없이 행렬 연산으로 끝나서 화면이 느려지지 않음.
+
+PRICE_CRITERION = "경제성"
+# 순위를 매기는 기준 (evaluate의 rank_by). 추천은 언제나 순위 1등(Evaluation.best)
+RANK_LABELS = {"average": "평균 만족도", "value": "만원당 만족도"}
+
+
+@dataclass
+class Evaluation:
+    names: list
+    criteria: list  # 경제성 점수를 포함했다면 마지막 기준이 "경제성"
+    scores: np.ndarray  # (N, M) 기준별 점수
+    prices: np.ndarray  # (N,)
+    affordable: np.ndarray  # (N,) 예산 안인지
+    averages: np.ndarray  # (N,) 가중 평균 만족도
+    value_per_won: np.ndarray  # (N,) 만원당 만족도, 예산 초과면 -1
+    ranking: np.ndarray  # 추천 순서대로 정렬한 대안 번호
+    rank_by: str  # 순위 기준 ("average" 또는 "value")
+    dominated: np.ndarray  # (N,) 모든 기준에서 같거나 못하면서 더 비싼 대안이 있는지
+    foregone: np.ndarray  # (N,) 그 대안을 고를 때 포기하는 차선책 번호 (순위에서 자신을 뺀 가장 앞 대안)
+    lost: np.ndarray  # (N, M) 차선책이 더 나은 기준 (기회비용)
+
+    @property
+    def best(self):
+        # 추천 대안 (순위 1등)
+        return int(self.ranking[0])
+
+    @property
+    def rank_label(self):
+        return RANK_LABELS[self.rank_by]
+
+    def has_foregone(self, i):
+        """i번째 대안을 고를 때 포기하는 차선책이 있는지 (예산 안의 다른 대안이 없으면 False)."""
+        return len(self.names) > 1 and bool(self.affordable[self.foregone[i]])
+
+    def lost_advantages(self, i):
+        """i번째 대안을 고르면 포기하게 되는 차선책의 장점(기준 이름 목록)."""
+        return [c for c, lost in zip(self.criteria, self.lost[i]) if lost]
+
+
+def price_scores(prices, budget):
+    # 예산 대비 남는 돈이 많을수록 높은 점수(0~10), 예산을 넘거나 예산이 0이면 0점
+    prices = np.asarray(prices, dtype=float)
+    if budget <= 0:
+        return np.zeros_like(prices)
+    return np.where(prices <= budget, (1 - prices / budget) * 10, 0.0)
+
+
+def evaluate(names, criteria, scores, prices, budget, weights=None, include_price_score=False, rank_by="average"):
+    """대안 N개를 평가함. scores는 (N, M) 행렬, weights는 기준별 가중치(없으면 모두 같음).
+
+    rank_by="average"면 평균 만족도, "value"면 만원당 만족도가 높은 순으로 순위를 매김 (예산 안인 대안 먼저).
+    """
+    scores = np.asarray(scores, dtype=float).reshape(len(names), len(criteria))
+    prices = np.asarray(prices, dtype=float)
+    criteria = list(criteria)
+    if include_price_score:
+        scores = np.column_stack([scores, price_scores(prices, budget)])
+        criteria.append(PRICE_CRITERION)
+
+    weights = np.ones(len(criteria)) if weights is None else np.asarray(weights, dtype=float)
+    averages = scores @ weights / weights.sum()
+
+    affordable = prices <= budget
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(prices > 0, averages / prices * 10000, 0.0)
+    value_per_won = np.where(affordable, value, -1.0)
+
+    # 예산 안인 대안 먼저, 그 안에서는 rank_by가 높은 순 (같으면 나머지 하나가 높은 순)
+    if rank_by == "value":
+        ranking = np.lexsort((-averages, -value_per_won, ~affordable))
+    else:
+        ranking = np.lexsort((-value_per_won, -averages, ~affordable))
+
+    # 파레토 우위: j가 모든 기준에서 i 이상이고 가격도 i 이하이며, 하나라도 더 나으면 i는 열등함
+    ge = (scores[None, :, :] >= scores[:, None, :]).all(axis=2) & (prices[None, :] <= prices[:, None])
+    gt = (scores[None, :, :] > scores[:, None, :]).any(axis=2) | (prices[None, :] < prices[:, None])
+    dominated = (ge & gt).any(axis=1)
+
+    # 기회비용: 추천과 같은 순위에서 자신을 뺀 가장 앞 대안(1등은 2등, 나머지는 1등)과, 그 차선책이 더 나은 기준.
+    # 순위는 예산 안인 대안이 먼저이므로 예산 안의 다른 대안이 있으면 차선책도 예산 안임
+    if len(names) > 1:
+        foregone = np.where(np.arange(len(names)) == ranking[0], ranking[1], ranking[0])
+    else:
+        foregone = np.zeros(1, dtype=int)
+    # 살 수 없는 대안은 포기하는 것이 아니므로 장점도 기회비용으로 치지 않음
+    lost = (scores[foregone] > scores) & affordable[foregone][:, None]
+    if len(names) == 1:
+        lost[:] = False
+
+    return Evaluation(
+        names=list(names), criteria=criteria, scores=scores, prices=prices, affordable=affordable,
+        averages=averages, value_per_won=value_per_won, ranking=ranking, rank_by=rank_by, dominated=dominated,
+        foregone=foregone, lost=lost,
+    )
@@ -0,0 +1,206 @@
+import argparse
+import atexit
+import datetime
+import glob
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+from class_stats import get_class_stats
+from metrics import METRICS
+
+# 수업 기록 (교사 검토용)
+# 채팅 질문/답변, 퀴즈 풀이(힌트 단계 포함), 합리적 소비 리포트를 이벤트로 남겨 탭을 닫아도
+# 수업 뒤에 다시 볼 수 있게 함.
+#
+# 앱 스크립트는 큐에 넣기만 하고 바로 돌아감. 디스크 쓰기는 뒤쪽 스레드 하나가 모아서
+# (최대 BATCH개 또는 FLUSH_SECONDS마다) 트랜잭션 한 번으로 커밋하므로 한 반이 동시에 제출해도
+# 학생 화면은 디스크를 기다리지 않음. 파일은 날짜별로 나뉨 (logs/events-2026-03-05.sqlite3).
+#
+# 검토 예:
+#   python event_log.py --since "2026-03-05 09:00" --until "2026-03-05 09:40"
+#   python event_log.py --since "2026-03-05 09:00" --app FinalTest.py --kind quiz
+
+LOG_DIR = os.getenv("EVENT_LOG_DIR", "logs")
+BATCH = 500  # 한 번에 커밋할 최대 이벤트 수
+FLUSH_SECONDS = 0.5  # 이벤트가 적을 때도 이만큼 지나면 커밋
+MAX_PENDING = 50_000  # 큐가 이만큼 쌓이면(디스크 장애 등) 새 이벤트는 버리고 지표에만 남김
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS events ("
+    "id INTEGER PRIMARY KEY, ts REAL, app TEXT, session TEXT, kind TEXT, data TEXT)"
+)
+
+
+def segment_path(log_dir, ts):
+    # 하루에 파일 하나 (로컬 날짜 기준)
+    return os.path.join(log_dir, f"events-{datetime.date.fromtimestamp(ts).isoformat()}.sqlite3")
+
+
+def _connect(path):
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(SCHEMA)
+    db.execute("CREATE INDEX IF NOT EXISTS events_ts ON events (ts)")
+    return db
+
+
+class EventLog:
+    def __init__(self, log_dir=LOG_DIR, batch=BATCH, flush_seconds=FLUSH_SECONDS, max_pending=MAX_PENDING):
+        self.log_dir = log_dir
+        self.batch = batch
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        os.makedirs(log_dir, exist_ok=True)
+        self._queue = queue.SimpleQueue()
+        self._db = None
+        self._db_path = None
+        self.written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, daemon=True, name="event-log")
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def log(self, app, session, kind, **data):
+        """이벤트 하나를 큐에 넣고 바로 돌아감 (디스크를 기다리지 않음)."""
+        if self._queue.qsize() >= self.max_pending:
+            self.dropped += 1
+            METRICS.inc("event_log_dropped_total")
+            return
+        self._queue.put((time.time(), app, session, kind, json.dumps(data, ensure_ascii=False, default=str)))
+
+    def flush(self, timeout=5):
+        """지금까지 넣은 이벤트가 디스크에 쓰일 때까지 기다림 (종료할 때와 검토 직전에 씀)."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            pending, markers = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_seconds
+            while True:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                    break  # flush 요청은 모인 만큼 바로 씀
+                pending.append(item)
+                if len(pending) >= self.batch:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if pending:
+                self._write(pending)
+            for marker in markers:
+                marker.set()
+
+    def _write(self, events):
+        start = time.perf_counter()
+        try:
+            # 날짜가 바뀌면 새 파일로 넘어감 (자정을 걸친 묶음은 날짜별로 나눠 씀)
+            by_path = {}
+            for event in events:
+                by_path.setdefault(segment_path(self.log_dir, event[0]), []).append(event)
+            for path, rows in by_path.items():
+                if path != self._db_path:
+                    if self._db is not None:
+                        self._db.close()
+                    self._db, self._db_path = _connect(path), path
+                with self._db:
+                    self._db.executemany("INSERT INTO events (ts, app, session, kind, data) VALUES (?, ?, ?, ?, ?)", rows)
+            self.written += len(events)
+            METRICS.inc("event_log_written_total", len(events))
+        except sqlite3.Error as e:
+            # 기록 실패가 수업을 멈추게 하지 않도록 지표에만 남김
+            METRICS.inc("event_log_errors_total", type=type(e).__name__)
+        METRICS.observe("event_log_commit_seconds", time.perf_counter() - start)
+
+
+def query(since=None, until=None, app=None, kind=None, session=None, log_dir=LOG_DIR):
+    """기간(since~until, datetime 또는 timestamp) 안의 이벤트를 시간순 dict로 내보냄."""
+    since_ts = since.timestamp() if isinstance(since, datetime.datetime) else (since or 0)
+    until_ts = until.timestamp() if isinstance(until, datetime.datetime) else (until or time.time() + 1)
+    first = datetime.date.fromtimestamp(since_ts).isoformat() if since_ts else ""
+    last = datetime.date.fromtimestamp(until_ts).isoformat()
+
+    where, params = ["ts >= ?", "ts < ?"], [since_ts, until_ts]
+    for column, value in (("app", app), ("kind", kind), ("session", session)):
+        if value:
+            where.append(f"{column} = ?")
+            params.append(value)
+    sql = f"SELECT ts, app, session, kind, data FROM events WHERE {' AND '.join(where)} ORDER BY ts"
+
+    for path in sorted(glob.glob(os.path.join(log_dir, "events-*.sqlite3"))):
+        day = os.path.basename(path)[len("events-"):-len(".sqlite3")]
+        if not first <= day <= last:
+            continue
+        db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            for ts, app_name, session_id, kind_name, data in db.execute(sql, params):
+                yield {"ts": ts, "app": app_name, "session": session_id, "kind": kind_name, **json.loads(data)}
+        finally:
+            db.close()
+
+
+@st.cache_resource
+def get_event_log():
+    # 서버 프로세스당 한 번만 만들어 모든 세션이 같은 쓰기 스레드를 씀
+    return EventLog()
+
+
+def session_id():
+    # 학생 세션을 구분하는 짧은 id (탭마다 하나)
+    if "event_session" not in st.session_state:
+        st.session_state.event_session = uuid.uuid4().hex[:12]
+    return st.session_state.event_session
+
+
+def log_event(app, kind, **data):
+    """앱에서 부르는 간단한 기록 함수. 교사용 우리 반 현황 집계에도 바로 더함."""
+    session = session_id()
+    get_event_log().log(app, session, kind, **data)
+    get_class_stats().publish(app, session, kind, data)
+
+
+def log_event_once(app, kind, key, **data):
+    """재실행마다 불려도 key마다 한 번만 기록함 (재실행 뒤에 도착하는 AI 리포트 등). 기록했으면 True."""
+    logged = st.session_state.setdefault("event_logged", set())
+    if key in logged:
+        return False
+    logged.add(key)
+    log_event(app, kind, **data)
+    return True
+
+
+def _parse_time(text):
+    return datetime.datetime.fromisoformat(text) if text else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="수업 기록 보기")
+    parser.add_argument("--since", help="시작 시각 (예: 2026-03-05 09:00)")
+    parser.add_argument("--until", help="끝 시각")
+    parser.add_argument("--app", help="앱 파일 이름 (예: FinalTest.py)")
+    parser.add_argument("--kind", help="이벤트 종류 (chat, quiz, report)")
+    parser.add_argument("--session", help="세션 id")
+    parser.add_argument("--log-dir", default=LOG_DIR)
+    args = parser.parse_args(argv)
+
+    for event in query(_parse_time(args.since), _parse_time(args.until), args.app, args.kind, args.session, args.log_dir):
+        event["time"] = datetime.datetime.fromtimestamp(event.pop("ts")).isoformat(timespec="seconds")
+        print(json.dumps(event, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
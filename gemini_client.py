@@ -0,0 +1,246 @@
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import streamlit as st
+
+from metrics import METRICS
+from prompt_templates import request_tokens
+from rate_limiter import RateLimiter, estimate_tokens
+from single_flight import Cancelled, SingleFlight
+
+# Gemini API 공용 클라이언트
+# 앱마다 버튼을 누를 때마다 requests.post를 새로 부르면 매번 TCP+TLS 연결을 새로 맺고,
+# timeout이 없어 느린 응답 하나가 학생 화면을 계속 붙잡아 둘 수 있음.
+# 서버 프로세스당 한 번만 만들어 연결을 재사용(keep-alive)하고 timeout을 항상 적용함.
+# requests(불러오는 데 수십 ms)는 첫 요청 때 불러옴: API를 부르지 않는 첫 화면은 그만큼 빨리 뜸.
+
+# GEMINI_API_BASE를 지정하면 로컬 대역 서버(mock_gemini_server.py)로 보낼 수 있음
+API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
+
+# (연결 timeout, 읽기 timeout) 초 단위
+DEFAULT_TIMEOUT = (5, 60)
+
+# 한 반(30명 안팎)이 동시에 요청해도 연결을 새로 맺지 않도록 풀 크기를 넉넉히 잡음
+POOL_SIZE = 32
+
+# 분당 요청 수/토큰 수 한도 (API 키 등급에 맞게 환경 변수로 조정)
+DEFAULT_RPM = int(os.getenv("GEMINI_RPM", 15))
+DEFAULT_TPM = int(os.getenv("GEMINI_TPM", 1_000_000))
+# 순서를 이만큼(초) 기다려도 차례가 안 오면 포기하고 대체 분석으로 넘어감
+QUEUE_TIMEOUT = 90
+
+# 429(한도 초과), 5xx(서버 일시 오류)는 잠시 뒤 다시 시도함
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+
+def extract_text(result):
+    """Gemini 응답 JSON에서 candidates[0].content.parts[0].text를 꺼냄. 없으면 None."""
+    try:
+        return result["candidates"][0]["content"]["parts"][0]["text"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def _contents_text(contents):
+    return "".join(part.get("text", "") for content in contents for part in content.get("parts", []))
+
+
+def _payload(contents, system=None):
+    # 고정 지시문은 systemInstruction으로 따로 보내 본문(contents)에는 학생마다 다른 내용만 남김
+    payload = {"contents": contents}
+    if system:
+        payload["systemInstruction"] = {"parts": [{"text": system}]}
+    return payload
+
+
+def _record_output(text):
+    # 받은 글자 수와 토큰 수(추정)를 지표에 남김
+    METRICS.inc("gemini_chars_out_total", len(text))
+    METRICS.inc("gemini_tokens_out_total", estimate_tokens(text))
+
+
+def retry_delay(response, attempt):
+    """다시 시도하기 전 기다릴 시간(초). 서버가 알려 준 시간이 있으면 따르고, 없으면 지수 백오프+지터."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            try:
+                return min(max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()), BACKOFF_MAX)
+            except (TypeError, ValueError):
+                pass
+    # Gemini는 429 본문의 RetryInfo에 "retryDelay": "12s" 형식으로 알려 주기도 함
+    try:
+        for detail in response.json()["error"]["details"]:
+            if "retryDelay" in detail:
+                return min(float(detail["retryDelay"].rstrip("s")), BACKOFF_MAX)
+    except (ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _check_cancel(cancel):
+    # 새 요청에 밀려 결과가 필요 없어진 요청은 보내기 전, 재시도 전, 스트리밍 조각 사이에서 멈춤
+    if cancel is not None and cancel.is_set():
+        METRICS.inc("gemini_cancelled_total")
+        raise Cancelled()
+
+
+def new_session(pool_size=POOL_SIZE):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+class GeminiClient:
+    def __init__(self, api_key, model, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, api_base=API_BASE):
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.api_base = api_base
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+
+        # 같은 프롬프트가 동시에 여러 세션에서 들어오면 요청 한 번으로 합침
+        self.flight = SingleFlight()
+
+        # 프로세스 전체 요청을 RPM/TPM 한도 안에서 먼저 온 순서대로 내보냄
+        self.limiter = RateLimiter(rpm, tpm)
+        self.retries = 0
+        self._retries_lock = threading.Lock()  # 여러 작업 스레드가 함께 더함
+
+    @property
+    def session(self):
+        # 첫 요청 때 만듦 (requests도 이때 불러옴)
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = new_session(self.pool_size)
+        return self._session
+
+    def _url(self, method):
+        return f"{self.api_base}/models/{self.model}:{method}"
+
+    def _post(self, method, payload, params=None, stream=False, on_wait=None, cancel=None):
+        """요청 한도를 지켜 보내고, 429/5xx면 기다렸다가 다시 보냄.
+
+        on_wait(안내 문구)는 차례를 기다리거나 재시도를 기다릴 때 호출되어 학생에게 상황을 알려 줌.
+        cancel(threading.Event)이 켜지면 아직 보내지 않은 요청은 보내지 않고 Cancelled를 올림.
+        """
+        import requests
+
+        body = _contents_text(payload["contents"])
+        system = _contents_text([payload.get("systemInstruction", {})])
+        tokens = request_tokens(body, system)
+        METRICS.inc("gemini_chars_in_total", len(body) + len(system))
+        METRICS.inc("gemini_tokens_in_total", tokens)
+
+        def show_position(ahead):
+            if on_wait is not None:
+                on_wait(f"⏳ 요청이 많아 차례를 기다리고 있어요. (앞에 {ahead}명)" if ahead else "⏳ 곧 보낼게요. 잠시만 기다려 주세요.")
+
+        for attempt in range(MAX_RETRIES + 1):
+            _check_cancel(cancel)
+            with METRICS.timer("gemini_queue_wait_seconds"):
+                acquired = self.limiter.acquire(tokens, on_wait=show_position, timeout=QUEUE_TIMEOUT, cancel=cancel)
+            _check_cancel(cancel)
+            if not acquired:
+                METRICS.inc("gemini_errors_total", type="QueueTimeout")
+                raise requests.exceptions.Timeout("요청이 많아 기다리는 시간이 너무 길어졌습니다.")
+            start = time.perf_counter()
+            try:
+                response = self.session.post(
+                    self._url(method),
+                    params={"key": self.api_key, **(params or {})},
+                    json=payload,
+                    timeout=self.timeout,
+                    stream=stream,
+                )
+            except requests.exceptions.RequestException as e:
+                METRICS.inc("gemini_errors_total", type=type(e).__name__)
+                raise
+            METRICS.observe("gemini_request_seconds", time.perf_counter() - start, method=method)
+            METRICS.inc("gemini_requests_total", method=method, status=response.status_code)
+            if response.status_code not in RETRY_STATUS or attempt == MAX_RETRIES:
+                break
+            delay = retry_delay(response, attempt)
+            response.close()
+            with self._retries_lock:
+                self.retries += 1
+            METRICS.inc("gemini_retries_total", status=response.status_code)
+            if on_wait is not None:
+                on_wait(f"⏳ AI가 바빠서 {math.ceil(delay)}초 뒤에 다시 시도할게요. ({attempt + 1}/{MAX_RETRIES})")
+            if cancel is not None:
+                cancel.wait(delay)
+            else:
+                time.sleep(delay)
+        if not response.ok:
+            METRICS.inc("gemini_errors_total", type=f"HTTP {response.status_code}")
+        response.raise_for_status()
+        return response
+
+    def generate(self, contents, on_wait=None, system=None, cancel=None):
+        """contents 목록을 보내고 응답 JSON 전체를 돌려줌. HTTP 오류는 예외로 올림."""
+        result = self._post("generateContent", _payload(contents, system), on_wait=on_wait, cancel=cancel).json()
+        _record_output(extract_text(result) or "")
+        return result
+
+    def stream_text(self, contents, on_wait=None, system=None, cancel=None):
+        """streamGenerateContent(SSE)로 답변을 받으며 도착한 텍스트 조각을 하나씩 내보냄.
+
+        cancel이 켜지면 남은 조각을 받지 않고 연결을 닫음 (Cancelled).
+        """
+        start = time.perf_counter()
+        received = ""
+        with self._post(
+            "streamGenerateContent", _payload(contents, system), params={"alt": "sse"}, stream=True, on_wait=on_wait,
+            cancel=cancel,
+        ) as response:
+            # SSE는 charset 없이 오는 경우가 있어 바이트로 받아 직접 UTF-8로 풀어야 한글이 깨지지 않음
+            for line in response.iter_lines():
+                _check_cancel(cancel)
+                # SSE 형식: "data: {...}" 줄마다 응답 조각 하나, 빈 줄은 이벤트 구분
+                if not line.startswith(b"data:"):
+                    continue
+                text = extract_text(json.loads(line[5:].decode("utf-8")))
+                if text:
+                    if not received:
+                        METRICS.observe("gemini_first_chunk_seconds", time.perf_counter() - start)
+                    received += text
+                    yield text
+        _record_output(received)
+
+    def generate_text(self, prompt, on_wait=None, system=None, cancel=None):
+        """프롬프트 한 개를 보내고 답변 텍스트만 돌려줌. 답변이 비어 있으면 None.
+
+        system을 주면 systemInstruction(고정 지시문)으로 따로 보냄.
+        같은 프롬프트로 진행 중인 요청이 있으면 새로 보내지 않고 그 결과를 함께 받음.
+        """
+        key = hashlib.sha256(f"{system or ''}\0{prompt}".encode("utf-8")).hexdigest()
+        contents = [{"parts": [{"text": prompt}]}]
+        return self.flight.do(
+            key, lambda: extract_text(self.generate(contents, on_wait=on_wait, system=system, cancel=cancel)), cancel=cancel
+        )
+
+
+@st.cache_resource
+def get_client(api_key, model, api_base=API_BASE):
+    # 서버 프로세스당 (키, 모델, 주소) 조합마다 한 번만 만들어져 모든 세션이 공유함
+    return GeminiClient(api_key, model, api_base=api_base)
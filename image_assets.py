@@ -0,0 +1,138 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+
+# 퀴즈 이미지 로컬 캐시
+# 원격 원본(440~640px)을 정답 때마다, 기록을 다시 그릴 때마다 모든 학생이 새로 내려받지 않도록
+# 이미지마다 한 번만 가져와서 화면 크기(300px)에 맞춘 썸네일을 디스크에 저장하고,
+# 서버 메모리에 올려 둔 바이트를 바로 보여 줌. 한 번 받아 두면 학교망이 끊겨도 퀴즈가 동작함.
+# 원본을 assets/images/에 함께 배포하면 처음부터 내려받지 않음.
+# 썸네일이 디스크에 다 있으면 requests와 PIL은 불러오지 않음 (서버 시작이 그만큼 빨라짐).
+
+BASE_DIR = Path(__file__).resolve().parent
+# 원본 이미지를 함께 배포하려면 여기에 "<동물 이름>.jpg|png|webp"로 넣어 둠 (있으면 다운로드하지 않음)
+BUNDLED_DIR = BASE_DIR / "assets" / "images"
+THUMB_DIR = Path(os.getenv("IMAGE_CACHE_DIR", BASE_DIR / ".cache" / "thumbnails"))
+
+THUMB_WIDTH = 300
+THUMB_FORMAT = "WEBP"
+BUNDLED_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+# 위키미디어는 User-Agent가 없는 요청을 거절함
+HEADERS = {"User-Agent": "SNUE-Chatbot/1.0 (classroom quiz image cache)"}
+DOWNLOAD_TIMEOUT = (5, 20)
+RETRY_SECONDS = 60  # 가져오지 못한 이미지를 다시 시도하기까지의 간격
+
+
+def _thumb_path(url):
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    return THUMB_DIR / f"{digest}_{THUMB_WIDTH}.{THUMB_FORMAT.lower()}"
+
+
+def _read_source(name, url):
+    for suffix in BUNDLED_SUFFIXES:
+        bundled = BUNDLED_DIR / f"{name}{suffix}"
+        if bundled.exists():
+            return bundled.read_bytes()
+    import requests
+
+    response = requests.get(url, headers=HEADERS, timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
+def make_thumbnail(data, width=THUMB_WIDTH):
+    """이미지 바이트를 width 픽셀 폭의 WebP 바이트로 줄임 (원본이 더 작으면 크기는 그대로)."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, THUMB_FORMAT, quality=80)
+        return out.getvalue()
+
+
+def load_thumbnail(name, url):
+    """디스크 캐시에 썸네일이 있으면 읽고, 없으면 만들어 저장한 뒤 바이트를 돌려줌."""
+    path = _thumb_path(url)
+    if path.exists():
+        return path.read_bytes()
+
+    thumb = make_thumbnail(_read_source(name, url))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 여러 세션이 동시에 만들어도 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 바꿔치기함
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(thumb)
+    os.replace(tmp_path, path)
+    return thumb
+
+
+class ImageCache:
+    """퀴즈 이미지 썸네일을 이미지마다 따로 불러 메모리에 두는 저장소 (서버 프로세스당 하나).
+
+    만들 때 모든 이미지를 뒤쪽 스레드에서 한꺼번에 준비하므로 첫 학생 화면은 내려받기를 기다리지 않음.
+    아직 준비되지 않았거나 가져오지 못한 이미지는 원래 URL로 보여 주고, 실패는 기억하지 않고
+    RETRY_SECONDS 뒤 다음 요청 때 다시 시도함 (서버를 켤 때 학교망이 끊겨 있어도 나중에 채워짐).
+    """
+
+    def __init__(self, images):
+        self.names = {url: name for name, url in images}  # URL -> 동물 이름 (함께 배포한 원본을 찾을 때 씀)
+        self._lock = threading.Lock()
+        self._thumbs = {}  # URL -> 썸네일 바이트 (성공한 것만)
+        self._fetching = set()
+        self._failed = {}  # URL -> 마지막 실패 시각
+        for url in self.names:
+            self._fetch_later(url)
+
+    def source(self, url):
+        """st.image에 넘길 것: 준비된 썸네일 바이트, 아직 없으면 원래 URL."""
+        thumb = self._thumbs.get(url)
+        if thumb is not None:
+            return thumb
+        if url in self.names:
+            self._fetch_later(url)
+        return url
+
+    def ready(self, timeout=None):
+        """뒤쪽 스레드가 모두 끝날 때까지 기다림 (테스트와 미리 받아 두기용). 다 끝났으면 True."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._fetching:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _fetch_later(self, url):
+        with self._lock:
+            failed = self._failed.get(url)
+            if url in self._fetching or url in self._thumbs or (failed is not None and time.monotonic() - failed < RETRY_SECONDS):
+                return
+            self._fetching.add(url)
+        threading.Thread(target=self._fetch, args=(url,), daemon=True, name="image-cache").start()
+
+    def _fetch(self, url):
+        try:
+            thumb = load_thumbnail(self.names[url], url)
+        except Exception:
+            # 내려받기 실패, 깨진 이미지, 디스크 오류 등: 뒤쪽 스레드라 여기서 막지 않으면 다시 시도하지 못함
+            with self._lock:
+                self._failed[url] = time.monotonic()
+                self._fetching.discard(url)
+            return
+        with self._lock:
+            self._thumbs[url] = thumb
+            self._failed.pop(url, None)
+            self._fetching.discard(url)
+
+
+@st.cache_resource(show_spinner=False)
+def get_image_cache(images):
+    """(이름, URL) 쌍들의 이미지 저장소. 처음 부를 때 모든 썸네일을 뒤에서 준비하기 시작함."""
+    return ImageCache(images)
@@ -0,0 +1,205 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+from itertools import islice
+
+import streamlit as st
+
+from metrics import METRICS
+
+# 세션별 대화 기록 저장소
+# st.session_state.messages를 dict 목록으로 두면 하루 종일 열려 있는 세션마다 기록이 끝없이 쌓이고,
+# 매 재실행마다 전체를 다시 그려서 턴이 늘수록 느려짐.
+# 최근 메시지 몇 개만 메모리에(__slots__ 객체) 두고, 오래된 메시지는 SQLite 파일로 내림.
+# 화면에는 최근 PAGE개만 그리고 "이전 대화 더 보기"를 누를 때마다 PAGE개씩 더 불러옴.
+# 한동안 쓰지 않은 세션은 메모리의 메시지도 모두 파일로 내려 메모리를 비움.
+
+STORE_PATH = os.getenv("MESSAGE_STORE_PATH", os.path.join(".cache", "messages.sqlite3"))
+TAIL = 40  # 메모리에 두는 최근 메시지 수
+TAIL_CHARS = 20_000  # 메모리에 두는 최근 메시지의 글자 수 상한
+PAGE = 20  # 화면에 한 번에 그리는 메시지 수
+IDLE_SECONDS = 30 * 60  # 이만큼 쓰지 않은 세션은 메모리의 메시지를 모두 파일로 내림
+KEEP_SECONDS = 24 * 3600  # 파일에 남긴 기록의 보관 기간
+SWEEP_SECONDS = 60  # 쉬는 세션을 찾는 간격
+
+
+class Message:
+    __slots__ = ("role", "content", "ui_only", "image_url")
+
+    def __init__(self, role, content, ui_only=False, image_url=None):
+        self.role = role
+        self.content = content
+        self.ui_only = ui_only
+        self.image_url = image_url
+
+    # 예전 dict 메시지처럼 message["content"], message.get("ui_only")로도 읽을 수 있게 함
+    def __getitem__(self, key):
+        value = getattr(self, key) if key in self.__slots__ else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __repr__(self):
+        return f"Message({self.role!r}, {self.content[:20]!r})"
+
+
+class SpillFile:
+    """오래된 메시지를 내려 두는 SQLite 파일. 서버 프로세스의 모든 세션이 함께 씀."""
+
+    def __init__(self, path=STORE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "session TEXT, seq INTEGER, role TEXT, content TEXT, ui_only INTEGER, image_url TEXT, created REAL, "
+            "PRIMARY KEY (session, seq)) WITHOUT ROWID"
+        )
+        self.stores = weakref.WeakSet()
+        self.swept = time.monotonic()
+        self.purge_older(KEEP_SECONDS)
+
+    def register(self, store):
+        with self._lock:
+            self.stores.add(store)
+
+    def append(self, session, first_seq, messages):
+        now = time.time()
+        rows = [(session, first_seq + i, m.role, m.content, int(m.ui_only), m.image_url, now) for i, m in enumerate(messages)]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        METRICS.inc("message_spilled_total", len(rows))
+
+    def load(self, session, start, stop):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT role, content, ui_only, image_url FROM messages WHERE session = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session, start, stop),
+            ).fetchall()
+        return [Message(role, content, bool(ui_only), image_url) for role, content, ui_only, image_url in rows]
+
+    def purge(self, session):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM messages WHERE session = ?", (session,))
+
+    def purge_older(self, seconds):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM messages WHERE created < ?", (time.time() - seconds,))
+
+    def sweep(self, now=None):
+        """IDLE_SECONDS 넘게 쓰지 않은 세션의 메모리 메시지를 모두 파일로 내림."""
+        now = time.monotonic() if now is None else now
+        if now - self.swept < SWEEP_SECONDS:
+            return
+        self.swept = now
+        with self._lock:
+            stores = list(self.stores)
+        for store in stores:
+            if now - store.touched > IDLE_SECONDS and store.recent:
+                store.spill(len(store.recent))
+                METRICS.inc("message_sessions_evicted_total")
+
+
+@st.cache_resource
+def get_spill_file():
+    # 서버 프로세스당 한 번만 열어 모든 세션이 공유함
+    return SpillFile()
+
+
+class MessageStore:
+    """세션 하나의 대화 기록. 최근 TAIL개(또는 TAIL_CHARS자)만 메모리에 두고 나머지는 파일로 내림.
+
+    append()는 예전처럼 {"role": ..., "content": ...} dict를 받음.
+    """
+
+    def __init__(self, messages=(), spill=None, tail=TAIL, tail_chars=TAIL_CHARS):
+        self.session = uuid.uuid4().hex
+        self.spill_file = spill if spill is not None else get_spill_file()
+        self.tail = tail
+        self.tail_chars = tail_chars
+        self.recent = deque()
+        self.recent_chars = 0
+        self.spilled = 0  # 파일로 내린 메시지 수 (앞에서부터)
+        self.touched = time.monotonic()
+        self._lock = threading.Lock()
+        self.spill_file.register(self)
+        # 세션이 끝나 저장소가 사라지면 파일에 남긴 기록도 지움
+        weakref.finalize(self, self.spill_file.purge, self.session)
+        for message in messages:
+            self.append(message)
+
+    def __len__(self):
+        return self.spilled + len(self.recent)
+
+    def __iter__(self):
+        return iter(self.since(0))
+
+    def _touch(self):
+        self.touched = time.monotonic()
+        self.spill_file.sweep()
+
+    def append(self, message):
+        if not isinstance(message, Message):
+            message = Message(**message)
+        with self._lock:
+            self.recent.append(message)
+            self.recent_chars += len(message.content)
+            # 넘칠 때마다 한 개씩 쓰지 않고 상한의 절반까지 한꺼번에 내려 파일 쓰기 횟수를 줄임
+            if len(self.recent) > self.tail or self.recent_chars > self.tail_chars:
+                self._spill(self._overflow())
+        self._touch()
+
+    def _overflow(self):
+        # 개수와 글자 수가 모두 상한의 절반 아래로 내려가도록 앞에서부터 내릴 개수 (마지막 메시지는 남김)
+        count = max(0, len(self.recent) - self.tail // 2)
+        remaining = self.recent_chars - sum(len(m.content) for m in islice(self.recent, count))
+        while remaining > self.tail_chars // 2 and count < len(self.recent) - 1:
+            remaining -= len(self.recent[count].content)
+            count += 1
+        return count
+
+    def spill(self, count):
+        with self._lock:
+            self._spill(count)
+
+    def _spill(self, count):
+        moving = [self.recent.popleft() for _ in range(min(count, len(self.recent)))]
+        if moving:
+            self.spill_file.append(self.session, self.spilled, moving)
+            self.spilled += len(moving)
+            self.recent_chars -= sum(len(m.content) for m in moving)
+
+    def since(self, start):
+        """start번째(0부터)부터 끝까지의 메시지 목록. 메모리에 있는 부분은 파일을 읽지 않음."""
+        with self._lock:
+            spilled, recent = self.spilled, list(self.recent)
+        if start >= spilled:
+            return recent[start - spilled:]
+        return self.spill_file.load(self.session, start, spilled) + recent
+
+    def latest(self, count):
+        """화면에 그릴 마지막 count개 메시지."""
+        self._touch()
+        return self.since(max(0, len(self) - count))
+
+
+def show_earlier_button(store, key="shown_messages"):
+    """그리지 않은 이전 메시지가 있으면 "이전 대화 더 보기" 버튼을 보여 주고, 누르면 PAGE개 더 보여 줌."""
+    hidden = len(store) - st.session_state.setdefault(key, PAGE)
+    if hidden > 0 and st.button(f"⬆️ 이전 대화 더 보기 ({hidden}개)", key=f"{key}_button"):
+        st.session_state[key] += PAGE
+    return st.session_state[key]
@@ -0,0 +1,269 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+# 운영 지표 (가벼운 계측)
+# 스크립트 재실행 시간, Gemini 호출 지연/토큰 수, 캐시 적중, 대체 분석으로 넘어간 횟수, 오류 종류를
+# 서버 프로세스 전체에서 모음. 기록 한 번은 잠금 + dict 갱신뿐이라 몇 마이크로초면 끝나서 항상 켜 둠.
+#
+# 보는 방법:
+#   - METRICS_PORT를 지정하면 http://127.0.0.1:<포트>/metrics (Prometheus 텍스트),
+#     /metrics.json (JSON)으로 내보냄
+#   - TEACHER_KEY를 지정하고 앱 주소에 ?teacher=<키>를 붙이면 사이드바에 교사용 지표 패널이 보임
+
+# 지연 시간 구간(초). 재실행(수십 ms)부터 AI 응답(수십 초)까지 한 구간표로 다룸
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """구간표로 어림한 분위수(해당 구간의 위쪽 경계). 기록이 없으면 None."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _escape_label(value):
+    # Prometheus 텍스트 형식: 라벨 값 안의 \, ", 줄바꿈은 이스케이프해야 함 (오류 메시지 등이 라벨에 들어감)
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def total(self, name, **labels):
+        """이름이 name이고 labels가 모두 맞는 카운터의 합."""
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(v for (n, l), v in self.counters.items() if n == name and wanted <= set(l))
+
+    def by_label(self, name, label):
+        """카운터 name을 label 값별로 합친 dict."""
+        result = {}
+        with self._lock:
+            for (n, labels), v in self.counters.items():
+                if n == name:
+                    value = dict(labels).get(label, "")
+                    result[value] = result.get(value, 0) + v
+        return result
+
+    def merged_histogram(self, name, **labels):
+        """이름이 name이고 labels가 모두 맞는 히스토그램을 하나로 합침."""
+        wanted = set(labels.items())
+        merged = Histogram()
+        with self._lock:
+            for (n, l), h in self.histograms.items():
+                if n == name and wanted <= set(l):
+                    merged.counts = [a + b for a, b in zip(merged.counts, h.counts)]
+                    merged.sum += h.sum
+                    merged.count += h.count
+        return merged
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started, 1),
+                "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.counters.items())],
+                "histograms": [
+                    {"name": n, "labels": dict(l), "count": h.count, "sum": round(h.sum, 6),
+                     "buckets": dict(zip([*map(str, h.buckets), "+Inf"], h.counts))}
+                    for (n, l), h in sorted(self.histograms.items())
+                ],
+            }
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = [(k, list(h.counts), h.sum, h.count, h.buckets) for k, h in sorted(self.histograms.items())]
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), counts, total, count, buckets in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, n in zip([*map(str, buckets), "+Inf"], counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# 서버 프로세스 전체가 함께 쓰는 지표 저장소 (batch_grade.py처럼 Streamlit 밖에서도 씀)
+METRICS = Metrics()
+
+
+def _handler_class():
+    # METRICS_PORT를 켰을 때만 http.server를 불러옴 (앱 첫 실행을 가볍게 하려고 모듈 맨 위에서 불러오지 않음)
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body, content_type = METRICS.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body, content_type = json.dumps(METRICS.snapshot(), ensure_ascii=False), "application/json; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return MetricsHandler
+
+
+def start_exporter(port, host="127.0.0.1"):
+    """백그라운드 스레드에서 /metrics, /metrics.json을 내보내는 HTTP 서버를 띄움."""
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, port), _handler_class())
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-exporter").start()
+    return server
+
+
+@st.cache_resource
+def get_exporter():
+    # 서버 프로세스당 한 번만 띄움. METRICS_PORT가 없으면 띄우지 않음
+    port = os.getenv("METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return start_exporter(int(port), os.getenv("METRICS_HOST", "127.0.0.1"))
+    except OSError:
+        # 같은 포트를 이미 다른 앱이 쓰고 있으면 그쪽 내보내기에 맡김
+        return None
+
+
+def is_teacher():
+    # 교사용 패널은 TEACHER_KEY를 아는 사람만 (?teacher=<키>)
+    key = os.getenv("TEACHER_KEY")
+    return bool(key) and st.query_params.get("teacher") == key
+
+
+class RerunTimer:
+    """스크립트 재실행 한 번의 시간을 잼. 앱 맨 위에서 만들고 맨 아래에서 finish()를 부름.
+
+    st.stop()/st.rerun()으로 중간에 끝난 재실행은 세지 않음.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.start = time.perf_counter()
+        get_exporter()
+
+    def finish(self):
+        METRICS.observe("streamlit_rerun_seconds", time.perf_counter() - self.start, app=self.app)
+        if is_teacher():
+            teacher_panel()
+            # 우리 반 현황: 교사 화면에서만 쓰므로 그때 불러옴 (pandas 포함)
+            from class_dashboard import class_dashboard
+
+            st.divider()
+            class_dashboard()
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:,.0f}ms"
+
+
+def teacher_panel():
+    with st.sidebar.expander("📊 운영 지표 (교사용)"):
+        reruns = METRICS.merged_histogram("streamlit_rerun_seconds")
+        st.write(f"재실행 {reruns.count}회 · p50 {_ms(reruns.quantile(0.5))} · p95 {_ms(reruns.quantile(0.95))}")
+
+        calls = METRICS.merged_histogram("gemini_request_seconds")
+        st.write(f"Gemini 호출 {calls.count}회 · p50 {_ms(calls.quantile(0.5))} · p95 {_ms(calls.quantile(0.95))}")
+        st.write(
+            f"토큰(추정) 보냄 {METRICS.total('gemini_tokens_in_total'):,} · 받음 {METRICS.total('gemini_tokens_out_total'):,}"
+        )
+
+        hits = METRICS.total("report_cache_lookups_total", result="hit")
+        lookups = METRICS.total("report_cache_lookups_total")
+        st.write(f"리포트 캐시 적중 {hits}/{lookups}회")
+
+        reused = METRICS.total("semantic_cache_lookups_total", result="hit")
+        asked = reused + METRICS.total("semantic_cache_lookups_total", result="miss")
+        if asked:
+            st.write(f"비슷한 질문 답 재사용 {reused}/{asked}회 ({reused / asked:.0%})")
+
+        fallbacks = METRICS.by_label("report_fallbacks_total", "reason")
+        errors = METRICS.by_label("gemini_errors_total", "type")
+        if fallbacks:
+            st.write("대체 분석: " + ", ".join(f"{k} {v}" for k, v in sorted(fallbacks.items())))
+        if errors:
+            st.write("오류: " + ", ".join(f"{k} {v}" for k, v in sorted(errors.items())))
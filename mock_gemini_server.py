@@ -0,0 +1,179 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 로컬 Gemini 대역(stand-in) 서버
+# 네트워크나 API 키 없이 앱을 시험할 수 있도록 generateContent와
+# streamGenerateContent(SSE) 응답 형식을 흉내 냄.
+#
+# 부하 시험용으로 지연 분포, 5xx 오류 비율, 429(한도 초과) 비율을 프로필로 고를 수 있음.
+#
+# 실행 예:
+#   python mock_gemini_server.py --port 8765
+#   python mock_gemini_server.py --profile quota     # 요청 5개 중 1개는 429
+#   GEMINI_API_BASE=http://127.0.0.1:8765/v1beta streamlit run Practice.py
+
+# 프로필: latency(평균 지연), jitter(지연 편차), error_rate(500 비율), rate_limit_rate(429 비율)
+PROFILES = {
+    "fast": {"latency": 0.0, "jitter": 0.0, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    "classroom": {"latency": 0.8, "jitter": 0.4, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    "flaky": {"latency": 0.8, "jitter": 0.4, "error_rate": 0.1, "rate_limit_rate": 0.0},
+    "quota": {"latency": 0.8, "jitter": 0.4, "error_rate": 0.0, "rate_limit_rate": 0.2},
+}
+
+
+def make_answer(contents):
+    # 마지막 사용자 발화를 받아 적당한 길이의 한국어 답변을 만들어 냄
+    question = ""
+    for content in contents:
+        for part in content.get("parts", []):
+            question = part.get("text", question)
+    question = question.strip().splitlines()[0] if question.strip() else ""
+    return (
+        f"(대역 서버 답변) '{question[:40]}'에 대해 알려 줄게요. "
+        "합리적 선택이란 주어진 예산 안에서 가장 큰 만족을 주는 대안을 고르는 것이에요. "
+        "하나를 고르면 다른 하나를 포기해야 하는데, 이때 포기한 것의 가치를 기회비용이라고 해요."
+    )
+
+
+def candidate(text):
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+def split_chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # 부하 시험 때 터미널이 로그로 넘치지 않도록 조용히 둠
+        pass
+
+    def do_POST(self):
+        options = self.server.options
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        answer = make_answer(body.get("contents", []))
+
+        path = self.path.split("?", 1)[0]
+        method = path.rsplit(":", 1)[-1]
+        if method not in ("generateContent", "streamGenerateContent"):
+            self._send_json(404, {"error": {"code": 404, "message": "not found"}})
+            return
+        self.server.count(method)
+        if "systemInstruction" in body:
+            self.server.count("systemInstruction")
+
+        roll = self.server.random.random()
+        if roll < options["rate_limit_rate"]:
+            self.server.count("429")
+            self._send_json(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": "quota"}},
+                            {"Retry-After": "1"})
+            return
+        if roll < options["rate_limit_rate"] + options["error_rate"]:
+            self.server.count("500")
+            self._send_json(500, {"error": {"code": 500, "status": "INTERNAL", "message": "mock error"}})
+            return
+
+        if method == "streamGenerateContent":
+            self._stream(answer, options)
+        else:
+            time.sleep(self.server.delay())
+            self._send_json(200, candidate(answer))
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, answer, options):
+        # 실제 API처럼 조각마다 "data: {...}\r\n\r\n" 형식으로 보내고 연결을 닫음
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        time.sleep(self.server.delay())
+        for chunk in split_chunks(answer, options["chunk_size"]):
+            event = ("data: " + json.dumps(candidate(chunk), ensure_ascii=False) + "\r\n\r\n").encode("utf-8")
+            # write_size를 주면 이벤트를 그 바이트 수씩 잘라 보냄 (한글 글자가 중간에서 잘려 도착하는 경우)
+            size = options.get("write_size") or len(event)
+            for i in range(0, len(event), size):
+                self.wfile.write(event[i:i + size])
+                self.wfile.flush()
+            time.sleep(options["chunk_delay"])
+        self.close_connection = True
+
+
+class MockGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 한 반이 동시에 접속해도 연결이 거절되지 않도록 대기열을 넉넉히 잡음
+    request_queue_size = 256
+
+    def __init__(self, address, options, seed=None):
+        super().__init__(address, MockGeminiHandler)
+        self.options = options
+        self.random = random.Random(seed)
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def delay(self):
+        options = self.options
+        return max(0.0, options["latency"] + self.random.uniform(-options["jitter"], options["jitter"]))
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+def start_server(port=0, latency=0.0, chunk_size=12, chunk_delay=0.05, jitter=0.0, error_rate=0.0,
+                 rate_limit_rate=0.0, seed=None, write_size=None):
+    """백그라운드 스레드에서 대역 서버를 띄우고 (server, API_BASE 주소)를 돌려줌.
+
+    seed를 주면 지연과 오류가 매번 같은 순서로 나와서 측정을 반복할 수 있음.
+    """
+    options = {
+        "latency": latency, "jitter": jitter, "chunk_size": chunk_size, "chunk_delay": chunk_delay,
+        "error_rate": error_rate, "rate_limit_rate": rate_limit_rate, "write_size": write_size,
+    }
+    server = MockGeminiServer(("127.0.0.1", port), options, seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1beta"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 Gemini 대역 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", choices=sorted(PROFILES), help="미리 정해 둔 지연/오류 설정")
+    parser.add_argument("--latency", type=float, default=0.3, help="첫 응답까지 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연 편차(초), latency±jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 오류 비율 (0~1)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 오류 비율 (0~1)")
+    parser.add_argument("--chunk-size", type=int, default=12, help="스트리밍 조각 하나의 글자 수")
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="스트리밍 조각 사이 지연(초)")
+    args = parser.parse_args()
+
+    options = {
+        "latency": args.latency, "jitter": args.jitter,
+        "error_rate": args.error_rate, "rate_limit_rate": args.rate_limit_rate,
+    }
+    options.update(PROFILES.get(args.profile, {}))
+    server, base = start_server(args.port, chunk_size=args.chunk_size, chunk_delay=args.chunk_delay, **options)
+    print(f"대역 서버 실행 중: GEMINI_API_BASE={base}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,14 +1,30 @@
 import streamlit as st
-import random
-import time
+from typewriter import type_out
+from course_index import course_answer, get_course_library
+from message_store import MessageStore, show_earlier_button
+from metrics import RerunTimer
+
+# 재실행 시간 측정 (교사용 지표)
+rerun = RerunTimer("practice_app.py")
 
 st.write ("나는 서울교대 챗봇이야")
 
 st.caption ("수업에서 배운 내용만 답변 가능")
+
+# 수업 자료(data/lessons) 색인: 서버가 뜰 때 바뀐 자료만 색인하고, 자료 파일이 더해지면 질문할 때 그 파일만 더함
+library = get_course_library()
+
+# 타자 효과를 끄면 답변이 바로 나타남
+with st.sidebar:
+    typing_effect = st.toggle("타자 효과", value=True)
+
 if "messages" not in st.session_state:
-    st.session_state.messages = [{'role': 'assistant', 'content': '안녕하세요! 무엇을 도와드릴까요?'}]
+    # 최근 메시지만 메모리에 두고 오래된 메시지는 파일로 내리는 저장소
+    st.session_state.messages = MessageStore([{'role': 'assistant', 'content': '안녕하세요! 무엇을 도와드릴까요?'}])
 
-for message in st.session_state.messages:
+# 최근 메시지만 그리고, 더 오래된 것은 "이전 대화 더 보기"로 불러옴
+shown = show_earlier_button(st.session_state.messages)
+for message in st.session_state.messages.latest(shown):
     with st.chat_message(message['role']):
         st.markdown(message['content'])
 
@@ -20,14 +36,13 @@ if prompt := st.chat_input("What is up?"):
 
     with st.chat_message('assistant'):
         message_placeholder = st.empty()
-        full_response = ""
-        assistant_response = random.choice(["네, 알겠습니다.", "그렇군요.", "그럼 이제 무엇을 도와드릴까요?"])
+        # 수업 자료에서 질문과 가장 잘 맞는 문단을 찾아 그대로 답함 (자료에 없으면 없다고 답함)
+        assistant_response = course_answer(library.current().search(prompt))
         
-        # 응답을 타자 효과와 함께 표시
-        for chunk in assistant_response:
-            full_response += chunk
-            time.sleep(0.05)
-            message_placeholder.markdown(full_response + "▌")
+        # 기록에 먼저 저장해서 타자 효과 도중 다음 메시지가 와도 답변이 남도록 함
+        st.session_state.messages.append({'role': 'assistant', 'content': assistant_response})
         
-        message_placeholder.markdown(full_response)
-        st.session_state.messages.append({'role': 'assistant', 'content': full_response})
\ No newline at end of file
+        # 응답을 타자 효과와 함께 표시 (길이와 상관없이 짧은 시간 안에 끝남)
+        type_out(message_placeholder, assistant_response, animate=typing_effect)
+
+rerun.finish()
\ No newline at end of file
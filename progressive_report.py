@@ -0,0 +1,109 @@
+from typing import NamedTuple
+
+import streamlit as st
+
+from ai_jobs import current_job, submit, wait_for
+from metrics import METRICS
+from single_flight import Cancelled
+
+# 기본 분석 먼저, AI 리포트는 나중에
+# AI 응답을 기다리는 동안 스피너만 보여 주지 않고, 바로 계산되는 기본 분석(만원당 만족도)을
+# 먼저 보여 준 뒤 AI 요청은 뒤에서 보냄(ai_jobs). 스크립트는 AI를 기다리지 않고 끝나며, 리포트가 오면
+# 안내 부분만 갱신하다가 제자리에 덧붙임. 학생이 다른 것을 눌러 재실행해도 같은 요청을 다시 보내지 않음.
+
+AI_DEADLINE = 8  # 초. 이보다 늦어지면 늦어진다고 알려 줌 (리포트는 도착하면 그대로 나타남)
+
+
+class ReportView(NamedTuple):
+    ai_report: str  # 화면에 보여 준 AI 리포트 (기본 분석만 보여 줬거나 기다리는 중이면 None)
+    done: bool  # AI 요청이 끝났는지 (기다리는 중이면 False)
+
+
+def _show_local(local_lines, reason):
+    # API 응답이 없을 경우 기본 분석 제공
+    METRICS.inc("report_fallbacks_total", reason=reason)
+    for line in local_lines:
+        st.write(line)
+
+
+def report_request(key, clicked):
+    """버튼을 누르면 그 입력의 리포트를 요청한 것으로 기억함.
+
+    입력이 그대로인 동안에는 재실행해도 요청 (key, 누른 횟수)를 돌려주고, 입력이 바뀌었으면 None.
+    """
+    if clicked:
+        _, clicks = st.session_state.get("report_request", (None, 0))
+        st.session_state.report_request = (key, clicks + 1)
+    request = st.session_state.get("report_request")
+    return request if request is not None and request[0] == key else None
+
+
+def show_report(local_lines, fetch_ai, key, cache=None, progressive=True, retry=False, deadline=AI_DEADLINE):
+    """리포트를 화면에 그림. 버튼을 누른 뒤 입력이 그대로인 동안 재실행마다 불러도 됨.
+
+    local_lines: 기본 분석 문장 목록, fetch_ai(job): AI 리포트 텍스트(없으면 None)를 돌려주는 함수 (뒤쪽 스레드),
+    key: 입력으로 만든 리포트 키, cache: 리포트 캐시 (이 세션에 같은 key의 요청이 없을 때만 찾아봄),
+    retry: 실패한 요청을 다시 보낼지 (버튼을 다시 눌렀을 때).
+    progressive=False면 기본 분석은 AI가 실패할 때만 보여 줌.
+    """
+    # 리포트를 요청할 때만 불러옴 (첫 화면을 빨리 띄우려고 모듈 맨 위에서 불러오지 않음)
+    import requests
+
+    job = current_job(key)
+    if job is None and cache is not None:
+        # 캐시에서 찾은 리포트는 세션에 기억해 두고, 입력이 그대로인 재실행에서는 캐시를 다시 찾지 않음
+        # (재실행마다 찾으면 한 번 재사용한 것이 여러 번 센 것이 됨)
+        hit_key, cached = st.session_state.get("report_cache_hit", (None, None))
+        if hit_key != key:
+            cached = cache.get(key)
+            if cached:
+                st.session_state.report_cache_hit = (key, cached)
+        if cached:
+            st.markdown(cached)
+            return ReportView(cached, True)
+    job = submit(key, fetch_ai, retry=retry)
+
+    # 1. 기본 분석은 바로 보여 줌
+    if progressive:
+        st.markdown("#### ⚡ 바로 보는 기본 분석")
+        for line in local_lines:
+            st.write(line)
+
+    # 2. AI 리포트를 기다리는 동안에는 안내만 갱신함 (스크립트는 기다리지 않고 끝남)
+    def pending(job):
+        st.info(job.notice or "🤖 AI 매니저가 자세한 설명을 준비하고 있어요...")
+        if progressive and job.elapsed() > deadline:
+            st.caption("⏱️ AI 설명이 늦어지고 있어요. 기본 분석을 먼저 보고 있으면 도착하는 대로 여기에 나타나요.")
+
+    if wait_for(job, pending):
+        return ReportView(None, False)
+
+    try:
+        ai_response = job.result()
+    except requests.exceptions.RequestException as e:
+        if progressive:
+            METRICS.inc("report_fallbacks_total", reason="request_error")
+            st.caption(f"AI 설명을 받지 못해 기본 분석만 보여 드려요. ({str(e)})")
+        else:
+            st.error(f"❌ API 요청 중 오류가 발생했습니다: {str(e)}")
+            _show_local(local_lines, "no_ai")
+        return ReportView(None, True)
+    except Cancelled:
+        st.caption("⏹️ AI 설명 요청을 멈췄어요. 다시 누르면 새로 받아 와요.")
+        return ReportView(None, True)
+    except Exception as e:
+        METRICS.inc("app_errors_total", type=type(e).__name__)
+        st.error(f"❌ 오류가 발생했습니다: {str(e)}")
+        return ReportView(None, True)
+
+    # 3. 도착한 AI 리포트는 아래에 덧붙임
+    if not ai_response:
+        if progressive:
+            METRICS.inc("report_fallbacks_total", reason="empty")
+        else:
+            _show_local(local_lines, "no_ai")
+        return ReportView(None, True)
+    if progressive:
+        st.markdown("#### 🤖 AI 매니저의 자세한 설명")
+    st.markdown(ai_response)
+    return ReportView(ai_response, True)
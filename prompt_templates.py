@@ -0,0 +1,141 @@
+from string import Formatter
+
+from rate_limiter import estimate_tokens
+
+# 프롬프트 템플릿
+# 프롬프트를 요청마다 f-string과 `prompt +=`로 이어 붙이지 않고, 서버가 뜰 때 한 번만 템플릿을
+# 조각(글자 그대로인 부분 / 값이 들어갈 자리)으로 나눠 둠. 만들 때는 조각을 목록 하나에 모은 뒤
+# join 한 번으로 합침.
+#
+# 바뀌지 않는 분석 지시문(…분석해주세요 1. 2. 3.)은 프롬프트와 따로 두어 Gemini의
+# systemInstruction으로 보냄. 학생마다 달라지는 상황 정보만 본문에 들어감.
+#
+# 자리 표시에 조사를 형식으로 적으면 앞말 받침에 맞춰 붙여 줌: "{item:을/를}" -> "치킨을", "피자를"
+
+
+# (받침 있을 때, 받침 없을 때)
+JOSA = {
+    "이/가": ("이", "가"),
+    "을/를": ("을", "를"),
+    "은/는": ("은", "는"),
+    "과/와": ("과", "와"),
+    "으로/로": ("으로", "로"),
+}
+RIEUL = 8  # 받침 ㄹ 번호 ("서울로", "연필로")
+# 숫자를 한국어로 읽었을 때의 받침 번호 (영, 일, 이, 삼, 사, 오, 육, 칠, 팔, 구)
+DIGIT_JONG = {"0": 21, "1": 8, "2": 0, "3": 16, "4": 0, "5": 0, "6": 1, "7": 8, "8": 8, "9": 0}
+# 영어 대문자를 읽었을 때의 받침 번호 ("대안 A를", "대안 L을"). 엘, 엠, 엔, 알 말고는 받침 없음
+LETTER_JONG = {letter: {"L": 8, "M": 16, "N": 4, "R": 8}.get(letter, 0) for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}
+
+
+def _jong(char):
+    # 마지막 글자의 받침 번호 (0이면 받침 없음). 한글도 숫자도 영어 대문자도 아니면 None
+    if '가' <= char <= '힣':
+        return (ord(char) - 44032) % 28
+    return DIGIT_JONG.get(char, LETTER_JONG.get(char))
+
+
+def get_josa(word, josa_type):
+    """word 뒤에 받침에 맞는 조사를 붙여 돌려줌. 받침을 알 수 없는 말(영어 등)은 "이(가)"처럼 둘 다 붙임."""
+    if not word:
+        return ""
+    with_batchim, without = JOSA[josa_type]
+    jong = _jong(word[-1])
+    if jong is None:
+        return f"{word}{with_batchim}({without})"
+    if josa_type == "으로/로" and jong == RIEUL:
+        return f"{word}{without}"
+    return f"{word}{with_batchim}" if jong else f"{word}{without}"
+
+
+def _formatter(spec, conversion):
+    if spec in JOSA:
+        return lambda value: get_josa(str(value), spec)
+    if conversion == "r":
+        return lambda value: format(repr(value), spec)
+    return lambda value: format(value, spec)
+
+
+class Template:
+    """한 번 나눠 두고 여러 번 채우는 템플릿. 자리 표시는 str.format과 같은 "{name:형식}"."""
+
+    def __init__(self, source):
+        self.source = source
+        parts = []
+        for literal, name, spec, conversion in Formatter().parse(source):
+            if literal:
+                parts.append(literal)
+            if name is not None:
+                parts.append((name, _formatter(spec, conversion)))
+        self.parts = tuple(parts)
+
+    def extend(self, out, **values):
+        """채운 조각을 목록 out에 이어 붙임. 여러 템플릿을 이어 쓸 때 join을 마지막에 한 번만 하려고 씀."""
+        out.extend(part if type(part) is str else part[1](values[part[0]]) for part in self.parts)
+        return out
+
+    def render(self, **values):
+        return "".join(self.extend([], **values))
+
+
+def request_tokens(prompt, system=None):
+    """보내기 전에 어림한 요청 토큰 수 (본문 + 시스템 지시문). 요청 한도(TPM) 계산에 씀."""
+    return estimate_tokens(prompt) + (estimate_tokens(system) if system else 0)
+
+
+# --- 합리적 소비 분석 (20231520file1.py, batch_grade.py) ---
+
+ANALYSIS_INSTRUCTION = """다음 내용을 초등학교 6학년 학생이 이해하기 쉽게 분석해주세요:
+1. 예산 범위 내에서 어떤 대안이 합리적인지
+2. 각 평가 기준(맛, 디자인 등)을 고려한 종합적 분석
+3. 기회비용 개념을 설명
+4. 가격 대비 만족도를 고려한 추천
+5. 최종 선택에 대한 조언
+
+친근하고 격려하는 톤으로 작성해주세요."""
+
+ANALYSIS_HEADER = Template("""초등학교 6학년 학생을 위한 합리적 소비 학습 활동입니다.
+
+상황 정보:
+- 주제: {theme}
+- 목표 예산: {budget:,}원
+
+""")
+ALTERNATIVE_HEADER = Template("""대안 {label}: {name}
+- 가격: {price:,}원
+- 평가 점수:
+""")
+SCORE_LINE = Template("  - {criterion}: {score:g}/10점\n")
+AVERAGE_LINE = Template("- 평균 만족도: {average:.1f}/10점\n\n")
+WEIGHTS_LINE = Template("기준별 중요도(1~5): {weights}\n\n")
+
+# --- 가격과 만족도만으로 비교 (streamlit_app.py) ---
+
+SIMPLE_INSTRUCTION = """다음 내용을 초등학교 6학년 학생이 이해하기 쉽게 분석해주세요:
+1. 예산 범위 내에서 어떤 대안이 합리적인지
+2. 기회비용 개념을 설명
+3. 가격 대비 만족도를 고려한 추천
+4. 최종 선택에 대한 조언
+
+친근하고 격려하는 톤으로 작성해주세요."""
+
+SIMPLE_HEADER = Template("""6학년 학생을 위한 합리적 소비 학습 활동입니다.
+
+상황 정보:
+- 목적: {goal}
+- 총 예산: {budget:,}원
+""")
+SIMPLE_ALTERNATIVE = Template("""
+대안 {label}:
+- 가격: {price:,}원
+- 만족도: {satisfaction}/10
+""")
+
+# --- 기본 분석 문장 (consumer_report.local_recommendation) ---
+
+LOCAL_RECOMMENDATION = Template("✅ 추천: **{item:을/를}** 선택하는 것이 더 합리적입니다.")
+LOCAL_AVERAGE = Template("- 선택한 상품의 평균 만족도: **{average:.1f}점**")
+LOCAL_OPPORTUNITY = Template(
+    "- 💡 **기회비용 확인:** {item:을/를} 선택함으로써 포기하게 되는 {foregone}의 가치도 고려했나요?"
+)
+LOCAL_ONLY_CHOICE = Template("- 💡 **기회비용 확인:** 예산 안에서 고를 수 있는 상품은 {item:이/가} 하나뿐이에요.")
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import deque
+
+# 클라이언트 쪽 요청 속도 제한 (토큰 버킷)
+# 수업 시작과 함께 한 반이 동시에 요청하면 분당 요청 수(RPM)/토큰 수(TPM) 한도를 넘어
+# 429 오류가 쏟아짐. 한도 안에서만 보내도록 프로세스 전체 요청을 줄 세우고,
+# 먼저 온 요청부터 차례대로(FIFO) 내보내서 어느 세션도 계속 밀리지 않게 함.
+
+CANCEL_POLL = 0.2  # 줄을 선 요청이 취소되었는지 확인하는 간격(초)
+
+
+def estimate_tokens(text):
+    # 한국어는 대략 1.5~2글자가 토큰 하나. 한도를 넘지 않도록 넉넉하게(2글자=1토큰 이상) 잡음
+    return len(text) // 2 + 1
+
+
+class TokenBucket:
+    """분당 per_minute만큼 채워지는 버킷. 잠금은 RateLimiter가 잡음."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """amount만큼 꺼낼 수 있을 때까지 남은 시간(초). 0이면 지금 바로 가능."""
+        self._refill(now)
+        # 버킷 용량보다 큰 요청은 가득 찼을 때 한 번에 보내도록 함
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self.waited = 0  # 차례를 기다려야 했던 요청 수
+
+    def acquire(self, tokens=1, on_wait=None, timeout=None, cancel=None):
+        """차례가 오고 RPM/TPM 여유가 생길 때까지 기다림. timeout 안에 못 받거나 취소되면 False.
+
+        on_wait(앞에 기다리는 요청 수)는 대기 순서가 바뀔 때마다 호출됨.
+        cancel(threading.Event)이 켜지면 줄에서 빠져 뒤 요청에 차례를 넘김.
+        """
+        ticket = object()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last_position = None
+        with self._cond:
+            self._queue.append(ticket)
+        try:
+            while True:
+                if cancel is not None and cancel.is_set():
+                    return False
+                with self._cond:
+                    now = time.monotonic()
+                    position = self._queue.index(ticket)
+                    wait = None
+                    if position == 0:
+                        wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+                        if wait == 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            return True
+                    if position != last_position:
+                        if last_position is None:
+                            self.waited += 1
+                        last_position = position
+                        notify = True
+                    else:
+                        notify = False
+                        if deadline is not None:
+                            remaining = deadline - now
+                            if remaining <= 0:
+                                return False
+                            wait = remaining if wait is None else min(wait, remaining)
+                        if cancel is not None:
+                            wait = CANCEL_POLL if wait is None else min(wait, CANCEL_POLL)
+                        self._cond.wait(wait)
+                # 화면 갱신은 잠금 밖에서 해서 다른 세션의 차례 계산을 막지 않음
+                if notify and on_wait is not None:
+                    on_wait(position)
+        finally:
+            with self._cond:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+    def queue_length(self):
+        with self._cond:
+            return len(self._queue)
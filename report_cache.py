@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+from metrics import METRICS
+
+# 합리적 소비 AI 리포트 공유 캐시
+# 리포트 프롬프트는 몇 가지 입력(주제, 예산, 가격, 점수 등)만으로 정해지는데,
+# 같은 반 학생들은 기본값(30000원, 슬라이더 5점)을 그대로 쓰는 일이 많음.
+# 입력을 정규화한 키로 세션 사이에서 리포트를 공유해 중복 API 호출을 없앰.
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL = 6 * 60 * 60  # 한나절(6시간) 지나면 새로 받음
+
+
+def _normalize(value):
+    # 같은 뜻의 입력은 같은 키가 되도록 정리함 (공백 정리, 3000.0 -> 3000 등)
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(app, **inputs):
+    """앱 이름과 입력값으로 정규화된 캐시 키(sha256 hex)를 만듦."""
+    canonical = json.dumps(
+        {"app": app, "inputs": _normalize(inputs)},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """LRU + TTL 방식의 스레드 안전 캐시. path를 주면 디스크에 저장해 재시작 후에도 유지함."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (저장 시각, 리포트)
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                METRICS.inc("report_cache_lookups_total", result="miss")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            METRICS.inc("report_cache_lookups_total", result="hit")
+            return entry[1]
+
+    def put(self, key, report):
+        with self._lock:
+            self._entries[key] = (time.time(), report)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path:
+                self._save()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, stored_at, report in saved:
+            if now - stored_at <= self.ttl:
+                self._entries[key] = (stored_at, report)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        # 저장 도중 프로세스가 죽어도 파일이 깨지지 않도록 임시 파일에 쓰고 바꿔치기함
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([[k, t, r] for k, (t, r) in self._entries.items()], f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+@st.cache_resource
+def get_report_cache():
+    # 서버 프로세스당 하나만 만들어 모든 세션이 공유함
+    # REPORT_CACHE_PATH를 지정하면 디스크에 저장되어 서버를 다시 켜도 유지됨
+    return ReportCache(
+        max_entries=int(os.getenv("REPORT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        ttl=float(os.getenv("REPORT_CACHE_TTL", DEFAULT_TTL)),
+        path=os.getenv("REPORT_CACHE_PATH") or None,
+    )
@@ -0,0 +1,233 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import NamedTuple
+
+import streamlit as st
+
+from answer_matcher import normalize
+from metrics import METRICS
+
+# 비슷한 질문 답변 재사용 (Practice.py 챗봇)
+# 한 반 학생들은 "광합성이 뭐야?", "광합성이 뭐예요", "광합성은 뭔가요?"처럼 말만 조금 다른 질문을 많이 함.
+# 앞선 대화 없이 처음 묻는 질문과 그 답을 모아 두고, 새 질문이 충분히 비슷하면 Gemini를 부르지 않고
+# 저장된 답을 보여 줌. 네트워크나 GPU 없이 글자 조각 TF-IDF 코사인 유사도로 비교함.
+#
+# 색인: 띄어쓰기를 뺀 질문의 글자 2~3-gram -> 그 조각을 가진 질문 목록. 조각 가중치는 TF-IDF이고
+#       질문마다 길이 1로 맞춰 둠(정규화). IDF는 그때 있는 질문 수만큼 새로 넣을 때마다 다시 계산해 가중치를 새로 매김.
+# 찾기: 질문의 조각을 가중치 큰(드문) 순으로 보면서, 남은 조각 가중치의 크기가 기준 유사도보다 작아지면
+#       새 후보는 더 모으지 않음 (남은 조각만 공유하는 질문은 코사인이 기준에 닿을 수 없음).
+#       "뭐야", "이 " 같은 흔한 조각의 긴 목록은 훑지 않으므로 질문이 수만 개여도 몇 ms 안에 끝남.
+# 숫자가 다른 질문("3+4는?"과 "3+5는?")은 글자가 거의 같아도 다른 질문으로 봄.
+
+DEFAULT_THRESHOLD = 0.8  # 이 이상 비슷하면 같은 질문으로 봄 (코사인 유사도)
+DEFAULT_MAX_ENTRIES = 20_000
+DEFAULT_TTL = 6 * 60 * 60  # 한나절(6시간) 지나면 새로 받음
+NGRAMS = (2, 3)
+_NUMBER = re.compile(r"\d+")
+# 뜻은 같고 말투만 다른 말끝. 낱말마다 가장 긴 것 하나만 뗌 ("물고기인가요" -> "물고기", "고래는" -> "고래")
+# 조사 "이"/"가"는 앞 글자 받침에 맞을 때만 뗌 ("광합성이" -> "광합성", "나무가" -> "나무")
+ENDINGS = tuple(sorted((
+    "인가요", "인가", "이에요", "예요", "에요", "이야", "이니", "나요", "가요", "니", "야", "요", "까",
+    "이란", "란", "은", "는", "을", "를", "의",
+), key=len, reverse=True))
+# 같은 뜻의 낱말 (말끝을 뗀 뒤)
+SAME_WORDS = {"뭔": "뭐", "뭘": "뭐", "무엇": "뭐", "무어": "뭐", "어째서": "왜", "대해서": "대해", "대하여": "대해"}
+
+
+def _has_final(char):
+    return '가' <= char <= '힣' and (ord(char) - 0xAC00) % 28 != 0
+
+
+def word_key(word):
+    """낱말 하나의 말끝을 떼고 같은 뜻의 낱말로 바꿈 ("물고기인가요" -> "물고기", "뭔가요" -> "뭐")."""
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) > len(ending):
+            word = word[:-len(ending)]
+            break
+    else:
+        if len(word) > 2 and word[-1] in "이가" and _has_final(word[-2]) == (word[-1] == "이"):
+            word = word[:-1]
+    return SAME_WORDS.get(word, word)
+
+
+def question_key(text):
+    """비교용 질문: 소문자로 바꾸고 문장 부호, 띄어쓰기, 말끝을 뺌 ("광합성은 뭐예요?" -> "광합성뭐")."""
+    return "".join(word_key(word) for word in normalize(text).split())
+
+
+def numbers(text):
+    # "3+4는?" -> ("3", "4")
+    return tuple(_NUMBER.findall(normalize(text)))
+
+
+def grams(key):
+    padded = f"^{key}$"
+    return Counter(padded[i:i + n] for n in NGRAMS for i in range(len(padded) - n + 1))
+
+
+class Entry(NamedTuple):
+    question: str
+    answer: str
+    numbers: tuple  # 질문에 나온 숫자 (같아야 같은 질문)
+    counts: Counter  # 조각 -> 개수
+    stored_at: float
+    expires_at: float
+
+
+class Hit(NamedTuple):
+    question: str  # 저장된 (비슷한) 질문
+    answer: str
+    similarity: float
+
+
+class SemanticCache:
+    """처음 묻는 질문과 답을 모아 두고 비슷한 질문에 저장된 답을 돌려주는 스레드 안전 캐시 (LRU + 항목별 TTL)."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, enabled=True):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # 항목 번호 -> Entry (오래 안 쓴 순)
+        self._weights = {}  # 항목 번호 -> {조각: 정규화한 TF-IDF 가중치}
+        self._by_key = {}  # 비교용 질문 -> 항목 번호 (똑같은 질문은 하나만)
+        self._postings = defaultdict(set)  # 조각 -> 항목 번호
+        self._df = Counter()  # 조각 -> 그 조각을 가진 항목 수
+        self._next_id = 0
+        self._since_reweigh = 0  # IDF를 마지막으로 다시 계산한 뒤 넣은 항목 수
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _idf(self, gram, size):
+        return math.log((size + 1) / (self._df.get(gram, 0) + 1)) + 1
+
+    def _weigh(self, counts, size):
+        weights = {g: (1 + math.log(n)) * self._idf(g, size) for g, n in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {g: w / norm for g, w in weights.items()}
+
+    def _reweigh(self):
+        # 지금 항목 수만큼 새로 넣을 때마다 한 번이므로 넣기 한 번당 비용은 일정함
+        size = len(self._entries)
+        for entry_id, entry in self._entries.items():
+            self._weights[entry_id] = self._weigh(entry.counts, size)
+        self._since_reweigh = 0
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        del self._weights[entry_id]
+        self._by_key.pop(question_key(entry.question), None)
+        for gram in entry.counts:
+            self._postings[gram].discard(entry_id)
+            if not self._postings[gram]:
+                del self._postings[gram]
+            self._df[gram] -= 1
+            if not self._df[gram]:
+                del self._df[gram]
+
+    def lookup(self, question, bypass=False):
+        """충분히 비슷한 저장된 질문의 Hit. 없거나 꺼져 있으면 None."""
+        if bypass or not self.enabled:
+            with self._lock:
+                self.bypassed += 1
+            METRICS.inc("semantic_cache_lookups_total", result="bypass")
+            return None
+        key = question_key(question)
+        if key:
+            hit = self._find(key, numbers(question))
+        else:
+            # 빈 질문("?", 띄어쓰기만)도 찾아본 것이므로 못 찾은 것으로 셈 (적중률이 부풀지 않게)
+            hit = None
+            with self._lock:
+                self.misses += 1
+        METRICS.inc("semantic_cache_lookups_total", result="hit" if hit else "miss")
+        return hit
+
+    def _find(self, key, question_numbers):
+        counts = grams(key)
+        now = time.time()
+        with self._lock:
+            query = self._weigh(counts, len(self._entries))
+            order = sorted(query.items(), key=lambda gw: -gw[1])
+            remaining = 1.0  # 아직 보지 않은 조각 가중치의 제곱합 (query는 길이 1)
+            candidates = set()
+            for gram, weight in order:
+                if math.sqrt(max(remaining, 0.0)) < self.threshold:
+                    break
+                candidates.update(self._postings.get(gram, ()))
+                remaining -= weight * weight
+
+            best, best_score = None, self.threshold
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                if entry.numbers != question_numbers:
+                    continue
+                weights = self._weights[entry_id]
+                score = sum(w * weights.get(g, 0.0) for g, w in query.items())
+                if score >= best_score:
+                    best, best_score = entry_id, score
+            if best is not None and self._entries[best].expires_at < now:
+                self._remove(best)
+                best = None
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best)
+            self.hits += 1
+            entry = self._entries[best]
+            return Hit(entry.question, entry.answer, min(1.0, best_score))
+
+    def put(self, question, answer, ttl=None):
+        """질문과 답을 저장함. ttl(초)을 주면 이 항목만 그만큼 지나면 버림."""
+        key = question_key(question)
+        if not key or not answer or not self.enabled:
+            return
+        now = time.time()
+        counts = grams(key)
+        with self._lock:
+            if key in self._by_key:
+                self._remove(self._by_key[key])
+            entry_id = self._next_id
+            self._next_id += 1
+            entry = Entry(question, answer, numbers(question), counts, now, now + (self.ttl if ttl is None else ttl))
+            self._entries[entry_id] = entry
+            self._by_key[key] = entry_id
+            for gram in counts:
+                self._postings[gram].add(entry_id)
+                self._df[gram] += 1
+            self._weights[entry_id] = self._weigh(counts, len(self._entries))
+            # 가장 오래 안 쓴 것부터 버림. 맨 앞에 기한이 지난 항목이 있으면 함께 버림
+            while len(self._entries) > self.max_entries or (self._entries and next(iter(self._entries.values())).expires_at < now):
+                self._remove(next(iter(self._entries)))
+            self._since_reweigh += 1
+            if self._since_reweigh >= len(self._entries):
+                self._reweigh()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits, "misses": self.misses, "bypassed": self.bypassed, "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@st.cache_resource
+def get_semantic_cache():
+    # 서버 프로세스당 하나만 만들어 모든 세션이 공유함
+    # SEMANTIC_CACHE=off이면 항상 Gemini에 물어봄
+    return SemanticCache(
+        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD)),
+        max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        ttl=float(os.getenv("SEMANTIC_CACHE_TTL", DEFAULT_TTL)),
+        enabled=os.getenv("SEMANTIC_CACHE", "on").lower() not in ("0", "off", "false", "no"),
+    )
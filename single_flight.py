@@ -0,0 +1,97 @@
+import threading
+from concurrent.futures import Future, TimeoutError
+
+# 동일 요청 합치기(single-flight)
+# 선생님이 "이제 AI 매니저 버튼을 눌러 보세요"라고 하면 수십 개 세션이 1초 안에
+# 똑같은 프롬프트를 보냄. 같은 키로 이미 진행 중인 호출이 있으면 새로 보내지 않고
+# 먼저 보낸 호출(leader)의 결과를 함께 기다림.
+
+CANCEL_POLL = 0.2  # 기다리는 쪽이 취소되었는지 확인하는 간격(초)
+
+
+class Cancelled(Exception):
+    """부른 쪽이 더 이상 결과가 필요 없어 멈춘 호출 (새 요청에 밀린 AI 요청 등)."""
+
+
+class _LeaderAbandoned(Exception):
+    # leader 스크립트가 재실행 등으로 중단된 경우: 기다리던 쪽이 직접 다시 시도해야 함
+    pass
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def do(self, key, fn, cancel=None):
+        """같은 key로 진행 중인 호출이 있으면 그 결과를 기다리고, 없으면 fn()을 직접 실행함.
+
+        leader가 예외로 실패하면 기다리던 호출 모두 같은 예외를 받아 각자 대체 분석으로 넘어감.
+        leader가 취소되면(Cancelled) 기다리던 호출은 실패하지 않고 그중 하나가 새 leader가 됨.
+        cancel(threading.Event)이 켜지면 기다리던 호출은 Cancelled로 빠져나옴.
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                is_leader = future is None
+                if is_leader:
+                    future = Future()
+                    self._calls[key] = future
+                    self.leaders += 1
+                else:
+                    self.coalesced += 1
+
+            if not is_leader:
+                try:
+                    return self._wait(future, cancel)
+                except _LeaderAbandoned:
+                    continue
+
+            # 기다리던 쪽이 끝난 Future를 다시 집지 않도록 목록에서 먼저 뺀 뒤 결과를 알림
+            try:
+                result = fn()
+            except Cancelled:
+                self._finish(key)
+                future.set_exception(_LeaderAbandoned())
+                raise
+            except Exception as e:
+                self._finish(key, failed=True)
+                future.set_exception(e)
+                raise
+            except BaseException:
+                # Streamlit이 스크립트를 멈추는 경우(StopException 등)는 실패가 아니므로 다시 시도하게 함
+                self._finish(key)
+                future.set_exception(_LeaderAbandoned())
+                raise
+            self._finish(key)
+            future.set_result(result)
+            return result
+
+    @staticmethod
+    def _wait(future, cancel):
+        if cancel is None:
+            return future.result()
+        while True:
+            try:
+                return future.result(timeout=CANCEL_POLL)
+            except TimeoutError:
+                if cancel.is_set():
+                    raise Cancelled()
+
+    def _finish(self, key, failed=False):
+        with self._lock:
+            self._calls.pop(key, None)
+            if failed:
+                self.failures += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "failures": self.failures,
+                "in_flight": len(self._calls),
+            }
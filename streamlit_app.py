@@ -1,29 +1,19 @@
 import streamlit as st
-import requests
-import os
-from dotenv import load_dotenv
-
-# .env 파일에서 환경 변수 로드 (로컬 환경용)
-load_dotenv()
+from app_config import require_config
+from report_cache import get_report_cache, make_key
+from decision_engine import evaluate
+from consumer_report import RANK_BY, alternative_label, alternatives_record, build_simple_prompt, local_recommendation
+from progressive_report import report_request, show_report
+from prompt_templates import SIMPLE_INSTRUCTION
+from metrics import RerunTimer
+from event_log import log_event_once
+
+# 재실행 시간 측정 (교사용 지표)
+rerun = RerunTimer("streamlit_app.py")
 
 # API 키 확인 - Streamlit Cloud의 경우 secrets 사용, 로컬의 경우 .env 사용
-GOOGLE_API_KEY = None
-try:
-    # Streamlit Cloud에서는 secrets 사용
-    if hasattr(st, 'secrets') and "GOOGLE_API_KEY" in st.secrets:
-        GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
-except:
-    pass
-
-# secrets에 없으면 .env에서 가져오기 (로컬 환경용)
-if not GOOGLE_API_KEY:
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-if not GOOGLE_API_KEY or GOOGLE_API_KEY == "your_api_key_here":
-    st.error("⚠️ Streamlit Secrets 또는 .env 파일에서 GOOGLE_API_KEY를 찾을 수 없습니다!")
-    st.error("로컬 실행: .env 파일을 확인하세요.")
-    st.error("Streamlit Cloud: Secrets에 GOOGLE_API_KEY를 설정하세요.")
-    st.stop()
+# (서버 프로세스당 한 번만 읽고, 문제가 있으면 안내 후 멈춤)
+config = require_config("gemini-2.0-flash-exp")
 
 # 1. 학생들에게 보여질 메인 화면 제목 및 학습 목표 설정
 st.title("🛒 우리 집 '합리적 소비' 매니저")
@@ -34,110 +24,87 @@ with st.sidebar:
     st.header("📋 소비 상황 설정")
     budget = st.number_input("오늘의 총 예산 (원):", min_value=0, value=50000, step=1000)
     goal = st.text_input("구매하려는 목적 (예: 저녁 식사 재료):")
+    # AI 리포트를 기다리는 동안 바로 계산되는 기본 분석을 먼저 보여 줌
+    quick_first = st.toggle("⚡ 기본 분석 먼저 보기", value=True)
 
 # [cite_start]3. 데이터 입력창 생성: 학생들이 대안을 비교할 수 있도록 함 [cite: 108]
 st.info(f"목표: **{goal}**을(를) 위해 **{budget:,}원** 안에서 가장 합리적인 선택을 해보세요!")
 
-col1, col2 = st.columns(2)
+# 한 번에 비교할 수 있는 후보 수와 한 줄에 놓을 후보 수 (20231520file1.py와 같음)
+MAX_ALTERNATIVES = 20
+COLUMNS_PER_ROW = 3
+
+# 후보는 두 개뿐 아니라 여러 개를 한꺼번에 비교할 수 있음
+num_alts = st.number_input("🔢 비교할 후보는 몇 개인가요?", min_value=2, max_value=MAX_ALTERNATIVES, value=2, step=1)
+
+names, prices, satisfactions = [], [], []
+for i in range(num_alts):
+    # 한 줄에 COLUMNS_PER_ROW개씩 배치함
+    if i % COLUMNS_PER_ROW == 0:
+        cols = st.columns(min(COLUMNS_PER_ROW, num_alts - i))
+
+    label = alternative_label(i)
+    key = label.lower()
+    with cols[i % COLUMNS_PER_ROW]:
+        st.write(f"### 대안 {label}")
+        price = st.number_input(f"{label} 상품 가격 (원):", min_value=0, value=0, key=f"{key}_p")
+        satisfaction = st.slider(f"{label} 상품 만족도 (1-10):", 1, 10, 5, key=f"{key}_s")
+
+    names.append(f"대안 {label}")
+    prices.append(price)
+    satisfactions.append(satisfaction)
 
-with col1:
-    st.write("### 대안 A")
-    price_a = st.number_input("A 상품 가격 (원):", min_value=0, value=0, key="a_p")
-    satisfaction_a = st.slider("A 상품 만족도 (1-10):", 1, 10, 5, key="a_s")
+# 기본 분석(가격 대비 만족도)은 20231520file1.py와 같은 분석기를 씀
+evaluation = evaluate(names, ["만족도"], [[s] for s in satisfactions], prices, budget, rank_by=RANK_BY)
 
-with col2:
-    st.write("### 대안 B")
-    price_b = st.number_input("B 상품 가격 (원):", min_value=0, value=0, key="b_p")
-    satisfaction_b = st.slider("B 상품 만족도 (1-10):", 1, 10, 5, key="b_s")
+# 세션 사이에서 공유되는 AI 리포트 캐시
+report_cache = get_report_cache()
+
+# 같은 입력으로 이미 받은 리포트가 있으면 API를 다시 부르지 않음 (세션 간 공유)
+cache_key = make_key("streamlit_app", goal=goal, budget=budget, prices=prices, satisfactions=satisfactions)
 
 # [cite_start]4. 분석 버튼: AI가 기회비용과 합리성을 판단하여 피드백 제공 [cite: 109, 122]
-if st.button("AI 매니저에게 분석 요청하기"):
-    if price_a > budget and price_b > budget:
-        st.error("두 대안 모두 예산을 초과합니다. 합리적 선택의 첫걸음은 예산 범위 준수입니다!")
+# 누른 뒤에는 입력이 그대로인 동안 재실행해도 결과가 남아 있음 (AI 리포트는 뒤에서 받아 오는 대로 나타남)
+requested = st.button("AI 매니저에게 분석 요청하기")
+request = report_request(cache_key, requested)
+if request:
+    if not evaluation.affordable.any():
+        st.error("모든 대안이 예산을 초과합니다. 합리적 선택의 첫걸음은 예산 범위 준수입니다!")
     else:
         st.write("---")
         st.success("### 🤖 AI 매니저의 분석 결과")
         
-        # AI 분석 중 표시
-        with st.spinner("AI가 분석 중입니다..."):
-            try:
-                # Gemini API에 전달할 프롬프트 작성
-                prompt = f"""6학년 학생을 위한 합리적 소비 학습 활동입니다.
-
-상황 정보:
-- 목적: {goal}
-- 총 예산: {budget:,}원
-
-대안 A:
-- 가격: {price_a:,}원
-- 만족도: {satisfaction_a}/10
-
-대안 B:
-- 가격: {price_b:,}원
-- 만족도: {satisfaction_b}/10
-
-다음 내용을 초등학교 6학년 학생이 이해하기 쉽게 분석해주세요:
-1. 예산 범위 내에서 어떤 대안이 합리적인지
-2. 기회비용 개념을 설명
-3. 가격 대비 만족도를 고려한 추천
-4. 최종 선택에 대한 조언
-
-친근하고 격려하는 톤으로 작성해주세요."""
-
-                # Gemini API 요청
-                api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={GOOGLE_API_KEY}"
-                
-                payload = {
-                    "contents": [{
-                        "parts": [{"text": prompt}]
-                    }]
-                }
-                
-                headers = {
-                    "Content-Type": "application/json"
-                }
-                
-                response = requests.post(api_url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                # 응답 파싱
-                result = response.json()
-                
-                if "candidates" in result and len(result["candidates"]) > 0:
-                    ai_response = result["candidates"][0]["content"]["parts"][0]["text"]
-                    st.markdown(ai_response)
-                else:
-                    # API 응답이 없을 경우 기본 분석 제공
-                    score_a = satisfaction_a / price_a * 10000 if price_a > 0 else 0
-                    score_b = satisfaction_b / price_b * 10000 if price_b > 0 else 0
-                    
-                    if score_a > score_b:
-                        best = "대안 A"
-                        st.write(f"추천 선택: **{best}**")
-                        st.write(f"**이유:** 가격 대비 만족도가 더 높습니다.")
-                    else:
-                        best = "대안 B"
-                        st.write(f"추천 선택: **{best}**")
-                        st.write(f"**이유:** 더 경제적이거나 만족도가 높습니다.")
-                    
-                    st.warning(f"💡 **기회비용 확인:** {best}를 선택할 경우, 다른 대안을 포기하게 됩니다. 나의 선택이 최선인지 다시 한번 생각해보세요!")
-                    
-            except requests.exceptions.RequestException as e:
-                st.error(f"❌ API 요청 중 오류가 발생했습니다: {str(e)}")
-                # 오류 발생 시 기본 분석 제공
-                score_a = satisfaction_a / price_a * 10000 if price_a > 0 else 0
-                score_b = satisfaction_b / price_b * 10000 if price_b > 0 else 0
-                
-                if score_a > score_b:
-                    best = "대안 A"
-                else:
-                    best = "대안 B"
-                
-                st.write(f"추천 선택: **{best}**")
-                st.warning(f"💡 **기회비용 확인:** {best}를 선택할 경우, 다른 대안을 포기하게 됩니다.")
-            except Exception as e:
-                st.error(f"❌ 오류가 발생했습니다: {str(e)}")
+        # Gemini API에 전달할 프롬프트 작성 (분석 지시문은 systemInstruction으로 따로 보냄)
+        prompt = build_simple_prompt(goal, budget, prices, satisfactions)
+        client = config.client()
+
+        def fetch_ai(job):
+            # Gemini API 요청 (공용 클라이언트: 연결 재사용 + timeout 적용)
+            # 요청이 몰리면 실패 대신 대기 순서를 보여 주고 차례가 오면 보냄 (새 요청이 들어오면 취소됨)
+            ai_response = client.generate_text(prompt, on_wait=job.on_wait, system=SIMPLE_INSTRUCTION, cancel=job.cancel_event)
+            if ai_response:
+                report_cache.put(cache_key, ai_response)
+            return ai_response
+
+        local_lines = local_recommendation(evaluation)
+        view = show_report(local_lines, fetch_ai, cache_key, cache=report_cache, progressive=quick_first, retry=requested)
+        
+        # 교사 검토용 기록 (AI 리포트가 도착한 뒤 요청마다 한 번, batch_grade.py 입력과 같은 형식)
+        if view.done:
+            log_event_once(
+                "streamlit_app.py", "report", request, goal=goal, budget=budget,
+                alternatives=alternatives_record(evaluation), recommended=names[evaluation.best],
+                source="ai" if view.ai_report else "local", report=view.ai_report or "\n".join(local_lines),
+            )
 
 # [cite_start]5. 윤리적 고려 및 성찰 (AI 리터러시 목표 연계) [cite: 147, 148]
 st.write("---")
 st.caption("※ 주의: AI의 추천은 참고 자료일 뿐입니다. 최종 결정은 여러분의 가치관에 따라 직접 내리세요.")
+
+# 리포트 캐시 현황 (같은 입력으로 API 호출을 아낀 횟수)
+cache_stats = report_cache.stats()
+st.caption(f"📦 리포트 캐시: 재사용 {cache_stats['hits']}회 / 새로 요청 {cache_stats['misses']}회 / 저장된 리포트 {cache_stats['size']}개")
+flight_stats = config.client().flight.stats()
+st.caption(f"🔗 동시 요청 합치기: 실제 호출 {flight_stats['leaders']}회 / 합쳐진 요청 {flight_stats['coalesced']}회 / 실패 {flight_stats['failures']}회")
+
+rerun.finish()
@@ -0,0 +1,21 @@
+import os
+import sys
+import time
+
+import pytest
+
+# 앱 모듈이 저장소 맨 위에 있으므로 테스트에서 바로 불러올 수 있게 함
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "시간 안에 조건이 맞지 않음"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def wait_until():
+    """뒤쪽 스레드가 조건을 맞출 때까지 기다리는 함수 (timeout초 안에 안 되면 실패)."""
+    return _wait_until
@@ -0,0 +1,41 @@
+import threading
+
+import pytest
+
+from ai_jobs import AIJob, JobPool
+from single_flight import Cancelled
+
+
+def test_jobs_waiting_for_a_worker_see_their_position(wait_until):
+    pool = JobPool(workers=1)
+    release = threading.Event()
+    jobs = [AIJob(i, {}) for i in range(4)]
+    for job in jobs:
+        pool.submit(job, lambda job: release.wait(5) and job.key)
+    wait_until(lambda: pool.running == 1)
+
+    # 실행 중인 요청 1개 + 먼저 온 대기 요청
+    assert jobs[0].notice is None
+    assert [job.notice.endswith(f"앞에 {ahead}명)") for ahead, job in enumerate(jobs[1:], start=1)] == [True] * 3
+
+    # 스레드를 받기 전에 취소된 요청은 줄에서 빠지고 뒤 요청의 차례가 당겨짐
+    jobs[2].cancel()
+    wait_until(lambda: jobs[3].notice.endswith("앞에 2명)"))
+
+    release.set()
+    assert [job.result() for job in (jobs[0], jobs[1], jobs[3])] == [0, 1, 3]
+    assert jobs[2].future.cancelled()
+    assert pool.running == 0
+
+
+def test_cancelled_before_start_raises_cancelled(wait_until):
+    pool = JobPool(workers=1)
+    release = threading.Event()
+    first, second = AIJob("a", {}), AIJob("b", {})
+    pool.submit(first, lambda job: release.wait(5))
+    wait_until(lambda: pool.running == 1)
+    second.cancel_event.set()  # 풀의 Future는 그대로 두고 취소 표시만 함
+    pool.submit(second, lambda job: "보내면 안 됨")
+    release.set()
+    with pytest.raises(Cancelled):
+        second.result()
@@ -0,0 +1,67 @@
+import pytest
+
+from answer_matcher import AnswerIndex, bounded_levenshtein, jamo, max_distance
+
+# FinalTest.py의 동물 퀴즈와 같은 정답과 동의어
+ENTRIES = {
+    "개구리": ["frog"],
+    "호랑이": ["범", "tiger"],
+    "펭귄": ["penguin"],
+    "토끼": ["산토끼", "집토끼", "rabbit"],
+    "사슴": [],
+    "코끼리": [],
+}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return AnswerIndex(ENTRIES)
+
+
+def answer(index, text):
+    found = index.match(text)
+    return found.answer if found else None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("호랑이", "호랑이"),
+    ("호랭이", "호랑이"),
+    ("펭 귄", "펭귄"),
+    ("펭귄입니다!", "펭귄"),
+    ("토끼요", "토끼"),
+    ("집토끼", "토끼"),
+    ("TIGER", "호랑이"),
+    ("범", "호랑이"),
+    ("코기리", "코끼리"),
+    ("펭권이요", "펭귄"),
+    ("개구리야", "개구리"),
+])
+def test_accepts_answers_and_small_typos(index, text, expected):
+    assert answer(index, text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "도끼",  # 토끼
+    "토기",  # 토끼
+    "사슬",  # 사슴
+    "벌",  # 범
+    "고양이",
+    "",
+])
+def test_rejects_near_miss_words(index, text):
+    assert answer(index, text) is None
+
+
+def test_allowed_distance_grows_with_length():
+    assert max_distance(len(jamo("토끼"))) == 0
+    assert max_distance(len(jamo("사슴"))) == 0
+    assert max_distance(len(jamo("호랑이"))) == 1
+    assert max_distance(len(jamo("오랑우탄과 침팬지"))) == 2
+
+
+def test_bounded_levenshtein_matches_full_distance():
+    assert bounded_levenshtein("ㅎㅗㄹㅏㅇㅇㅣ", "ㅎㅗㄹㅐㅇㅇㅣ", 2) == 1
+    assert bounded_levenshtein("abc", "abc", 0) == 0
+    # k를 넘으면 k + 1에서 멈춤
+    assert bounded_levenshtein("abcdef", "uvwxyz", 2) == 3
+    assert bounded_levenshtein("a", "abcd", 1) == 2
@@ -0,0 +1,53 @@
+import logging
+
+import pytest
+
+from app_config import DEFAULT_MODEL, check_model, load_config
+
+
+@pytest.mark.parametrize("name", ["gemini-2.5-flash", "gemini-2.0-flash-exp", "gemini-1.5-pro-002", "gemini-3-pro", DEFAULT_MODEL])
+def test_valid_names_are_kept(name):
+    assert check_model(name) == name
+
+
+@pytest.mark.parametrize("name, fixed", [
+    ("gemini2.5-flash", "gemini-2.5-flash"),
+    ("Gemini-2.5-Flash", "gemini-2.5-flash"),
+    ("gemini_2.5_flash", "gemini-2.5-flash"),
+    ("gemini 2.5 flash", "gemini-2.5-flash"),
+    ("gemini-2.5flash", "gemini-2.5-flash"),
+    ("  gemini-2.5-flash\n", "gemini-2.5-flash"),
+])
+def test_common_mistakes_are_fixed(name, fixed):
+    assert check_model(name) == fixed
+
+
+@pytest.mark.parametrize("name", ["", "gpt-4o", "gemini", "gemini-flash", "gemini-2.5-", "gemini-2.5-flash!"])
+def test_unfixable_names_are_rejected(name):
+    with pytest.raises(ValueError, match="올바르지 않습니다"):
+        check_model(name)
+
+
+def test_load_config_logs_the_corrected_model(monkeypatch, caplog):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.setenv("GEMINI_MODEL", "Gemini2.5 Flash")
+    load_config.clear()
+    with caplog.at_level(logging.WARNING, logger="app_config"):
+        config = load_config()
+    load_config.clear()
+
+    assert config.model == "gemini-2.5-flash" and config.problems == ()
+    assert ["모델 이름 'Gemini2.5 Flash'을(를) 'gemini-2.5-flash'(으)로 고쳐 씁니다."] == [r.getMessage() for r in caplog.records]
+
+
+def test_load_config_reports_problems(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "your_api_key_here")
+    monkeypatch.setenv("GEMINI_MODEL", "gpt-4o")
+    load_config.clear()
+    config = load_config()
+    load_config.clear()
+
+    assert config.api_key is None and config.key_source == ""
+    assert config.model == "gpt-4o"
+    assert any("GOOGLE_API_KEY" in p for p in config.problems)
+    assert any("gpt-4o" in p for p in config.problems)
@@ -0,0 +1,57 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from basket_optimizer import BasketOptimizer, basket_lines
+
+
+def brute_force(satisfaction, prices, budget):
+    # 조합에 넣을 수 있는 후보의 모든 부분집합을 (만족도 합, 조합) 목록으로
+    candidates = [i for i in range(len(prices)) if 0 < prices[i] <= budget and satisfaction[i] > 0]
+    baskets = []
+    for size in range(len(candidates) + 1):
+        for items in combinations(candidates, size):
+            if sum(prices[i] for i in items) <= budget:
+                baskets.append((sum(satisfaction[i] for i in items), items))
+    return baskets
+
+
+def random_case(rng):
+    n = rng.randint(1, 9)
+    satisfaction = [rng.choice([0, 0.5, 1, 2.5, 4, 5.5, 7, 8.5, 10]) for _ in range(n)]
+    prices = [rng.choice([0, 100, 500, 1000, 1500, 3000, 4500, 8000, 12000]) * rng.randint(0, 3) for _ in range(n)]
+    budget = rng.choice([0, 1000, 5000, 10000, 20000, 30000])
+    return satisfaction, prices, budget
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_best_and_runner_up_match_brute_force(seed):
+    satisfaction, prices, budget = random_case(random.Random(seed))
+    plan = BasketOptimizer(satisfaction, prices, budget).plan()
+    baskets = brute_force(satisfaction, prices, budget)
+    best_value = max(value for value, _ in baskets)
+
+    assert plan.best.satisfaction == pytest.approx(best_value, abs=1e-3)
+    assert plan.best.price == sum(prices[i] for i in plan.best.items) <= budget
+
+    # 두 번째로 좋은 조합은 최적 조합과 다른 조합 가운데 가장 좋은 것
+    others = [value for value, items in baskets if items != plan.best.items]
+    if others:
+        second = max(others)
+        assert plan.runner_ups[0].cost == pytest.approx(best_value - second, abs=1e-3)
+    for swap in plan.runner_ups:
+        assert swap.basket.items != plan.best.items
+        assert swap.basket.price <= budget
+        assert swap.cost >= -1e-3
+
+
+def test_unusable_items_are_skipped():
+    # 가격 0원, 예산 초과, 만족도 0인 후보는 조합에 넣지 않음
+    plan = BasketOptimizer([5, 9, 0, 3], [0, 50000, 1000, 2000], 10000).plan()
+    assert plan.best.items == (3,)
+
+
+def test_lines_when_nothing_fits():
+    plan = BasketOptimizer([5], [20000], 10000).plan()
+    assert basket_lines(plan, ["치킨"], 10000) == ["🧺 예산 안에서 함께 살 수 있는 조합이 없어요."]
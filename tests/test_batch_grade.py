@@ -0,0 +1,73 @@
+import json
+
+from batch_grade import run
+
+
+class FlakyClient:
+    """'2번' 학생에서만 requests가 아닌 오류를 내는 가짜 Gemini 클라이언트."""
+
+    def generate_text(self, prompt, system=None):
+        if "연필" in prompt:
+            raise TypeError("응답 모양이 예상과 다름")
+        return "AI 리포트"
+
+
+def submission(student, item):
+    return {
+        "student": student, "theme": "학용품", "budget": 10000,
+        "alternatives": [
+            {"item": item, "price": 3000, "scores": {"품질": 8}},
+            {"item": "지우개", "price": 1000, "scores": {"품질": 5}},
+        ],
+    }
+
+
+def read_results(path):
+    with open(path, encoding="utf-8") as f:
+        return {r["student"]: r for r in map(json.loads, f)}
+
+
+def test_one_failing_row_does_not_stop_the_batch(tmp_path):
+    rows = [submission("1번", "공책"), submission("2번", "연필"), submission("3번", "필통")]
+    source = tmp_path / "submissions.jsonl"
+    lines = [json.dumps(r, ensure_ascii=False) for r in rows]
+    lines.insert(2, "{깨진 줄")
+    lines.append(json.dumps({"student": "4번", "budget": "많이"}, ensure_ascii=False))
+    source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    output = tmp_path / "reports.jsonl"
+
+    counts = run(str(source), str(output), FlakyClient(), workers=2, log=lambda _: None)
+
+    results = read_results(output)
+    assert results["1번"]["source"] == results["3번"]["source"] == "ai"
+    # AI 쪽 오류는 그 학생만 기본 분석으로 대신함
+    assert results["2번"]["source"] == "local"
+    assert "응답 모양" in results["2번"]["error"] and results["2번"]["report"]
+    # 깨진 줄과 잘못된 값은 입력 오류로 남기고 계속함
+    assert results["(3번째 줄)"]["source"] == "invalid"
+    assert results["4번"]["source"] == "invalid"
+    assert counts == {"ai": 2, "local": 1, "invalid": 2, "error": 0, "skipped": 0}
+
+    # 다시 실행하면 저장된 학생은 모두 건너뜀
+    counts = run(str(source), str(output), FlakyClient(), workers=2, log=lambda _: None)
+    assert counts["skipped"] == 5
+
+
+def test_unexpected_grading_error_is_recorded(tmp_path, monkeypatch):
+    import batch_grade
+
+    def broken(client, row):
+        if row["student"] == "2번":
+            raise RuntimeError("채점 중 오류")
+        return {"student": row["student"], "source": "ai", "report": "AI 리포트"}
+
+    monkeypatch.setattr(batch_grade, "grade", broken)
+    source = tmp_path / "submissions.jsonl"
+    source.write_text("".join(json.dumps(submission(s, "공책"), ensure_ascii=False) + "\n" for s in ("1번", "2번", "3번")), encoding="utf-8")
+    output = tmp_path / "reports.jsonl"
+
+    counts = run(str(source), str(output), FlakyClient(), workers=2, log=lambda _: None)
+
+    results = read_results(output)
+    assert results["2번"]["source"] == "error" and "채점 중 오류" in results["2번"]["error"]
+    assert counts["ai"] == 2 and counts["error"] == 1
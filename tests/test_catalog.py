@@ -0,0 +1,127 @@
+import json
+import os
+import random
+
+import pytest
+
+from catalog import Catalog, CatalogFile, item_options
+
+DATA = {
+    "themes": {
+        "음식": {"criteria": ["맛", "양"], "items": [
+            {"name": "치킨", "price": 20000}, {"name": "치즈 피자", "price": 23000},
+            {"name": "떡볶이", "price": 8000}, {"name": "치킨 버거", "price": 6000},
+        ]},
+        "학용품": {"criteria": ["디자인"], "items": [
+            {"name": "필통", "price": 5000}, {"name": "도시락 가방", "price": 12000}, {"name": "Pencil", "price": 1000},
+        ]},
+    }
+}
+
+
+def names(products):
+    return [p.name for p in products]
+
+
+@pytest.fixture
+def catalog():
+    return Catalog(DATA)
+
+
+def test_themes_and_prices(catalog):
+    assert len(catalog) == 7
+    assert catalog.themes["음식"].items == ["치킨", "치즈 피자", "떡볶이", "치킨 버거"]
+    assert catalog.themes["학용품"].criteria == ["디자인"]
+    assert catalog.price("떡볶이") == 8000 and catalog.price("없는 상품") is None
+    assert catalog.products["필통"].theme == "학용품"
+
+
+def test_prefix_matches_come_first(catalog):
+    # 이름이 "치"로 시작하는 상품을 이름순으로
+    assert names(catalog.search("치")) == ["치즈 피자", "치킨", "치킨 버거"]
+    # 앞부분 다음에 중간에 들어 있는 상품
+    assert names(catalog.search("버거")) == ["치킨 버거"]
+    assert names(catalog.search("가방")) == ["도시락 가방"]
+    assert names(catalog.search("킨")) == ["치킨", "치킨 버거"]
+
+
+def test_search_ignores_case_and_spaces(catalog):
+    assert names(catalog.search("치킨버")) == ["치킨 버거"]
+    assert names(catalog.search("도시 락가방")) == ["도시락 가방"]
+    assert names(catalog.search("PEN")) == ["Pencil"]
+    assert catalog.search("   ") == [] and catalog.search("라면") == []
+
+
+def test_search_matches_a_full_scan():
+    rng = random.Random(0)
+    syllables = "가나다라마바사아자차카타파하치킨피자떡"
+    items = sorted({"".join(rng.choice(syllables) for _ in range(rng.randint(1, 6))) for _ in range(2000)})
+    catalog = Catalog({"themes": {"상품": {"items": [{"name": n, "price": 1000} for n in items]}}})
+
+    for _ in range(300):
+        query = "".join(rng.choice(syllables) for _ in range(rng.randint(1, 4)))
+        starts = [n for n in items if n.startswith(query)]
+        inside = [n for n in items if query in n and not n.startswith(query)]
+        assert names(catalog.search(query, limit=10_000)) == starts + inside
+        assert names(catalog.search(query, limit=5)) == (starts + inside)[:5]
+
+
+@pytest.mark.parametrize("data", [
+    {},
+    {"themes": {}},
+    {"themes": {"음식": {"items": []}}},
+    {"themes": {"음식": {"items": [{"name": " ", "price": 1000}]}}},
+    {"themes": {"음식": {"items": [{"name": "치킨", "price": -1}]}}},
+])
+def test_invalid_catalog_is_rejected(data):
+    with pytest.raises(ValueError):
+        Catalog(data)
+
+
+def write(path, data, mtime):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    # 같은 초 안에 여러 번 고쳐도 수정 시각이 바뀌도록 직접 정함
+    os.utime(path, (mtime, mtime))
+
+
+def test_file_is_reloaded_only_when_modified(tmp_path):
+    path = tmp_path / "catalog.json"
+    write(path, DATA, 1_000_000)
+    catalog_file = CatalogFile(str(path))
+    first = catalog_file.current()
+    assert first.price("치킨") == 20000
+    assert catalog_file.current() is first  # 바뀌지 않았으면 다시 읽지 않음
+
+    changed = json.loads(json.dumps(DATA))
+    changed["themes"]["음식"]["items"][0]["price"] = 21000
+    write(path, changed, 1_000_010)
+
+    assert catalog_file.current().price("치킨") == 21000
+    assert catalog_file.error is None
+
+
+def test_broken_edit_keeps_the_last_good_catalog(tmp_path):
+    path = tmp_path / "catalog.json"
+    write(path, DATA, 1_000_000)
+    catalog_file = CatalogFile(str(path))
+    good = catalog_file.current()
+
+    path.write_text('{"themes": {"음식": ', encoding="utf-8")
+    os.utime(path, (1_000_010, 1_000_010))
+    assert catalog_file.current() is good
+    assert isinstance(catalog_file.error, ValueError)
+    # 같은 잘못된 파일은 재실행마다 다시 읽지 않음
+    assert catalog_file.current() is good
+
+    write(path, {"themes": {"음식": {"items": [{"name": "라면", "price": 3000}]}}}, 1_000_020)
+    assert catalog_file.current().price("라면") == 3000
+    assert catalog_file.error is None
+
+    path.unlink()
+    assert catalog_file.current().price("라면") == 3000
+    assert isinstance(catalog_file.error, OSError)
+
+
+def test_item_options(catalog):
+    assert item_options(["치킨", "떡볶이"], "", catalog) == ["치킨", "떡볶이"]
+    assert item_options(["치킨", "떡볶이"], "피자", catalog) == ["치즈 피자"]
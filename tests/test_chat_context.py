@@ -0,0 +1,114 @@
+import pytest
+
+from chat_context import ChatContext
+from message_store import MessageStore, SpillFile
+
+
+@pytest.fixture
+def store(tmp_path):
+    # 메모리에는 최근 6개만 두고 나머지는 파일로 내림
+    return MessageStore(spill=SpillFile(str(tmp_path / "messages.sqlite3")), tail=6)
+
+
+def talk(store, turns, start=0, answer="답이에요."):
+    for i in range(start, start + turns):
+        store.append({"role": "user", "content": f"질문 {i}"})
+        store.append({"role": "assistant", "content": f"{answer} {i}"})
+
+
+def texts(contents):
+    return [c["parts"][0]["text"] for c in contents]
+
+
+def roles(contents):
+    return [c["role"] for c in contents]
+
+
+def test_short_conversation_is_sent_as_is(store):
+    store.append({"role": "assistant", "content": "안녕하세요! 무엇이든 물어보세요.", "ui_only": True})
+    talk(store, 2)
+    store.append({"role": "user", "content": "질문 2"})
+
+    contents = ChatContext().build(store)
+
+    # 화면에만 보여 준 인사말은 빼고, assistant는 model로 보냄
+    assert texts(contents) == ["질문 0", "답이에요. 0", "질문 1", "답이에요. 1", "질문 2"]
+    assert roles(contents) == ["user", "model", "user", "model", "user"]
+
+
+def test_old_turns_fold_into_a_summary(store):
+    talk(store, 10)
+    store.append({"role": "user", "content": "마지막 질문"})
+
+    context = ChatContext(window=4)
+    contents = context.build(store)
+
+    summary = texts(contents)[0]
+    assert summary.startswith("지금까지 나눈 대화 요약:")
+    assert "- 학생: 질문 0" in summary and "- 챗봇: 답이에요. 8" in summary
+    assert roles(contents[:2]) == ["user", "model"]
+    # 창(4개)에 남은 "답이에요. 8"은 user 차례로 시작하도록 요약으로 넘어감
+    assert texts(contents[2:]) == ["질문 9", "답이에요. 9", "마지막 질문"]
+
+
+def test_history_always_starts_with_a_user_turn(store):
+    context = ChatContext(window=3)
+    for turn in range(8):
+        store.append({"role": "user", "content": f"질문 {turn}"})
+        contents = context.build(store)
+        body = contents[2:] if context.summary_lines else contents
+        assert body[0]["role"] == "user" and texts(body)[-1] == f"질문 {turn}"
+        store.append({"role": "assistant", "content": f"답이에요. {turn}"})
+
+
+def test_character_budget_keeps_the_last_question(store):
+    talk(store, 6, answer="아주 긴 답 " * 100)
+    store.append({"role": "user", "content": "마지막 질문"})
+
+    context = ChatContext(max_chars=1500, window=12, summary_chars=400)
+    contents = context.build(store)
+
+    assert texts(contents)[-1] == "마지막 질문"
+    assert contents[2]["role"] == "user"
+    # 요약과 최근 대화를 합쳐도 예산 안 (요약 안내 문구는 빼고 셈)
+    recent = sum(len(t) for t in texts(contents[2:]))
+    assert context.summary_len + recent <= 1500
+    assert context.summary_len <= 400
+    # 요약 한 줄은 LINE_CHARS에서 자름
+    assert all(len(line) < 100 for line in context.summary_lines)
+
+
+def test_summarized_messages_are_not_read_again(store, monkeypatch):
+    context = ChatContext(window=4)
+    talk(store, 10)
+    context.build(store)
+    assert store.spilled > 0 and context.position > 0
+
+    starts = []
+    original = store.since
+
+    def since(start):
+        starts.append(start)
+        return original(start)
+
+    monkeypatch.setattr(store, "since", since)
+    talk(store, 1, start=10)
+    store.append({"role": "user", "content": "질문 11"})
+    before = context.position
+    contents = context.build(store)
+
+    # 요약한 위치부터만 꺼내므로 파일로 내린 오래된 메시지는 읽지 않음
+    assert starts == [before]
+    assert "- 학생: 질문 0" in texts(contents)[0]
+    assert texts(contents)[-1] == "질문 11"
+
+
+def test_cleared_conversation_resets_the_summary(store):
+    context = ChatContext(window=2)
+    talk(store, 5)
+    context.build(store)
+    assert context.summary_lines
+
+    contents = context.build([{"role": "user", "content": "새 질문"}])
+    assert texts(contents) == ["새 질문"]
+    assert context.summary_lines == [] and context.position == 0
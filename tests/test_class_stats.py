@@ -0,0 +1,96 @@
+from class_stats import ClassStats
+
+REPORT = {
+    "theme": "음식", "budget": 30000, "recommended": "떡볶이", "basket": ["떡볶이"],
+    "alternatives": [
+        {"item": "치킨", "price": 20000, "scores": {"맛": 9, "양": 7}},
+        {"item": "떡볶이", "price": 8000, "scores": {"맛": 7, "양": 5}},
+    ],
+}
+
+
+def quiz(animal, result, **data):
+    return {"animal": animal, "result": result, **data}
+
+
+def test_reports_are_aggregated_per_item():
+    stats = ClassStats()
+    stats.publish("app", "s1", "report", REPORT, ts=100)
+    stats.publish("app", "s2", "report", {**REPORT, "budget": 45000, "recommended": "치킨", "basket": []}, ts=101)
+
+    snapshot = stats.snapshot(now=102)
+    assert snapshot.reports == 2 and snapshot.themes == {"음식": 2}
+    tteok, chicken = sorted(snapshot.items, key=lambda s: s.item)
+    assert (chicken.item, chicken.compared, chicken.average_score, chicken.average_price) == ("치킨", 2, 8.0, 20000)
+    assert (tteok.recommended, tteok.in_basket, chicken.recommended, chicken.in_basket) == (1, 1, 1, 0)
+    assert snapshot.budgets.count == 2 and snapshot.budgets.sum == 75000
+
+
+def test_quiz_progress_moves_between_solved_buckets():
+    stats = ClassStats()
+    stats.publish("FinalTest.py", "s1", "quiz", quiz("토끼", "start"), ts=100)
+    assert stats.snapshot(now=100).solved == {0: 1}
+
+    stats.publish("FinalTest.py", "s1", "quiz", quiz("토끼", "wrong"), ts=101)
+    stats.publish("FinalTest.py", "s1", "quiz", quiz("토끼", "correct", hint_step=1, seconds=25), ts=102)
+    stats.publish("FinalTest.py", "s2", "quiz", quiz("펭귄", "correct", hint_step=0, seconds=5), ts=103)
+    stats.publish("FinalTest.py", "s1", "quiz", quiz("펭귄", "revealed"), ts=104)
+    stats.publish("FinalTest.py", "s1", "quiz", quiz("호랑이", "correct", seconds=400), ts=105)
+
+    snapshot = stats.snapshot(now=106)
+    assert snapshot.solved == {1: 1, 2: 1}
+    assert snapshot.hints == {0: 2, 1: 1}
+    assert snapshot.answer_seconds.count == 3 and snapshot.answer_seconds.sum == 430
+    by_animal = {a.animal: a for a in snapshot.animals}
+    assert (by_animal["토끼"].attempts, by_animal["토끼"].correct) == (2, 1)
+    assert (by_animal["펭귄"].attempts, by_animal["펭귄"].revealed) == (2, 1)
+
+
+def test_chat_questions_and_errors():
+    stats = ClassStats()
+    stats.publish("Practice.py", "s1", "chat", {"question": "기회비용?"}, ts=100)
+    stats.publish("Practice.py", "s1", "chat", {"question": "?", "error": "timeout"}, ts=101)
+    snapshot = stats.snapshot(now=101)
+    assert (snapshot.questions, snapshot.chat_errors) == (1, 1)
+
+
+def test_snapshot_is_reused_until_something_changes():
+    stats = ClassStats(active_seconds=60)
+    stats.publish("app", "s1", "report", REPORT, ts=100)
+    stats.publish("app", "s2", "chat", {"question": "?"}, ts=150)
+
+    first = stats.snapshot(now=155)
+    again = stats.snapshot(now=170)
+    # 집계가 그대로면 같은 목록을 다시 쓰고, 참여 중 세션 수만 새로 셈
+    assert again.items is first.items
+    assert (first.active, again.active) == (2, 1)
+
+    stats.publish("app", "s1", "chat", {"question": "?"}, ts=171)
+    changed = stats.snapshot(now=171)
+    assert changed.version == first.version + 1 and changed.questions == 2
+    assert changed.active == 2
+
+
+def test_idle_sessions_are_forgotten():
+    stats = ClassStats(session_seconds=1000)
+    stats.publish("FinalTest.py", "s1", "quiz", quiz("토끼", "correct"), ts=0)
+    stats.publish("FinalTest.py", "s2", "quiz", quiz("토끼", "start"), ts=500)
+    stats.publish("FinalTest.py", "s3", "chat", {"question": "?"}, ts=1200)
+
+    # s1은 1000초 넘게 기록이 없어 진행 상황을 잊지만 세션 수와 분포에는 남음
+    assert list(stats._sessions) == ["s2", "s3"]
+    snapshot = stats.snapshot(now=1200)
+    assert snapshot.sessions == 3 and snapshot.solved == {0: 1, 1: 1}
+
+
+def test_session_count_is_capped():
+    stats = ClassStats(max_sessions=100)
+    for i in range(1000):
+        stats.publish("Practice.py", f"s{i}", "chat", {"question": "?"}, ts=i)
+        # 다시 기록한 세션은 뒤로 가서 잊히지 않음
+        stats.publish("Practice.py", "s0", "chat", {"question": "?"}, ts=i)
+
+    assert len(stats._sessions) == 100
+    assert "s0" in stats._sessions and "s999" in stats._sessions
+    snapshot = stats.snapshot(now=1000)
+    assert snapshot.sessions == 1000 and snapshot.questions == 2000
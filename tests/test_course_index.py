@@ -0,0 +1,83 @@
+import os
+
+import course_index
+from course_index import CourseIndex, load_manifest, update_index
+
+
+def write(lessons, name, text):
+    with open(os.path.join(lessons, name), "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def sources(index, query):
+    return sorted({p.source for p in index.search(query, k=10)})
+
+
+def segment_files(index_dir):
+    return sorted(name for name in os.listdir(index_dir) if name.startswith("seg-"))
+
+
+def test_added_changed_and_removed_files(tmp_path):
+    lessons, index_dir = str(tmp_path / "lessons"), str(tmp_path / "index")
+    os.makedirs(lessons)
+    write(lessons, "a.md", "# 기회비용\n\n기회비용은 선택할 때 포기한 것 가운데 가장 가치 있는 것입니다.")
+    write(lessons, "b.md", "# 예산\n\n예산은 쓸 수 있는 돈의 한도입니다.")
+    assert update_index(lessons, index_dir) == (2, 0)
+    assert update_index(lessons, index_dir) == (0, 0)  # 바뀐 것이 없으면 다시 쓰지 않음
+
+    # 새 파일은 새 조각으로만 더함
+    write(lessons, "c.md", "# 광합성\n\n식물은 햇빛으로 광합성을 합니다.")
+    assert update_index(lessons, index_dir) == (1, 0)
+    assert len(load_manifest(index_dir)["segments"]) == 2
+    assert sources(CourseIndex(index_dir), "광합성") == ["c.md"]
+
+    # 바뀐 파일의 옛 문단은 지운 표시가 되어 더는 찾히지 않음
+    write(lessons, "a.md", "# 희소성\n\n사람의 욕구에 비해 자원이 부족한 것을 희소성이라고 합니다.")
+    update_index(lessons, index_dir)
+    index = CourseIndex(index_dir)
+    assert sources(index, "기회비용 포기") == []
+    assert sources(index, "희소성") == ["a.md"]
+
+    # 지운 파일도 마찬가지
+    os.remove(os.path.join(lessons, "b.md"))
+    assert update_index(lessons, index_dir) == (0, 1)
+    index = CourseIndex(index_dir)
+    assert sources(index, "예산 한도") == []
+    assert index.sources == ["a.md", "c.md"]
+
+
+def test_segments_are_merged_when_too_many(tmp_path, monkeypatch):
+    monkeypatch.setattr(course_index, "MAX_SEGMENTS", 3)
+    lessons, index_dir = str(tmp_path / "lessons"), str(tmp_path / "index")
+    os.makedirs(lessons)
+    words = ["사과", "바나나", "포도", "딸기", "수박"]
+    for i, word in enumerate(words):
+        write(lessons, f"{i}.md", f"# 과일 {i}\n\n{word}는 맛있는 과일입니다.")
+        update_index(lessons, index_dir)
+        assert len(load_manifest(index_dir)["segments"]) <= 3
+
+    # 합친 뒤에도 모든 파일을 찾고, 쓰지 않는 조각 파일은 남지 않음
+    index = CourseIndex(index_dir)
+    for i, word in enumerate(words):
+        assert sources(index, word) == [f"{i}.md"]
+    manifest = load_manifest(index_dir)
+    assert len(segment_files(index_dir)) == 6 * len(manifest["segments"])
+    assert len(index) == len(words)
+
+
+def test_rebuild_when_most_passages_are_deleted(tmp_path):
+    lessons, index_dir = str(tmp_path / "lessons"), str(tmp_path / "index")
+    os.makedirs(lessons)
+    # PASSAGE_CHARS보다 긴 문단은 이어 붙이지 않으므로 a.md는 문단 세 개
+    long = "문단을 길게 쓰는 문장입니다. " * 20
+    write(lessons, "a.md", f"# 가\n\n첫째 {long}\n\n둘째 {long}\n\n셋째 {long}")
+    write(lessons, "b.md", "# 나\n\n한 문단뿐입니다.")
+    update_index(lessons, index_dir)
+    write(lessons, "a.md", "# 가\n\n고친 문단입니다.")
+    update_index(lessons, index_dir)
+
+    # 지운 표시가 절반을 넘으면 처음부터 다시 만들어 지운 문단이 남지 않음
+    manifest = load_manifest(index_dir)
+    assert all(not segment["deleted"] for segment in manifest["segments"].values())
+    assert len(CourseIndex(index_dir)) == 2
+    assert len(segment_files(index_dir)) == 6
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from consumer_report import local_recommendation
+from decision_engine import PRICE_CRITERION, evaluate
+
+
+def test_averages_value_and_price_score():
+    evaluation = evaluate(["A", "B"], ["맛", "양"], [[8, 6], [4, 4]], [20000, 10000], 40000, include_price_score=True)
+
+    assert evaluation.criteria == ["맛", "양", PRICE_CRITERION]
+    # 경제성 점수: 예산 대비 남는 돈 비율 × 10
+    np.testing.assert_allclose(evaluation.scores[:, -1], [5.0, 7.5])
+    np.testing.assert_allclose(evaluation.averages, [19 / 3, 15.5 / 3])
+    np.testing.assert_allclose(evaluation.value_per_won, evaluation.averages / evaluation.prices * 10000)
+
+
+def test_over_budget_alternative_is_not_the_opportunity_cost():
+    evaluation = evaluate(["A", "B"], ["맛", "양", "속도"], [[10, 10, 10], [5, 5, 5]], [40000, 10000], 30000, include_price_score=True)
+
+    assert evaluation.best == 1
+    assert not evaluation.affordable[0] and evaluation.value_per_won[0] == -1
+    # 살 수 없는 A는 포기하는 차선책이 아님
+    assert not evaluation.has_foregone(1)
+    assert evaluation.lost_advantages(1) == []
+    assert "하나뿐" in local_recommendation(evaluation)[-1]
+
+
+@pytest.mark.parametrize("rank_by", ["average", "value"])
+def test_foregone_follows_the_ranking(rank_by):
+    names = ["비싼 최고급", "무난한 것", "싼 것", "예산 초과"]
+    scores = [[9, 9], [7, 6], [4, 5], [10, 10]]
+    prices = [28000, 12000, 3000, 50000]
+    evaluation = evaluate(names, ["맛", "양"], scores, prices, 30000, rank_by=rank_by)
+
+    ranking = evaluation.ranking.tolist()
+    best, runner_up = ranking[0], ranking[1]
+    assert ranking[-1] == 3  # 예산 초과는 맨 뒤
+    assert evaluation.foregone[best] == runner_up
+    assert all(evaluation.foregone[i] == best for i in ranking[1:])
+    assert evaluation.affordable[runner_up] and evaluation.has_foregone(best)
+    # 기본 분석 문장도 같은 차선책을 말함
+    assert names[runner_up] in local_recommendation(evaluation)[-1]
+
+
+def test_rank_by_changes_the_order():
+    names = ["비싼 최고급", "무난한 것", "싼 것"]
+    scores = [[9, 9], [7, 6], [4, 5]]
+    prices = [28000, 12000, 3000]
+
+    by_average = evaluate(names, ["맛", "양"], scores, prices, 30000)
+    by_value = evaluate(names, ["맛", "양"], scores, prices, 30000, rank_by="value")
+
+    assert by_average.ranking.tolist() == [0, 1, 2] and by_average.rank_label == "평균 만족도"
+    assert by_value.ranking.tolist() == [2, 1, 0] and by_value.rank_label == "만원당 만족도"
+    assert by_value.foregone[by_value.best] == 1
+    # 차선책이 더 나은 기준만 기회비용으로 남음
+    assert by_value.lost_advantages(2) == ["맛", "양"]
+    assert by_average.lost_advantages(0) == []
+
+
+def test_dominated_alternatives():
+    evaluation = evaluate(["A", "B", "C"], ["맛"], [[8], [6], [9]], [10000, 12000, 15000], 20000)
+    # B는 A보다 맛도 없고 비쌈
+    assert evaluation.dominated.tolist() == [False, True, False]
+
+
+def test_single_alternative_has_no_opportunity_cost():
+    evaluation = evaluate(["A"], ["맛"], [[7]], [5000], 10000)
+    assert evaluation.best == 0
+    assert not evaluation.has_foregone(0) and evaluation.lost_advantages(0) == []
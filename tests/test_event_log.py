@@ -0,0 +1,109 @@
+import datetime
+import os
+
+import event_log
+from event_log import EventLog, query, segment_path
+
+
+def make_log(tmp_path, monkeypatch, **kwargs):
+    registered = []
+    monkeypatch.setattr(event_log.atexit, "register", registered.append)
+    log = EventLog(log_dir=str(tmp_path), **kwargs)
+    # 프로세스가 끝날 때 남은 이벤트를 쓰도록 flush가 등록됨
+    assert registered == [log.flush]
+    return log
+
+
+def record_batches(log):
+    batches = []
+    write = log._write
+
+    def recording(events):
+        batches.append(len(events))
+        write(events)
+
+    log._write = recording
+    return batches
+
+
+def at(text):
+    return datetime.datetime.fromisoformat(text).timestamp()
+
+
+def test_events_are_written_in_batches(tmp_path, monkeypatch):
+    log = make_log(tmp_path, monkeypatch, batch=100, flush_seconds=10)
+    batches = record_batches(log)
+
+    for i in range(250):
+        log.log("Practice.py", f"s{i % 3}", "chat", question=f"질문 {i}")
+    assert log.flush()
+
+    assert log.written == 250 and sum(batches) == 250
+    # 한 번에 batch개까지만 커밋함
+    assert max(batches) <= 100 and len(batches) >= 3
+    events = list(query(log_dir=str(tmp_path)))
+    assert [e["question"] for e in events] == [f"질문 {i}" for i in range(250)]
+
+
+def test_few_events_are_written_after_flush_seconds(tmp_path, monkeypatch, wait_until):
+    log = make_log(tmp_path, monkeypatch, flush_seconds=0.05)
+    log.log("FinalTest.py", "s1", "quiz", answer="토끼", correct=True)
+    # flush를 부르지 않아도 잠시 뒤 디스크에 쓰임
+    wait_until(lambda: log.written == 1)
+    [event] = query(log_dir=str(tmp_path))
+    assert event["app"] == "FinalTest.py" and event["answer"] == "토끼" and event["correct"] is True
+
+
+def test_segments_rotate_daily_and_query_spans_them(tmp_path, monkeypatch):
+    log = make_log(tmp_path, monkeypatch, flush_seconds=10)
+    times = [at("2026-03-04 15:00"), at("2026-03-05 23:59:59"), at("2026-03-06 00:00:01"), at("2026-03-06 09:10")]
+    for i, ts in enumerate(times):
+        with monkeypatch.context() as m:
+            m.setattr(event_log.time, "time", lambda ts=ts: ts)
+            log.log("Practice.py", "s1", "chat" if i % 2 else "report", n=i)
+    assert log.flush()
+
+    files = sorted(os.listdir(tmp_path))
+    assert [f for f in files if f.endswith(".sqlite3")] == [
+        "events-2026-03-04.sqlite3", "events-2026-03-05.sqlite3", "events-2026-03-06.sqlite3",
+    ]
+    assert segment_path(str(tmp_path), times[2]).endswith("events-2026-03-06.sqlite3")
+
+    def ns(**filters):
+        return [e["n"] for e in query(log_dir=str(tmp_path), **filters)]
+
+    assert ns() == [0, 1, 2, 3]
+    # 자정을 걸친 기간은 두 파일을 이어서 시간순으로 읽음
+    assert ns(since=datetime.datetime(2026, 3, 5, 23, 0), until=datetime.datetime(2026, 3, 6, 1, 0)) == [1, 2]
+    assert ns(since=at("2026-03-06 00:00")) == [2, 3]
+    assert ns(until=at("2026-03-05 00:00")) == [0]
+    assert ns(kind="chat") == [1, 3]
+    assert ns(kind="report", since=at("2026-03-05 00:00")) == [2]
+
+
+def test_query_filters_by_app_and_session(tmp_path, monkeypatch):
+    log = make_log(tmp_path, monkeypatch)
+    log.log("Practice.py", "s1", "chat", n=0)
+    log.log("FinalTest.py", "s1", "quiz", n=1)
+    log.log("FinalTest.py", "s2", "quiz", n=2)
+    assert log.flush()
+
+    assert [e["n"] for e in query(app="FinalTest.py", log_dir=str(tmp_path))] == [1, 2]
+    assert [e["n"] for e in query(session="s1", log_dir=str(tmp_path))] == [0, 1]
+
+
+def test_full_queue_drops_new_events(tmp_path, monkeypatch):
+    log = make_log(tmp_path, monkeypatch, max_pending=0)
+    log.log("Practice.py", "s1", "chat", n=0)
+    assert log.flush()
+    assert log.dropped == 1 and log.written == 0
+
+
+def test_cli_prints_events(tmp_path, monkeypatch, capsys):
+    log = make_log(tmp_path, monkeypatch)
+    log.log("Practice.py", "s1", "chat", question="기회비용이 뭐야?")
+    assert log.flush()
+
+    assert event_log.main(["--log-dir", str(tmp_path), "--kind", "chat"]) == 0
+    out = capsys.readouterr().out
+    assert '"question": "기회비용이 뭐야?"' in out and '"time": ' in out
@@ -0,0 +1,141 @@
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+import gemini_client
+from gemini_client import BACKOFF_MAX, GeminiClient, retry_delay
+from mock_gemini_server import make_answer, start_server
+from single_flight import Cancelled
+
+PROMPT = "기회비용이 뭐예요?"
+
+
+@pytest.fixture
+def mock_server():
+    servers = []
+
+    def start(**options):
+        options.setdefault("chunk_delay", 0.0)
+        server, base = start_server(**options)
+        servers.append(server)
+        return server, GeminiClient("test", "gemini-test", api_base=base, rpm=100000)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def contents(text=PROMPT):
+    return [{"role": "user", "parts": [{"text": text}]}]
+
+
+def test_generate_text_returns_the_answer(mock_server):
+    server, client = mock_server()
+    assert client.generate_text(PROMPT, system="짧게 답해 주세요.") == make_answer(contents())
+    assert server.stats() == {"generateContent": 1, "systemInstruction": 1}
+
+
+@pytest.mark.parametrize("chunk_size, write_size", [(1, None), (12, None), (7, 1), (50, 5)])
+def test_stream_text_joins_chunks(mock_server, chunk_size, write_size):
+    # write_size가 작으면 한글 한 글자(3바이트)가 여러 번에 나뉘어 도착함
+    server, client = mock_server(chunk_size=chunk_size, write_size=write_size)
+    answer = make_answer(contents())
+
+    chunks = list(client.stream_text(contents()))
+
+    assert "".join(chunks) == answer
+    assert len(chunks) == -(-len(answer) // chunk_size)
+    assert server.stats()["streamGenerateContent"] == 1
+
+
+def test_stream_text_stops_when_cancelled(mock_server):
+    _, client = mock_server(chunk_size=5, chunk_delay=0.01)
+    cancel = threading.Event()
+    received = []
+    with pytest.raises(Cancelled):
+        for chunk in client.stream_text(contents(), cancel=cancel):
+            received.append(chunk)
+            if len(received) == 2:
+                cancel.set()
+    assert len(received) == 2
+
+
+def test_non_retryable_error_is_raised(mock_server):
+    server, client = mock_server()
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        client._post("countTokens", {"contents": contents()})
+    assert error.value.response.status_code == 404
+    assert client.retries == 0
+
+
+def test_server_error_is_retried_then_raised(mock_server, monkeypatch):
+    monkeypatch.setattr(gemini_client, "MAX_RETRIES", 2)
+    monkeypatch.setattr(gemini_client, "BACKOFF_BASE", 0.01)
+    server, client = mock_server(error_rate=1.0)
+    notices = []
+
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        list(client.stream_text(contents(), on_wait=notices.append))
+
+    assert error.value.response.status_code == 500
+    assert server.stats()["500"] == 3
+    assert client.retries == 2
+    assert [n[-5:] for n in notices] == ["(1/2)", "(2/2)"]
+
+
+def test_retries_are_counted_across_threads(mock_server, monkeypatch):
+    monkeypatch.setattr(gemini_client, "MAX_RETRIES", 3)
+    monkeypatch.setattr(gemini_client, "BACKOFF_BASE", 0.001)
+    _, client = mock_server(error_rate=1.0)
+
+    def call(i):
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.generate(contents(f"질문 {i}"))
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert client.retries == 16 * 3
+
+
+def test_rate_limited_request_waits_for_retry_after(mock_server):
+    server, client = mock_server(rate_limit_rate=1.0)
+    notices = []
+
+    def on_wait(notice):
+        notices.append(notice)
+        # 첫 429 뒤로는 한도가 풀린 것처럼 정상 응답
+        server.options["rate_limit_rate"] = 0.0
+
+    assert client.generate_text(PROMPT, on_wait=on_wait) == make_answer(contents())
+    assert server.stats()["429"] == 1 and server.stats()["generateContent"] == 2
+    assert client.retries == 1
+    # 대역 서버의 Retry-After: 1을 그대로 따름
+    assert notices == ["⏳ AI가 바빠서 1초 뒤에 다시 시도할게요. (1/4)"]
+
+
+class FakeResponse:
+    def __init__(self, headers=None, body=None):
+        self.headers = headers or {}
+        self.body = body
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("본문 없음")
+        return self.body
+
+
+def test_retry_delay_reads_server_hints():
+    assert retry_delay(FakeResponse({"Retry-After": "3"}), 0) == 3
+    assert retry_delay(FakeResponse({"Retry-After": "600"}), 0) == BACKOFF_MAX
+    assert 8 <= retry_delay(FakeResponse({"Retry-After": formatdate(time.time() + 10, usegmt=True)}), 0) <= 10
+    body = {"error": {"details": [{"@type": "RetryInfo", "retryDelay": "12s"}]}}
+    assert retry_delay(FakeResponse(body=body), 0) == 12
+    # 알려 준 시간이 없으면 지수 백오프 범위 안에서 고름
+    assert all(0 <= retry_delay(FakeResponse(), 2) <= gemini_client.BACKOFF_BASE * 4 for _ in range(20))
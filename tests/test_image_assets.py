@@ -0,0 +1,69 @@
+import io
+from pathlib import Path
+
+import pytest
+
+import image_assets
+from image_assets import ImageCache
+
+PIL = pytest.importorskip("PIL")
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "images"
+TIGER = ("호랑이", "https://example.invalid/tiger.jpg")
+FROG = ("개구리", "https://example.invalid/frog.jpg")
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    # 함께 배포한 원본은 fixtures에서 읽고, 내려받기는 모두 실패하게 함 (학교망이 끊긴 상황)
+    monkeypatch.setattr(image_assets, "BUNDLED_DIR", FIXTURES)
+    monkeypatch.setattr(image_assets, "THUMB_DIR", tmp_path / "thumbs")
+    downloads = []
+
+    def fail(url, **kwargs):
+        downloads.append(url)
+        raise OSError("network is unreachable")
+
+    import requests
+
+    monkeypatch.setattr(requests, "get", fail)
+    return downloads
+
+
+def width(data):
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        return image.format, image.width
+
+
+def test_bundled_image_is_served_as_thumbnail(offline):
+    cache = ImageCache([TIGER])
+    assert cache.ready(timeout=10)
+    thumb = cache.source(TIGER[1])
+    assert width(thumb) == ("WEBP", image_assets.THUMB_WIDTH)
+    assert offline == []  # 원본이 있으면 내려받지 않음
+    assert image_assets._thumb_path(TIGER[1]).exists()
+
+
+def test_failed_download_falls_back_to_url_and_is_retried(offline, monkeypatch):
+    cache = ImageCache([TIGER, FROG])
+    assert cache.ready(timeout=10)
+    assert cache.source(FROG[1]) == FROG[1]
+    assert offline == [FROG[1]]
+
+    # 실패는 RETRY_SECONDS 동안만 기억함: 그동안은 다시 내려받지 않음
+    cache.source(FROG[1])
+    assert cache.ready(timeout=10)
+    assert offline == [FROG[1]]
+
+    # 간격이 지나고 네트워크가 돌아오면 다음 요청 때 채워짐
+    monkeypatch.setattr(image_assets, "RETRY_SECONDS", 0)
+    monkeypatch.setattr(image_assets, "_read_source", lambda name, url: (FIXTURES / "호랑이.png").read_bytes())
+    assert cache.source(FROG[1]) == FROG[1]
+    assert cache.ready(timeout=10)
+    assert width(cache.source(FROG[1]))[1] == image_assets.THUMB_WIDTH
+
+
+def test_unknown_url_is_passed_through(offline):
+    cache = ImageCache([])
+    assert cache.source("https://example.invalid/other.jpg") == "https://example.invalid/other.jpg"
@@ -0,0 +1,60 @@
+import gc
+
+from message_store import IDLE_SECONDS, SWEEP_SECONDS, MessageStore, SpillFile
+
+
+def make_store(tmp_path, **kwargs):
+    spill = SpillFile(str(tmp_path / "messages.sqlite3"))
+    return spill, MessageStore(spill=spill, **kwargs)
+
+
+def contents(messages):
+    return [m["content"] for m in messages]
+
+
+def test_old_messages_spill_but_stay_readable(tmp_path):
+    spill, store = make_store(tmp_path, tail=10)
+    for i in range(25):
+        store.append({"role": "user" if i % 2 else "assistant", "content": f"메시지 {i}", "ui_only": i == 0})
+
+    # 넘치면 상한의 절반까지 한꺼번에 내리므로 메모리에는 최근 것만 남음
+    assert len(store) == 25
+    assert len(store.recent) <= 10
+    assert store.spilled == 25 - len(store.recent)
+
+    # 순서, 역할, ui_only 표시가 파일을 거쳐도 그대로
+    messages = list(store)
+    assert contents(messages) == [f"메시지 {i}" for i in range(25)]
+    assert messages[0]["ui_only"] and not messages[1]["ui_only"]
+    assert [m["role"] for m in messages[:3]] == ["assistant", "user", "assistant"]
+    assert contents(store.latest(3)) == ["메시지 22", "메시지 23", "메시지 24"]
+    assert contents(store.since(3))[:2] == ["메시지 3", "메시지 4"]
+
+
+def test_long_messages_spill_by_characters(tmp_path):
+    spill, store = make_store(tmp_path, tail=100, tail_chars=1000)
+    for i in range(5):
+        store.append({"role": "assistant", "content": str(i) * 400})
+    assert store.recent_chars <= 1000
+    assert store.recent[-1]["content"] == "4" * 400  # 마지막 메시지는 길어도 메모리에 남김
+    assert contents(store) == [str(i) * 400 for i in range(5)]
+
+
+def test_idle_sessions_are_spilled_by_sweep(tmp_path):
+    spill, store = make_store(tmp_path)
+    store.append({"role": "user", "content": "안녕"})
+    now = store.touched + IDLE_SECONDS + SWEEP_SECONDS + 1
+    spill.sweep(now)
+    assert not store.recent
+    assert contents(store) == ["안녕"]
+
+
+def test_finished_session_is_purged(tmp_path):
+    spill, store = make_store(tmp_path, tail=2)
+    for i in range(5):
+        store.append({"role": "user", "content": str(i)})
+    session = store.session
+    assert spill.load(session, 0, 10)
+    del store
+    gc.collect()
+    assert spill.load(session, 0, 10) == []
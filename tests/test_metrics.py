@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+import urllib.request
+
+from metrics import METRICS, Metrics, start_exporter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_prometheus_label_values_are_escaped():
+    metrics = Metrics()
+    metrics.inc("app_errors_total", type='C:\\temp "파일"\n둘째 줄')
+    metrics.observe("gemini_request_seconds", 0.2, model='a"b')
+
+    text = metrics.to_prometheus()
+
+    assert 'app_errors_total{type="C:\\\\temp \\"파일\\"\\n둘째 줄"} 1' in text
+    assert 'gemini_request_seconds_count{model="a\\"b"} 1' in text
+    # 값 안의 줄바꿈이 표본 줄을 끊지 않음
+    assert all(line.startswith(("#", "app_errors_total", "gemini_request_seconds")) for line in text.splitlines())
+
+
+def test_plain_labels_are_unchanged():
+    metrics = Metrics()
+    metrics.inc("report_fallbacks_total", reason="no_ai")
+    assert 'report_fallbacks_total{reason="no_ai"} 1' in metrics.to_prometheus()
+
+
+def test_exporter_serves_metrics_and_loads_http_server_lazily():
+    # 지표를 기록하기만 하는 앱은 http.server를 불러오지 않음
+    code = "import sys, metrics; metrics.METRICS.inc('x_total'); print('http.server' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+    assert out.stdout.strip() == "False"
+
+    METRICS.inc("exporter_test_total", kind="a")
+    server = start_exporter(0)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        text = urllib.request.urlopen(f"{base}/metrics", timeout=5).read().decode("utf-8")
+        assert 'exporter_test_total{kind="a"} 1' in text
+        snapshot = json.loads(urllib.request.urlopen(f"{base}/metrics.json", timeout=5).read())
+        assert any(c["name"] == "exporter_test_total" for c in snapshot["counters"])
+    finally:
+        server.shutdown()
+        server.server_close()
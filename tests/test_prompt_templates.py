@@ -0,0 +1,70 @@
+import pytest
+
+import prompt_templates
+from prompt_templates import (
+    ANALYSIS_INSTRUCTION, LOCAL_RECOMMENDATION, Template, get_josa, request_tokens,
+)
+from rate_limiter import estimate_tokens
+
+
+@pytest.mark.parametrize("word, josa_type, expected", [
+    # 받침 있음 / 없음
+    ("치킨", "을/를", "치킨을"),
+    ("피자", "을/를", "피자를"),
+    ("떡볶이", "이/가", "떡볶이가"),
+    ("필통", "이/가", "필통이"),
+    ("사과", "은/는", "사과는"),
+    ("빵", "과/와", "빵과"),
+    ("우유", "과/와", "우유와"),
+    # "으로/로"는 ㄹ 받침이면 "로"
+    ("연필", "으로/로", "연필로"),
+    ("서울", "으로/로", "서울로"),
+    ("책상", "으로/로", "책상으로"),
+    ("버스", "으로/로", "버스로"),
+    # 숫자와 영어 대문자는 읽는 소리의 받침으로
+    ("대안 1", "을/를", "대안 1을"),
+    ("대안 2", "을/를", "대안 2를"),
+    ("3", "이/가", "3이"),
+    ("대안 A", "을/를", "대안 A를"),
+    ("대안 L", "을/를", "대안 L을"),
+    ("대안 M", "이/가", "대안 M이"),
+    ("대안 L", "으로/로", "대안 L로"),
+    # 받침을 알 수 없으면 둘 다 적음
+    ("iPad", "을/를", "iPad을(를)"),
+    ("", "을/를", ""),
+])
+def test_get_josa(word, josa_type, expected):
+    assert get_josa(word, josa_type) == expected
+
+
+def test_template_fills_fields_and_josa():
+    template = Template("{item:을/를} {price:,}원에 샀어요. 평균 {average:.1f}점, {name!r}")
+    assert template.render(item="연필", price=12000, average=7.25, name="학생") == "연필을 12,000원에 샀어요. 평균 7.2점, '학생'"
+    assert LOCAL_RECOMMENDATION.render(item="피자") == "✅ 추천: **피자를** 선택하는 것이 더 합리적입니다."
+
+
+def test_template_is_parsed_once(monkeypatch):
+    template = Template("대안 {label}: {name:이/가} {price:,}원\n")
+
+    # 만든 뒤에는 다시 나누지 않음 (채울 때마다 Formatter를 부르지 않음)
+    def fail(*args, **kwargs):
+        raise AssertionError("템플릿을 다시 나눔")
+
+    monkeypatch.setattr(prompt_templates.Formatter, "parse", fail)
+    out = []
+    for label, name, price in (("A", "치킨", 20000), ("B", "피자", 23000)):
+        template.extend(out, label=label, name=name, price=price)
+    assert "".join(out) == "대안 A: 치킨이 20,000원\n대안 B: 피자가 23,000원\n"
+    assert template.parts[0] == "대안 " and [p[0] for p in template.parts if type(p) is tuple] == ["label", "name", "price"]
+
+
+def test_missing_field_is_an_error():
+    with pytest.raises(KeyError):
+        Template("{item:을/를}").render()
+
+
+def test_request_tokens_counts_the_instruction():
+    prompt = "상황 정보: 주제 음식, 예산 30,000원"
+    assert request_tokens(prompt) == estimate_tokens(prompt)
+    assert request_tokens(prompt, ANALYSIS_INSTRUCTION) == estimate_tokens(prompt) + estimate_tokens(ANALYSIS_INSTRUCTION)
+    assert request_tokens(prompt, "") == estimate_tokens(prompt)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from rate_limiter import RateLimiter, TokenBucket
+
+
+def empty_limiter(rpm=1200, tpm=1_000_000):
+    # 버킷은 가득 찬 채로 시작하므로 비워 두고 줄을 서게 함 (rpm=1200이면 0.05초에 하나씩)
+    limiter = RateLimiter(rpm, tpm)
+    limiter.requests.level = 0
+    return limiter
+
+
+def test_requests_leave_in_arrival_order(wait_until):
+    limiter = empty_limiter()
+    order, positions = [], {}
+
+    def request(i):
+        seen = positions.setdefault(i, [])
+        assert limiter.acquire(on_wait=seen.append, timeout=5)
+        order.append(i)
+
+    threads = []
+    for i in range(6):
+        threads.append(threading.Thread(target=request, args=(i,)))
+        threads[-1].start()
+        wait_until(lambda: limiter.queue_length() + len(order) == i + 1)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == list(range(6))
+    # 나중에 온 요청일수록 처음 본 대기 순서가 뒤이고, 순서는 앞으로만 당겨짐
+    for i in range(1, 6):
+        assert positions[i] == sorted(positions[i], reverse=True)
+        assert positions[i][0] >= 1
+    assert limiter.queue_length() == 0
+
+
+def test_timeout_gives_up_and_frees_the_queue():
+    limiter = RateLimiter(rpm=1, tpm=1_000_000)
+    limiter.requests.level = 0
+    start = time.monotonic()
+    assert not limiter.acquire(timeout=0.1)
+    assert time.monotonic() - start < 1
+    assert limiter.queue_length() == 0
+
+
+def test_cancelled_request_lets_the_next_one_go(wait_until):
+    limiter = RateLimiter(rpm=60, tpm=1_000_000)
+    limiter.requests.level = 0
+    cancel = threading.Event()
+    results = {}
+
+    first = threading.Thread(target=lambda: results.setdefault("first", limiter.acquire(cancel=cancel)))
+    first.start()
+    wait_until(lambda: limiter.queue_length() == 1)
+    second = threading.Thread(target=lambda: results.setdefault("second", limiter.acquire(timeout=3)))
+    second.start()
+    wait_until(lambda: limiter.queue_length() == 2)
+
+    cancel.set()
+    first.join(2)
+    limiter.requests.level = 1  # 취소된 요청 대신 다음 요청이 받을 몫
+    second.join(3)
+    assert results == {"first": False, "second": True}
+
+
+def test_token_budget_limits_large_prompts():
+    bucket = TokenBucket(per_minute=600)
+    now = bucket.updated
+    assert bucket.wait_time(600, now) == 0
+    bucket.take(600)
+    # 1초에 10토큰씩 채워지므로 100토큰은 10초 뒤
+    assert abs(bucket.wait_time(100, now) - 10) < 0.01
+    # 버킷보다 큰 요청은 가득 찼을 때 보냄 (영원히 막히지 않음)
+    assert abs(bucket.wait_time(10_000, now) - 60) < 0.01
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+import report_cache
+from report_cache import ReportCache, make_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(report_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_make_key_normalizes_equivalent_inputs():
+    key = make_key("앱", theme="음식", budget=30000, prices=[3000, 4500], weights={"맛": 2})
+    # 공백, 3000.0과 3000, 튜플과 리스트, 인자 순서는 키를 바꾸지 않음
+    assert key == make_key("앱", prices=(3000.0, 4500.0), weights={"맛": 2.0}, budget=30000.0, theme="  음식 ")
+    assert key != make_key("앱", theme="음식", budget=30000, prices=[3000, 4501], weights={"맛": 2})
+    assert key != make_key("다른 앱", theme="음식", budget=30000, prices=[3000, 4500], weights={"맛": 2})
+    assert len(key) == 64
+
+
+def test_get_counts_hits_and_misses():
+    cache = ReportCache()
+    assert cache.get("a") is None
+    cache.put("a", "리포트")
+    assert cache.get("a") == "리포트"
+    assert cache.get("a") == "리포트"
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 1}
+
+
+def test_least_recently_used_is_evicted():
+    cache = ReportCache(max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")  # a를 최근에 씀
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    # 같은 키를 다시 넣으면 최근 것으로 바뀌고 개수는 그대로
+    cache.put("a", "A2")
+    cache.put("d", "D")
+    assert cache.get("a") == "A2" and cache.get("c") is None
+
+
+def test_expired_reports_are_dropped(clock):
+    cache = ReportCache(ttl=60)
+    cache.put("a", "A")
+    clock[0] += 60
+    assert cache.get("a") == "A"
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 0}
+
+
+def test_reports_survive_a_restart(tmp_path, clock):
+    path = tmp_path / "reports.json"
+    cache = ReportCache(path=str(path), ttl=100)
+    cache.put("old", "오래된 리포트")
+    clock[0] += 50
+    cache.put("new", "새 리포트 ✅")
+    assert not (tmp_path / "reports.json.tmp").exists()
+
+    clock[0] += 60
+    restored = ReportCache(path=str(path), ttl=100)
+    # 기한이 지난 항목은 불러오지 않음
+    assert restored.get("old") is None
+    assert restored.get("new") == "새 리포트 ✅"
+    assert json.loads(path.read_text(encoding="utf-8"))[-1][2] == "새 리포트 ✅"
+
+
+def test_restart_keeps_only_the_newest_entries(tmp_path):
+    path = tmp_path / "reports.json"
+    cache = ReportCache(path=str(path))
+    for key in "abcd":
+        cache.put(key, key.upper())
+    restored = ReportCache(path=str(path), max_entries=2)
+    assert restored.stats()["size"] == 2
+    assert restored.get("c") == "C" and restored.get("d") == "D"
+
+
+def test_broken_file_starts_empty(tmp_path):
+    path = tmp_path / "reports.json"
+    path.write_text("{깨진", encoding="utf-8")
+    cache = ReportCache(path=str(path))
+    assert cache.stats()["size"] == 0
+    cache.put("a", "A")
+    assert ReportCache(path=str(path)).get("a") == "A"
+
+
+def show_cached_report():
+    # show_report가 재실행마다 캐시를 다시 찾지 않는지 보는 작은 앱 (AppTest가 이 함수만 따로 실행함)
+    import streamlit as st
+
+    from progressive_report import show_report
+    from report_cache import ReportCache
+
+    if "cache" not in st.session_state:
+        st.session_state.cache = ReportCache()
+        st.session_state.cache.put("key", "캐시된 리포트")
+    show_report(["기본 분석"], lambda job: "AI", "key", cache=st.session_state.cache)
+
+
+def test_show_report_counts_a_hit_once():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_function(show_cached_report)
+    for _ in range(4):
+        at.run()
+    assert not at.exception
+    assert [m.value for m in at.markdown] == ["캐시된 리포트"]
+    assert at.session_state.cache.stats() == {"hits": 1, "misses": 0, "size": 1}
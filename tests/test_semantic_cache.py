@@ -0,0 +1,147 @@
+import math
+import random
+
+import pytest
+
+import semantic_cache
+from semantic_cache import SemanticCache, grams, question_key
+
+ANSWER = "광합성은 식물이 빛으로 양분을 만드는 일이에요."
+
+
+def test_paraphrase_hits_the_stored_answer():
+    cache = SemanticCache()
+    cache.put("광합성이 뭐야?", ANSWER)
+
+    for question in ("광합성은 뭐예요", "광합성이란 무엇인가요?", "  광합성이 뭐야  "):
+        hit = cache.lookup(question)
+        assert hit is not None and hit.answer == ANSWER and hit.question == "광합성이 뭐야?"
+        assert hit.similarity >= cache.threshold
+    assert cache.lookup("고래는 물고기인가요?") is None
+    assert cache.stats() == {"hits": 3, "misses": 1, "bypassed": 0, "size": 1, "hit_rate": 0.75}
+
+
+def test_question_key_drops_endings():
+    assert question_key("광합성은 뭐예요?") == question_key("광합성이 뭐야") == "광합성뭐"
+    assert question_key("고래는 물고기인가요") == "고래물고기"
+
+
+def test_different_number_is_a_different_question():
+    cache = SemanticCache()
+    cache.put("3+4는 얼마야?", "7이에요.")
+    assert cache.lookup("3+4는 얼마예요?").answer == "7이에요."
+    assert cache.lookup("3+5는 얼마야?") is None
+
+
+def test_empty_question_counts_as_a_miss():
+    cache = SemanticCache()
+    cache.put("광합성이 뭐야?", ANSWER)
+    assert cache.lookup("?!") is None
+    assert cache.lookup("   ") is None
+    assert cache.stats()["misses"] == 2 and cache.stats()["hit_rate"] == 0.0
+
+
+def test_bypass_and_disabled_are_counted_separately():
+    cache = SemanticCache()
+    cache.put("광합성이 뭐야?", ANSWER)
+    assert cache.lookup("광합성이 뭐야?", bypass=True) is None
+
+    disabled = SemanticCache(enabled=False)
+    disabled.put("광합성이 뭐야?", ANSWER)
+    assert disabled.lookup("광합성이 뭐야?") is None and len(disabled) == 0
+
+    assert cache.stats()["bypassed"] == 1 and cache.stats()["hits"] == cache.stats()["misses"] == 0
+    assert disabled.stats()["bypassed"] == 1
+
+
+def test_expired_answers_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: now[0])
+    cache = SemanticCache(ttl=60)
+    cache.put("광합성이 뭐야?", ANSWER)
+    cache.put("고래는 물고기야?", "아니에요.", ttl=10)
+
+    now[0] += 30
+    assert cache.lookup("고래는 물고기인가요") is None  # 항목별 ttl
+    assert cache.lookup("광합성은 뭐예요").answer == ANSWER
+    assert len(cache) == 1
+
+    now[0] += 31
+    assert cache.lookup("광합성은 뭐예요") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = SemanticCache(max_entries=2)
+    cache.put("광합성이 뭐야?", ANSWER)
+    cache.put("고래는 물고기야?", "아니에요.")
+    assert cache.lookup("광합성은 뭐예요") is not None  # 광합성을 최근에 씀
+
+    cache.put("지구는 왜 돌아?", "자전 때문이에요.")
+
+    assert len(cache) == 2
+    assert cache.lookup("고래는 물고기인가요") is None
+    assert cache.lookup("광합성이 뭐야") is not None
+    assert cache.lookup("지구는 왜 돌아요") is not None
+
+
+def test_same_question_replaces_the_answer():
+    cache = SemanticCache()
+    cache.put("광합성이 뭐야?", "옛 답")
+    cache.put("광합성은 뭐예요?", ANSWER)
+    assert len(cache) == 1
+    assert cache.lookup("광합성이 뭐야").answer == ANSWER
+
+
+def brute_force(cache, question):
+    # 가지치기 없이 모든 항목과 코사인 유사도를 비교함
+    query = cache._weigh(grams(question_key(question)), len(cache))
+    best, best_score = None, cache.threshold
+    for entry_id, entry in cache._entries.items():
+        if entry.numbers != semantic_cache.numbers(question):
+            continue
+        score = sum(w * cache._weights[entry_id].get(g, 0.0) for g, w in query.items())
+        if score >= best_score:
+            best, best_score = entry.answer, score
+    return best
+
+
+def test_pruned_search_matches_brute_force():
+    rng = random.Random(0)
+    topics = ["광합성", "기회비용", "화산", "지진", "고래", "무지개", "태양계", "전기", "자석", "소화", "날씨", "식물"]
+    tails = ["이 뭐야?", "은 왜 생겨?", "에 대해 알려줘", "은 어떻게 돼요?", "의 예를 들어줘"]
+    cache = SemanticCache(threshold=0.5)
+    for topic in topics:
+        for tail in tails:
+            cache.put(topic + tail, f"{topic}{tail} 답")
+
+    queries = [rng.choice(topics) + rng.choice(tails) + rng.choice(["", "요", "?"]) for _ in range(200)]
+    queries += [rng.choice(topics)[:2] + "에 대해 궁금해" for _ in range(50)]
+    for question in queries:
+        hit = cache.lookup(question)
+        assert (hit.answer if hit else None) == brute_force(cache, question)
+
+
+def test_idf_is_recomputed_as_the_cache_grows():
+    cache = SemanticCache()
+    cache.put("광합성이 뭐야?", ANSWER)
+    for i in range(7):
+        cache.put(f"질문 {chr(0xAC00 + i * 600)}{chr(0xAC00 + i * 700)} 알려줘", "답")
+
+    # 항목 수만큼 새로 넣을 때마다 모든 항목의 가중치를 그때 IDF로 다시 매김
+    assert cache._since_reweigh < len(cache)
+    size = len(cache)
+    cache._reweigh()
+    for entry_id, entry in cache._entries.items():
+        weights = cache._weights[entry_id]
+        assert weights == cache._weigh(entry.counts, size)
+        assert math.isclose(math.sqrt(sum(w * w for w in weights.values())), 1.0)
+    # 여러 질문에 나오는 "알려" 조각은 한 질문에만 나오는 조각보다 가볍게
+    assert cache._idf("알려", size) < cache._idf("광합", size)
+
+
+@pytest.mark.parametrize("question", ["", "!!!"])
+def test_put_ignores_empty_questions(question):
+    cache = SemanticCache()
+    cache.put(question, ANSWER)
+    assert len(cache) == 0
@@ -0,0 +1,129 @@
+import threading
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_concurrent_calls_share_one_result(wait_until):
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "리포트"
+
+    results = []
+    threads = [start(lambda: results.append(flight.do("같은 프롬프트", fn))) for _ in range(10)]
+    wait_until(lambda: flight.stats()["coalesced"] == 9)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["리포트"] * 10
+    assert flight.stats() == {"leaders": 1, "coalesced": 9, "failures": 0, "in_flight": 0}
+
+
+def test_leader_failure_reaches_followers(wait_until):
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(5)
+        raise ValueError("429")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", fn)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [start(call) for _ in range(3)]
+    wait_until(lambda: flight.stats()["coalesced"] == 2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert errors == ["429"] * 3
+    assert flight.stats()["failures"] == 1
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["leaders"] == 2
+
+
+def test_finished_call_is_not_reused():
+    flight = SingleFlight()
+    flight.do("k", lambda: "처음")
+    assert flight.do("k", lambda: "다시") == "다시"
+
+
+def test_cancelled_leader_hands_over_to_follower(wait_until):
+    from single_flight import Cancelled
+
+    flight = SingleFlight()
+    leader_started = threading.Event()
+    cancel = threading.Event()
+    calls = []
+
+    def leader_fn():
+        calls.append("leader")
+        leader_started.set()
+        cancel.wait(5)
+        raise Cancelled()
+
+    def follower_fn():
+        calls.append("follower")
+        return "리포트"
+
+    def lead():
+        with pytest.raises(Cancelled):
+            flight.do("k", leader_fn, cancel=cancel)
+
+    leader = start(lead)
+    leader_started.wait(5)
+    results = []
+    follower = start(lambda: results.append(flight.do("k", follower_fn)))
+    wait_until(lambda: flight.stats()["coalesced"] == 1)
+    cancel.set()
+    leader.join(5)
+    follower.join(5)
+
+    # 취소는 실패가 아님: 기다리던 쪽이 새 leader가 되어 직접 호출함
+    assert calls == ["leader", "follower"]
+    assert results == ["리포트"]
+    assert flight.stats()["failures"] == 0
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_follower_stops_waiting(wait_until):
+    from single_flight import Cancelled
+
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = start(lambda: flight.do("k", lambda: release.wait(5) and "리포트"))
+    wait_until(lambda: flight.stats()["in_flight"] == 1)
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(Cancelled):
+        flight.do("k", lambda: "쓰이면 안 됨", cancel=cancel)
+
+    # leader는 그대로 끝까지 감
+    release.set()
+    leader.join(5)
+    assert flight.stats()["leaders"] == 1
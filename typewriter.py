@@ -0,0 +1,34 @@
+import math
+import re
+import time
+
+# 타자 효과 출력
+# 글자마다 time.sleep(0.05)를 하고 늘어나는 문자열 전체를 다시 그리면, 60자 힌트 하나에
+# 3초 동안 스크립트가 멈추고 화면을 60번 다시 보냄. 단어 단위로 묶어서 전체 애니메이션
+# 시간과 화면 갱신 횟수를 고정함(길이와 상관없이 최대 0.6초, 최대 12번 갱신).
+
+TOTAL_SECONDS = 0.6
+FRAME_SECONDS = 0.05
+CURSOR = "▌"
+
+_WORD = re.compile(r"\S+")
+
+
+def type_out(placeholder, text, animate=True, total_seconds=TOTAL_SECONDS, frame_seconds=FRAME_SECONDS):
+    """placeholder에 text를 타자 효과로 출력함. animate=False면 바로 전체를 보여 줌."""
+    # 띄어쓰기가 없는 긴 문장은 글자 단위로 끊음
+    ends = [m.end() for m in _WORD.finditer(text)]
+    if len(ends) <= 1:
+        ends = list(range(1, len(text) + 1))
+
+    frames = min(len(ends), int(total_seconds / frame_seconds))
+    if not animate or frames <= 1:
+        placeholder.markdown(text)
+        return
+
+    delay = total_seconds / frames
+    for i in range(1, frames):
+        end = ends[math.ceil(i * len(ends) / frames) - 1]
+        placeholder.markdown(text[:end] + CURSOR)
+        time.sleep(delay)
+    placeholder.markdown(text)